@@ -1,5 +1,7 @@
 # api_alphabet.py
-# Single-character abstract alphabet for compatibility with current L* implementation
+# Single-character abstract alphabet (default), plus catalog-built alphabets of interned int ids
+import itertools
+import json
 
 ADDRESS = "0x0000000000000000000000000000000000000000"
 BLOCK_TAG = "latest"
@@ -38,3 +40,119 @@ API_MAP = {
 }
 
 ALPHABET = ["A", "T", "B", "C", "M"]
+
+
+# ---------- catalog-built alphabets ----------
+# A catalog lists JSON-RPC methods with "$variable" placeholders in their params;
+# every combination of variable values becomes one symbol (an interned int id).
+# Each method carries the semantic class (A/T/B/C/M) the language rules use.
+#
+# {
+#   "variables": {"address": ["0x..", "0x.."], "block": ["latest", "0x1"]},
+#   "methods": [
+#     {"class": "A", "method": "eth_getBalance", "params": ["$address", "$block"]},
+#     ...
+#   ]
+# }
+
+
+class Alphabet:
+    """
+    Interned symbol table.
+    symbols: list of int ids (learner alphabet)
+    api_map: id -> {"method", "params"}   (same shape as API_MAP)
+    classes: id -> semantic class letter (A/T/B/C/M)
+    names:   id -> human-readable label
+    """
+
+    def __init__(self):
+        self.symbols = []
+        self.api_map = {}
+        self.classes = {}
+        self.names = {}
+        self._ids = {}
+
+    def intern(self, cls, method, params, name=None):
+        key = (cls, method, json.dumps(params, sort_keys=True))
+        sid = self._ids.get(key)
+        if sid is not None:
+            return sid
+        sid = len(self.symbols)
+        self._ids[key] = sid
+        self.symbols.append(sid)
+        self.api_map[sid] = {"method": method, "params": params}
+        self.classes[sid] = cls
+        self.names[sid] = name if name is not None else f"{cls}{sid}:{method}"
+        return sid
+
+    def by_class(self, cls):
+        return [s for s in self.symbols if self.classes[s] == cls]
+
+    def translate(self, word):
+        """
+        Map a word over class letters (e.g. "ATB") to the first symbol of each class;
+        KeyError if the alphabet has no symbol of one of its classes.
+        """
+        first = {}
+        for s in self.symbols:
+            first.setdefault(self.classes[s], s)
+        return tuple(first[c] for c in word)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __repr__(self):
+        counts = {}
+        for c in self.classes.values():
+            counts[c] = counts.get(c, 0) + 1
+        return f"Alphabet(|Σ|={len(self.symbols)}, per class={counts})"
+
+
+def _placeholders(obj, found):
+    if isinstance(obj, str) and obj.startswith("$"):
+        found.append(obj[1:])
+    elif isinstance(obj, list):
+        for x in obj:
+            _placeholders(x, found)
+    elif isinstance(obj, dict):
+        for x in obj.values():
+            _placeholders(x, found)
+    return found
+
+
+def _substitute(obj, env):
+    if isinstance(obj, str) and obj.startswith("$"):
+        return env[obj[1:]]
+    if isinstance(obj, list):
+        return [_substitute(x, env) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _substitute(v, env) for k, v in obj.items()}
+    return obj
+
+
+def build_alphabet(catalog):
+    """Expand a catalog (dict) into an Alphabet; one symbol per method x variable combination."""
+    variables = catalog.get("variables", {})
+    alphabet = Alphabet()
+    for entry in catalog["methods"]:
+        if entry.get("class") not in ALPHABET:
+            raise ValueError(f"{entry.get('method')}: unknown class {entry.get('class')!r} "
+                             f"(expected one of {'/'.join(ALPHABET)})")
+        names = list(dict.fromkeys(_placeholders(entry.get("params", []), [])))
+        for name in names:
+            if name not in variables:
+                raise ValueError(f"{entry['method']}: unknown catalog variable ${name}")
+        for values in itertools.product(*(variables[n] for n in names)):
+            env = dict(zip(names, values))
+            params = _substitute(entry.get("params", []), env)
+            label = entry["method"] + ("(" + ",".join(str(v)[:10] for v in values) + ")" if values else "")
+            alphabet.intern(entry["class"], entry["method"], params, name=label)
+    return alphabet
+
+
+def load_alphabet(path):
+    with open(path) as f:
+        return build_alphabet(json.load(f))
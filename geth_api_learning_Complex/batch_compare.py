@@ -1,31 +1,33 @@
 # batch_compare.py
 import argparse
 import csv
-import importlib
+import functools
+import json
 import math
 import os
 import statistics
 import sys
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import matplotlib.pyplot as plt
 
+import rpc_client
 from my_lstar.learner import LStar
 from my_ttt.learner import TTTLearner
-from api_alphabet import ALPHABET
+from my_lsharp.learner import LSharp
+from api_alphabet import ALPHABET, load_alphabet
+from instrumentation import Instrumentation
+from learning_trace import TraceRecorder, load_trace, split_runs
+from checkpoint import Checkpoint
+from dfa_io import load_dfa
+from oracle_base import ORACLE_MODULES, MultiOracleSession, get_oracle, make_oracle
+from equivalence import make_equivalence_oracle
+from parallel_equivalence import ParallelEquivalenceOracle
 
-import equivalence as eq
 
-
-# -------------------------------
-# Config
-# -------------------------------
-ORACLE_MODULES = {
-    "simple": "oracle_simple",
-    "medium": "oracle_medium",
-    "complex": "oracle",
-}
+ALGOS = ["L*", "TTT", "L#"]
+ALGO_TAGS = {"L*": "lstar", "TTT": "ttt", "L#": "lsharp"}   # file-name form
 
 
 @dataclass
@@ -38,6 +40,8 @@ class RunResult:
     mq: int
     rpc: int
     error: str = ""
+    metrics: dict = field(default_factory=dict)   # {"learner": snapshot, "oracle": snapshot, "flow": ...}
+    trace_path: str = ""                          # JSONL per-round trace (if --trace-dir)
 
 
 
@@ -48,7 +52,9 @@ def run_with_timeout(fn, timeout_s: int):
     """
     import signal
 
-    class _Timeout(Exception):
+    # BaseException: must not be taken for a transport error by the RPC layer's
+    # `except Exception` (and retried) when the alarm fires inside a request
+    class _Timeout(BaseException):
         pass
 
     def _handler(signum, frame):
@@ -75,33 +81,105 @@ def run_with_timeout(fn, timeout_s: int):
 # -------------------------------
 # Single run
 # -------------------------------
-def run_once(mode: str, algo: str, timeout_s: int, seed: int, num_tests: int, max_len: int) -> RunResult:
-    # load oracle module
-    omod = importlib.import_module(ORACLE_MODULES[mode])
-
-    membership_oracle = getattr(omod, "membership_oracle")
-    reset_counter = getattr(omod, "reset_counter")
-    API_CALL_COUNT = getattr(omod, "API_CALL_COUNT")
-    RPC_CALL_COUNT = getattr(omod, "RPC_CALL_COUNT")
-    
-    eq.membership_oracle = membership_oracle
+def trace_filename(mode: str, algo: str, trial: int) -> str:
+    tag = ALGO_TAGS.get(algo, algo.lower())
+    return f"trace_{mode}_{tag}_{trial:02d}.jsonl"
+
+
+def checkpoint_filename(mode: str, algo: str, trial: int) -> str:
+    tag = ALGO_TAGS.get(algo, algo.lower())
+    return f"ckpt_{mode}_{tag}_{trial:02d}.pkl"
+
+
+def run_once(mode: str, algo: str, timeout_s: int, seed: int, num_tests: int, max_len: int,
+             trace_dir: str = "", short_circuit: bool = False, footprint=None,
+             session=None, alphabet=None, eq_workers: int = 0, eq_shortest: bool = False,
+             checkpoint_dir: str = "", checkpoint_every: int = 1, prior=None,
+             prune_every=None) -> RunResult:
+    # oracle by mode name (or this mode's oracle in a shared multi-mode session)
+    if session is not None:
+        oracle = session.oracle(mode)
+    elif alphabet is not None:
+        oracle = make_oracle(mode, alphabet=alphabet, short_circuit=short_circuit, footprint=footprint)
+    else:
+        oracle = get_oracle(mode)
+        oracle.short_circuit = short_circuit
+        oracle.footprint = footprint
+
+    membership_oracle = oracle.membership_oracle
+    API_CALL_COUNT = oracle.get_mq_count
+    RPC_CALL_COUNT = oracle.get_rpc_count
+    catalog = alphabet
+    if alphabet is None:
+        alphabet = ALPHABET
+    symbols = list(alphabet)
+    if eq_workers > 0:
+        worker_oracle = functools.partial(make_oracle, mode, alphabet=catalog,
+                                          short_circuit=short_circuit or session is not None,
+                                          footprint=footprint)
+        equivalence_oracle = ParallelEquivalenceOracle(membership_oracle, worker_oracle, workers=eq_workers,
+                                                       seed=seed, alphabet=alphabet, shortest=eq_shortest,
+                                                       counter=oracle)
+    else:
+        equivalence_oracle = make_equivalence_oracle(membership_oracle, alphabet=alphabet)
 
     # reset counts + cache
-    reset_counter()
+    oracle.reset_counter()
+    learner_instr = Instrumentation()
+
+    trace = None
+    trace_path = ""
+    if trace_dir:
+        os.makedirs(trace_dir, exist_ok=True)
+        trace_path = os.path.join(trace_dir, trace_filename(mode, algo, trial_global()))
+        trace = TraceRecorder(trace_path, mq_count=API_CALL_COUNT, rpc_count=RPC_CALL_COUNT,
+                              algo=algo, mode=mode)
+
+    # a killed / timed-out run leaves its checkpoint; the next run of the same
+    # (mode, algo, trial) resumes from it
+    checkpoint = None
+    if checkpoint_dir:
+        checkpoint = Checkpoint(os.path.join(checkpoint_dir, checkpoint_filename(mode, algo, trial_global())),
+                                every=checkpoint_every, oracle=oracle, equivalence=equivalence_oracle)
+        if checkpoint.exists():
+            print(f"[batch] resuming {mode} {algo} trial {trial_global():02d} from {checkpoint.path}")
 
     def _learn():
-        # IMPORTANT: use eq.equivalence_oracle (function), not module
         if algo == "L*":
-            learner = LStar(ALPHABET, membership_oracle, eq.equivalence_oracle)
+            learner = LStar(symbols, membership_oracle, equivalence_oracle,
+                            instrumentation=learner_instr, trace=trace, checkpoint=checkpoint, prior=prior,
+                            prune_every=prune_every)
         elif algo == "TTT":
-            learner = TTTLearner(ALPHABET, membership_oracle, eq.equivalence_oracle)
+            learner = TTTLearner(symbols, membership_oracle, equivalence_oracle,
+                                 instrumentation=learner_instr, trace=trace,
+                                 membership_many=oracle.membership_many, checkpoint=checkpoint,
+                                 prior=prior)
+        elif algo == "L#":
+            learner = LSharp(symbols, membership_oracle, equivalence_oracle,
+                             instrumentation=learner_instr, trace=trace,
+                             membership_many=oracle.membership_many, checkpoint=checkpoint,
+                             prior=prior)
         else:
             raise ValueError(algo)
         return learner.learn()
 
+    flow0 = rpc_client.get_pool().flow_stats()
     t0 = time.time()
-    status, val = run_with_timeout(_learn, timeout_s=timeout_s)
+    try:
+        status, val = run_with_timeout(_learn, timeout_s=timeout_s)
+    finally:
+        if eq_workers > 0:
+            equivalence_oracle.close()
     t1 = time.time()
+    # rpc flow control: retries / throttles of this run, rate and window it ended with
+    flow = rpc_client.get_pool().flow_stats()
+    for k in ("retries", "throttled"):
+        flow[k] -= flow0[k]
+    metrics = {"learner": learner_instr.snapshot(), "oracle": oracle.instr.snapshot(), "flow": flow}
+    if trace is not None:
+        trace.close()
+    if checkpoint is not None and status == "OK":
+        checkpoint.remove()
 
     if status == "OK":
         # learned DFA is in val, but we don't need it here
@@ -113,7 +191,9 @@ def run_once(mode: str, algo: str, timeout_s: int, seed: int, num_tests: int, ma
             seconds=t1 - t0,
             mq=int(API_CALL_COUNT()),
             rpc=int(RPC_CALL_COUNT()),
-            error=""
+            error="",
+            metrics=metrics,
+            trace_path=trace_path
         )
     else:
         return RunResult(
@@ -124,7 +204,9 @@ def run_once(mode: str, algo: str, timeout_s: int, seed: int, num_tests: int, ma
             seconds=t1 - t0,
             mq=int(API_CALL_COUNT()),
             rpc=int(RPC_CALL_COUNT()),
-            error=str(val)
+            error=str(val),
+            metrics=metrics,
+            trace_path=trace_path
         )
 
 
@@ -157,6 +239,19 @@ def write_csv_results(path: str, results: list[RunResult]):
             w.writerow([r.mode, r.trial, r.algo, r.status, f"{r.seconds:.6f}", r.mq, r.rpc, r.error])
 
 
+def write_metrics_jsonl(path: str, results: list[RunResult]):
+    """One JSON object per run: identifying fields + learner/oracle instrumentation snapshots + rpc flow stats."""
+    with open(path, "w") as f:
+        for r in results:
+            f.write(json.dumps({
+                "mode": r.mode, "trial": r.trial, "algo": r.algo, "status": r.status,
+                "seconds": r.seconds, "mq": r.mq, "rpc": r.rpc,
+                "learner": r.metrics.get("learner", {}),
+                "oracle": r.metrics.get("oracle", {}),
+                "flow": r.metrics.get("flow", {}),
+            }) + "\n")
+
+
 def write_csv_summary(path: str, results: list[RunResult]):
     # group by (mode, algo)
     groups = {}
@@ -203,7 +298,7 @@ def add_bar_labels(ax, bars, fmt="{:.2f}", y_pad_ratio=0.02):
 def plot_pdf(path: str, results: list[RunResult], trials: int):
     # compute means for OK runs
     modes = ["simple", "medium", "complex"]
-    algos = ["L*", "TTT"]
+    algos = ALGOS
 
     # metric -> dict[(mode,algo)] = mean
     mean_time = {}
@@ -228,9 +323,9 @@ def plot_pdf(path: str, results: list[RunResult], trials: int):
     for i, mode in enumerate(modes):
         for j, (title, mdict, fmt) in enumerate(metrics):
             ax = axes[i][j]
-            vals = [mdict[(mode, "L*")], mdict[(mode, "TTT")]]
+            vals = [mdict[(mode, algo)] for algo in algos]
 
-            bars = ax.bar(["L*", "TTT"], vals)
+            bars = ax.bar(algos, vals)
             ax.set_title(f"{mode} — {title}")
             add_bar_labels(ax, bars, fmt=fmt)
 
@@ -239,6 +334,48 @@ def plot_pdf(path: str, results: list[RunResult], trials: int):
     plt.close(fig)
 
 
+def plot_convergence(path: str, results: list[RunResult]):
+    """
+    Convergence curves from per-round traces:
+    column 1: cumulative MQ per round, column 2: hypothesis size vs cumulative MQ.
+    One line per (algo, trial) and process (a resumed run starts a new line);
+    unfinished runs (timeouts) are drawn too.
+    """
+    modes = ["simple", "medium", "complex"]
+    colors = {"L*": "skyblue", "TTT": "red", "L#": "seagreen"}
+
+    fig, axes = plt.subplots(3, 2, figsize=(12, 9))
+    fig.suptitle("Convergence (per-round traces)", fontsize=14)
+
+    for i, mode in enumerate(modes):
+        ax_mq, ax_size = axes[i][0], axes[i][1]
+        labelled = set()
+        for r in results:
+            if r.mode != mode or not r.trace_path or not os.path.exists(r.trace_path):
+                continue
+            for rows in split_runs(load_trace(r.trace_path)):
+                label = r.algo if r.algo not in labelled else None
+                labelled.add(r.algo)
+                color = colors.get(r.algo)
+                rounds = [row["round"] for row in rows]
+                mqs = [row.get("mq", 0) for row in rows]
+                sizes = [row["hyp_states"] for row in rows]
+                ax_mq.plot(rounds, mqs, color=color, alpha=0.6, marker=".", label=label)
+                ax_size.plot(mqs, sizes, color=color, alpha=0.6, marker=".", label=label)
+
+        ax_mq.set_title(f"{mode} — cumulative MQ per round")
+        ax_mq.set_xlabel("round")
+        ax_mq.set_ylabel("MQ")
+        ax_size.set_title(f"{mode} — hypothesis size vs MQ")
+        ax_size.set_xlabel("MQ")
+        ax_size.set_ylabel("#states")
+        if labelled:
+            ax_mq.legend()
+
+    plt.tight_layout(rect=[0, 0.03, 1, 0.96])
+    plt.savefig(path)
+    plt.close(fig)
+
 
 # Main
 
@@ -249,11 +386,37 @@ def main():
     ap.add_argument("--num-tests", type=int, default=200)   # (not used by eq.py directly; kept for future)
     ap.add_argument("--max-len", type=int, default=6)       # (not used by eq.py directly; kept for future)
     ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--trace-dir", default="",
+                    help="write per-round JSONL traces here and plot batch_convergence.pdf")
+    ap.add_argument("--short-circuit", action="store_true",
+                    help="evaluate the language automaton first; skip RPCs for rejected sequences")
+    ap.add_argument("--footprint", choices=["set", "multiset"], default=None,
+                    help="execute each distinct RPC footprint of a sequence once (order-independent)")
+    ap.add_argument("--shared-session", action="store_true",
+                    help="per trial and algorithm, learn all modes against one shared raw-result store")
+    ap.add_argument("--catalog", default=None,
+                    help="learn over an alphabet built from a method catalog JSON (see api_catalog.json)")
+    ap.add_argument("--eq-workers", type=int, default=0,
+                    help="run equivalence random testing in this many worker processes (0 = serial)")
+    ap.add_argument("--eq-shortest", action="store_true",
+                    help="with --eq-workers: finish every slice and return the shortest counterexample")
+    ap.add_argument("--checkpoint-dir", default="",
+                    help="snapshot learner + oracle state here each round; rerunning resumes unfinished runs")
+    ap.add_argument("--checkpoint-every", type=int, default=1,
+                    help="with --checkpoint-dir: snapshot every N equivalence rounds")
+    ap.add_argument("--prior-dir", default="",
+                    help="warm-start each mode from <dir>/dfa_<mode>.json if present (see compare.py --save-dfa)")
+    ap.add_argument("--prune-every", type=int, default=None,
+                    help="L*: drop suffixes not needed to separate the table's states every N rounds")
+    rpc_client.add_cli_args(ap)
     args = ap.parse_args()
+    pool = rpc_client.configure_from_args(args)
 
     print("[batch] starting...")
-    print("[batch] ALPHABET =", ALPHABET)
+    alphabet = load_alphabet(args.catalog) if args.catalog else None
+    print("[batch] ALPHABET =", alphabet if alphabet is not None else ALPHABET)
     print("[batch] oracle modules =", ORACLE_MODULES)
+    print(f"[batch] rpc endpoints = {pool.urls} ({pool.strategy})")
     print(f"[batch] trials/mode={args.trials}, timeout/run={args.timeout}s")
 
     results: list[RunResult] = []
@@ -261,37 +424,61 @@ def main():
 
     base_seed = args.seed
 
+    # (trial, algo) -> MultiOracleSession; modes share RPC results, algorithms don't
+    sessions = {}
+
+    def session_for(trial, algo):
+        if not args.shared_session:
+            return None
+        if (trial, algo) not in sessions:
+            sessions[(trial, algo)] = MultiOracleSession(footprint=args.footprint, alphabet=alphabet)
+        return sessions[(trial, algo)]
+
+    def prior_for(mode):
+        path = os.path.join(args.prior_dir, f"dfa_{mode}.json") if args.prior_dir else ""
+        return load_dfa(path) if path and os.path.exists(path) else None
+
     for mode in ["complex", "medium", "simple"]:
+        prior = prior_for(mode)
+        if prior is not None:
+            print(f"[batch] {mode}: warm start from a {len(prior.states)}-state prior")
         for trial in range(1, args.trials + 1):
             set_trial_global(trial)
             seed = base_seed + trial
 
-            rL = run_once(mode, "L*", args.timeout, seed, args.num_tests, args.max_len)
-            rL.trial = trial
-            rT = run_once(mode, "TTT", args.timeout, seed, args.num_tests, args.max_len)
-            rT.trial = trial
+            parts = []
+            for algo in ALGOS:
+                r = run_once(mode, algo, args.timeout, seed, args.num_tests, args.max_len,
+                             args.trace_dir, args.short_circuit, args.footprint,
+                             session_for(trial, algo), alphabet, args.eq_workers, args.eq_shortest,
+                             args.checkpoint_dir, args.checkpoint_every, prior, args.prune_every)
+                r.trial = trial
+                results.append(r)
 
-            results.append(rL)
-            results.append(rT)
+                if r.status == "OK":
+                    txt = f"{r.seconds:.2f}s MQ={r.mq} RPC={r.rpc}"
+                else:
+                    txt = r.status
+                parts.append(f"{algo}: {txt}")
 
-            if rL.status == "OK":
-                ltxt = f"{rL.seconds:.2f}s MQ={rL.mq} RPC={rL.rpc}"
-            else:
-                ltxt = rL.status
-            if rT.status == "OK":
-                ttxt = f"{rT.seconds:.2f}s MQ={rT.mq} RPC={rT.rpc}"
-            else:
-                ttxt = rT.status
+            print(f"[{mode} trial {trial:02d}] " + " | ".join(parts))
 
-            print(f"[{mode} trial {trial:02d}] L*: {ltxt} | TTT: {ttxt}")
+    for (trial, algo), session in sorted(sessions.items()):
+        print(f"[batch] shared session trial {trial:02d} {algo}: "
+              f"RPC total={session.rpc_count()} MQ={session.mq_counts()}")
 
     write_csv_results("batch_results.csv", results)
     write_csv_summary("batch_summary.csv", results)
+    write_metrics_jsonl("batch_metrics.jsonl", results)
     plot_pdf("batch_comparison.pdf", results, trials=args.trials)
 
-    print("[batch] wrote batch_results.csv and batch_summary.csv")
+    print("[batch] wrote batch_results.csv, batch_summary.csv and batch_metrics.jsonl")
     print("[batch] wrote batch_comparison.pdf")
 
+    if args.trace_dir:
+        plot_convergence("batch_convergence.pdf", results)
+        print(f"[batch] wrote traces to {args.trace_dir}/ and batch_convergence.pdf")
+
 
 if __name__ == "__main__":
     main()
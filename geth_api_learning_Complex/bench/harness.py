@@ -0,0 +1,159 @@
+# bench/harness.py
+"""
+Node-free microbenchmarks for the learners.
+
+    python -m bench.harness                                   # default suite
+    python -m bench.harness --targets complex,random:200:8 --learners lstar,ttt,lsharp --repeat 5
+    python -m bench.harness --json new.json --baseline old.json --threshold 1.25
+
+For each (target, learner) it reports CPU time (process_time, best of --repeat),
+MQ count, peak traced memory (separate tracemalloc pass) and whether the learned
+DFA is exactly equivalent to the target. With --baseline, any CPU time or MQ count
+worse than baseline * threshold is reported as a regression (exit code 1).
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from bench.local_oracle import BudgetExceeded, LocalOracle
+from bench.targets import get_target, shortest_counterexample
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+from my_lsharp.learner import LSharp
+
+
+LEARNERS = {
+    "lstar": LStar,
+    "ttt": TTTLearner,
+    "lsharp": LSharp,
+}
+
+# the local oracle is exact and deterministic: no safety limits needed
+LEARN_KWARGS = {
+    "ttt": {"max_rounds": None, "max_refinements": None},
+}
+
+DEFAULT_TARGETS = ["simple", "medium", "complex", "random:10:3", "random:50:5", "random:100:5"]
+
+
+def _learn_once(algo, target, max_mq):
+    oracle = LocalOracle(target, max_mq=max_mq)
+    learner = LEARNERS[algo](target.alphabet, oracle.membership_oracle, oracle.equivalence_oracle)
+    status = "OK"
+    dfa = None
+    try:
+        dfa = learner.learn(**LEARN_KWARGS.get(algo, {}))
+    except BudgetExceeded:
+        status = "BUDGET"
+    return status, dfa, oracle
+
+
+def measure(algo, target, repeat=3, max_mq=None, memory=True):
+    """Benchmark one learner on one target; returns a flat result dict."""
+    best_cpu = None
+    best_wall = None
+    status, dfa, oracle = "OK", None, None
+
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        c0, w0 = time.process_time(), time.perf_counter()
+        status, dfa, oracle = _learn_once(algo, target, max_mq)
+        cpu, wall = time.process_time() - c0, time.perf_counter() - w0
+        best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+
+    peak_kib = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            _learn_once(algo, target, max_mq)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_kib = peak / 1024.0
+
+    exact = dfa is not None and shortest_counterexample(target, dfa) is None
+    return {
+        "target": target.name,
+        "target_states": target.size,
+        "alphabet": len(target.alphabet),
+        "learner": algo,
+        "status": status,
+        "cpu_s": best_cpu,
+        "wall_s": best_wall,
+        "mq": oracle.get_mq_count(),
+        "eq": oracle.EQ_COUNT,
+        "peak_kib": peak_kib,
+        "hyp_states": len(dfa.states) if dfa is not None else None,
+        "exact": exact,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return human-readable regression lines (empty list = no regression)."""
+    base = {(r["target"], r["learner"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r["target"], r["learner"]))
+        if b is None:
+            continue
+        for metric in ("cpu_s", "mq"):
+            if b.get(metric) and r.get(metric) is not None and r[metric] > b[metric] * threshold:
+                regressions.append(
+                    f"{r['target']}/{r['learner']}: {metric} {b[metric]:.4g} -> {r[metric]:.4g}"
+                )
+        if b.get("exact") and not r.get("exact"):
+            regressions.append(f"{r['target']}/{r['learner']}: no longer exact")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Node-free learner microbenchmarks")
+    ap.add_argument("--targets", default=",".join(DEFAULT_TARGETS),
+                    help="comma list: simple, medium, complex, random:<states>:<alphabet>[:<seed>]")
+    ap.add_argument("--learners", default=",".join(LEARNERS))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-mq", type=int, default=None, help="abort a run after this many MQs")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--json", default="", help="write results to this JSON file")
+    ap.add_argument("--baseline", default="", help="JSON from an earlier run to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25)
+    args = ap.parse_args(argv)
+
+    results = []
+    header = f"{'target':<22} {'learner':<6} {'status':<6} {'cpu(s)':>9} {'MQ':>9} {'peak KiB':>10} {'states':>7} exact"
+    print(header)
+    print("-" * len(header))
+    for spec in args.targets.split(","):
+        target = get_target(spec.strip())
+        for algo in args.learners.split(","):
+            r = measure(algo.strip(), target, repeat=args.repeat, max_mq=args.max_mq,
+                        memory=not args.no_memory)
+            results.append(r)
+            peak = f"{r['peak_kib']:.0f}" if r["peak_kib"] is not None else "-"
+            print(f"{r['target']:<22} {r['learner']:<6} {r['status']:<6} {r['cpu_s']:>9.4f} "
+                  f"{r['mq']:>9} {peak:>10} {str(r['hyp_states']):>7} {r['exact']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[bench] wrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"[bench] REGRESSION {line}")
+        if regressions:
+            return 1
+        print("[bench] no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# bench/local_oracle.py
+import threading
+
+from bench.targets import shortest_counterexample
+from words import as_word
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class LocalOracle:
+    """
+    Pure-Python membership oracle over a TargetDFA.
+    Same counting/caching contract as oracle.Oracle (MQ = cache miss), but no RPC.
+
+    max_mq: raise BudgetExceeded once this many MQs have been answered (None = unbounded)
+    """
+
+    def __init__(self, target, max_mq=None):
+        self.target = target
+        self.max_mq = max_mq
+        self.API_CALL_COUNT = 0
+        self.RPC_CALL_COUNT = 0
+        self.EQ_COUNT = 0
+        self.cache = {}
+
+    def reset_counter(self):
+        self.API_CALL_COUNT = 0
+        self.RPC_CALL_COUNT = 0
+        self.EQ_COUNT = 0
+        self.cache.clear()
+
+    def membership_oracle(self, sequence):
+        key = as_word(sequence)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        self.API_CALL_COUNT += 1
+        if self.max_mq is not None and self.API_CALL_COUNT > self.max_mq:
+            raise BudgetExceeded(f"MQ budget {self.max_mq} exceeded")
+
+        result = self.target.accepts(key)
+        self.cache[key] = result
+        return result
+
+    def membership_many(self, sequences):
+        return [self.membership_oracle(seq) for seq in sequences]
+
+    def equivalence_oracle(self, hypothesis):
+        """Exact equivalence; returns the shortest counterexample as a tuple word (or None)."""
+        self.EQ_COUNT += 1
+        ce = shortest_counterexample(self.target, hypothesis)
+        if ce is None:
+            return None
+        return tuple(ce)
+
+    def get_mq_count(self):
+        return self.API_CALL_COUNT
+
+    def get_rpc_count(self):
+        return self.RPC_CALL_COUNT
+
+
+class LocalExecutor:
+    """
+    Node-free RPC side for oracle_base.Oracle: call(sym) succeeds unless sym is in
+    `fail`. Outcomes depend on the symbol only (like the read-only API_MAP calls),
+    so every Oracle mode must agree on the verdicts. calls: physical calls made.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, sym):
+        return self.call_batch([sym])[0]
+
+    def call_batch(self, syms):
+        with self._lock:
+            self.calls += len(syms)
+        return [sym not in self.fail for sym in syms]
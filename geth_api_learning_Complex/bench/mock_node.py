@@ -0,0 +1,329 @@
+# bench/mock_node.py
+"""
+In-process mock JSON-RPC node with configurable latency and fault injection.
+
+    node = MockNode(latency="exp:5", error_rate=0.01, max_connections=8).start()
+    rpc_client.configure([node.url])                # point the oracles at it
+    ...
+    node.stop()
+
+or as a standalone process:
+
+    python -m bench.mock_node --port 8545 --latency uniform:1:3 --max-connections 16
+    RPC_URL=http://127.0.0.1:8545 python compare.py complex
+
+Latency specs (milliseconds): "0", "const:<ms>", "uniform:<lo>:<hi>",
+"exp:<mean>", "lognormal:<median>:<sigma>". Latency is applied once per HTTP
+request plus optionally per batch item (--item-latency).
+
+Fault injection:
+- error_rate:      reply {"error": ...} (semantic JSON-RPC error) for a request/item
+- throttle_rate:   reply HTTP 429 "rate limit exceeded" for the whole HTTP request
+- drop_rate:       close the connection without a reply
+- truncate_rate:   answer a batch with only its first half of items (a broken node/proxy)
+- max_connections: a client connection opened while this many are open gets
+                   HTTP 429 for its request and is closed (one HTTP/1.1 connection
+                   carries one request at a time, so this caps per-connection
+                   concurrency across clients)
+- max_in_flight:   requests beyond this many in flight node-wide get HTTP 429
+- max_rate:        requests beyond this many in the last second get HTTP 429
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from api_alphabet import API_MAP
+
+
+# Canned results for the methods in API_MAP plus a few used for health checks.
+DEFAULT_RESULTS = {
+    "eth_getBalance": "0x0",
+    "eth_getTransactionCount": "0x0",
+    "eth_getCode": "0x",
+    "eth_call": "0x",
+    "eth_feeHistory": {"oldestBlock": "0x1", "baseFeePerGas": ["0x1", "0x1"],
+                       "gasUsedRatio": [0.0], "reward": []},
+    "eth_blockNumber": "0x1",
+    "eth_chainId": "0xfa",
+    "net_version": "250",
+    "web3_clientVersion": "mock-node/1.0",
+}
+
+
+def parse_latency(spec):
+    """Turn a latency spec string into a zero-arg sampler returning seconds."""
+    spec = str(spec).strip()
+    if spec in ("", "0", "none"):
+        return lambda rng: 0.0
+    parts = spec.split(":")
+    kind, args = parts[0], [float(x) for x in parts[1:]]
+    if kind == "const" or (not args and kind.replace(".", "", 1).isdigit()):
+        ms = args[0] if args else float(kind)
+        return lambda rng: ms / 1000.0
+    if kind == "uniform":
+        lo, hi = args
+        return lambda rng: rng.uniform(lo, hi) / 1000.0
+    if kind == "exp":
+        mean = args[0]
+        return lambda rng: rng.expovariate(1.0 / mean) / 1000.0 if mean > 0 else 0.0
+    if kind == "lognormal":
+        median, sigma = args
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma) / 1000.0
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class MockNode:
+    def __init__(self, host="127.0.0.1", port=0, latency="0", item_latency="0",
+                 error_rate=0.0, throttle_rate=0.0, drop_rate=0.0, truncate_rate=0.0,
+                 max_connections=None, max_in_flight=None, max_rate=None, methods=None, seed=0):
+        self.host = host
+        self.port = port
+        self._latency = parse_latency(latency)
+        self._item_latency = parse_latency(item_latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.drop_rate = drop_rate
+        self.truncate_rate = truncate_rate
+        self.max_connections = max_connections
+        self.max_in_flight = max_in_flight
+        self.max_rate = max_rate
+        self._recent = deque()   # arrival times within the last second (max_rate)
+
+        # method -> canned result; every API_MAP method is served
+        self.methods = dict(DEFAULT_RESULTS)
+        for spec in API_MAP.values():
+            self.methods.setdefault(spec["method"], "0x")
+        if methods:
+            self.methods.update(methods)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._connections = 0
+        self.stats = {
+            "http_requests": 0, "calls": 0, "batches": 0,
+            "errors": 0, "throttled": 0, "dropped": 0, "truncated": 0,
+            "over_connections": 0, "over_limit": 0, "over_rate": 0,
+            "max_in_flight": 0, "max_connections": 0,
+        }
+        self._server = None
+        self._thread = None
+
+    # ---------- lifecycle ----------
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        node = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+            def log_message(self, fmt, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                self.over_connections = node._connect()
+
+            def finish(self):
+                try:
+                    super().finish()
+                finally:
+                    node._disconnect()
+
+            def do_POST(self):
+                node._handle(self)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # ---------- request handling ----------
+    def _draw(self, p):
+        if p <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < p
+
+    def _sample(self, sampler):
+        with self._lock:
+            return sampler(self._rng)
+
+    def _connect(self):
+        """Register a new client connection; True if it exceeds max_connections."""
+        with self._lock:
+            self._connections += 1
+            self.stats["max_connections"] = max(self.stats["max_connections"], self._connections)
+            return self.max_connections is not None and self._connections > self.max_connections
+
+    def _disconnect(self):
+        with self._lock:
+            self._connections -= 1
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _reply(self, handler, status, body, close=False):
+        data = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        if close:
+            handler.send_header("Connection", "close")   # also sets handler.close_connection
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _call(self, req):
+        req_id = req.get("id") if isinstance(req, dict) else None
+        if not isinstance(req, dict) or "method" not in req:
+            return {"jsonrpc": "2.0", "id": req_id,
+                    "error": {"code": -32600, "message": "invalid request"}}
+        self._count("calls")
+        delay = self._sample(self._item_latency)
+        if delay > 0:
+            time.sleep(delay)
+        method = req["method"]
+        if method not in self.methods:
+            return {"jsonrpc": "2.0", "id": req_id,
+                    "error": {"code": -32601, "message": f"the method {method} does not exist"}}
+        if self._draw(self.error_rate):
+            self._count("errors")
+            return {"jsonrpc": "2.0", "id": req_id,
+                    "error": {"code": -32000, "message": "injected error"}}
+        return {"jsonrpc": "2.0", "id": req_id, "result": self.methods[method]}
+
+    def _handle(self, handler):
+        length = int(handler.headers.get("Content-Length", 0))
+        raw = handler.rfile.read(length)
+        self._count("http_requests")
+
+        with self._lock:
+            self._in_flight += 1
+            in_flight = self._in_flight
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], in_flight)
+            over_rate = False
+            if self.max_rate is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                over_rate = len(self._recent) >= self.max_rate
+                if not over_rate:
+                    self._recent.append(now)
+        try:
+            if handler.over_connections:
+                self._count("over_connections")
+                self._reply(handler, 429, {"jsonrpc": "2.0", "id": None,
+                                           "error": {"code": -32005, "message": "too many connections"}},
+                            close=True)
+                return
+
+            if self.max_in_flight is not None and in_flight > self.max_in_flight:
+                self._count("over_limit")
+                self._reply(handler, 429, {"jsonrpc": "2.0", "id": None,
+                                           "error": {"code": -32005, "message": "too many concurrent requests"}})
+                return
+
+            if over_rate:
+                self._count("over_rate")
+                self._reply(handler, 429, {"jsonrpc": "2.0", "id": None,
+                                           "error": {"code": -32005, "message": "rate limit exceeded"}})
+                return
+
+            if self._draw(self.drop_rate):
+                self._count("dropped")
+                handler.close_connection = True
+                return
+
+            if self._draw(self.throttle_rate):
+                self._count("throttled")
+                self._reply(handler, 429, {"jsonrpc": "2.0", "id": None,
+                                           "error": {"code": -32005, "message": "rate limit exceeded"}})
+                return
+
+            delay = self._sample(self._latency)
+            if delay > 0:
+                time.sleep(delay)
+
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                self._reply(handler, 200, {"jsonrpc": "2.0", "id": None,
+                                           "error": {"code": -32700, "message": "parse error"}})
+                return
+
+            if isinstance(body, list):
+                self._count("batches")
+                replies = [self._call(req) for req in body]
+                if self._draw(self.truncate_rate):
+                    self._count("truncated")
+                    replies = replies[:len(replies) // 2]
+                self._reply(handler, 200, replies)
+            else:
+                self._reply(handler, 200, self._call(body))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Mock JSON-RPC node for benchmarks")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8545)
+    ap.add_argument("--latency", default="0", help="per HTTP request, e.g. const:1, exp:50")
+    ap.add_argument("--item-latency", default="0", help="per call (batch item)")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--throttle-rate", type=float, default=0.0)
+    ap.add_argument("--drop-rate", type=float, default=0.0)
+    ap.add_argument("--truncate-rate", type=float, default=0.0, help="batch replies cut to half their items")
+    ap.add_argument("--max-connections", type=int, default=None, help="open client connections before HTTP 429")
+    ap.add_argument("--max-in-flight", type=int, default=None, help="node-wide requests in flight before HTTP 429")
+    ap.add_argument("--max-rate", type=float, default=None, help="requests/s before HTTP 429")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    node = MockNode(host=args.host, port=args.port, latency=args.latency,
+                    item_latency=args.item_latency, error_rate=args.error_rate,
+                    throttle_rate=args.throttle_rate, drop_rate=args.drop_rate,
+                    truncate_rate=args.truncate_rate,
+                    max_connections=args.max_connections, max_in_flight=args.max_in_flight,
+                    max_rate=args.max_rate,
+                    seed=args.seed).start()
+    print(f"[mock-node] serving {sorted(node.methods)} on {node.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[mock-node] stats: {node.stats}")
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# bench/targets.py
+import random
+import string
+from collections import deque
+
+
+# Symbols for random targets: single characters while the alphabet fits (words are
+# tuples of them, see words.py); larger alphabets use int symbols instead.
+SYMBOLS = string.ascii_letters + string.digits
+
+
+class TargetDFA:
+    """
+    Complete reference DFA used as a local (node-free) target language.
+    states are 0..n-1, start is 0.
+    delta: list[dict[symbol] -> state]
+    accepting: set of states
+    """
+
+    def __init__(self, name, alphabet, delta, accepting, start=0):
+        self.name = name
+        self.alphabet = list(alphabet)
+        self.delta = delta
+        self.accepting = set(accepting)
+        self.start = start
+
+    @property
+    def size(self):
+        return len(self.delta)
+
+    def run(self, word):
+        q = self.start
+        delta = self.delta
+        for a in word:
+            q = delta[q][a]
+        return q
+
+    def accepts(self, word):
+        return self.run(word) in self.accepting
+
+    def __repr__(self):
+        return f"TargetDFA({self.name}, #states={self.size}, |Σ|={len(self.alphabet)})"
+
+
+# ---------- reference languages (same semantics as the RPC oracles, all calls succeed) ----------
+def simple_target():
+    """oracle_simple: accept iff the sequence is non-empty."""
+    alphabet = ["A", "T", "B", "C", "M"]
+    delta = [{a: 1 for a in alphabet}, {a: 1 for a in alphabet}]
+    return TargetDFA("simple", alphabet, delta, accepting={1})
+
+
+def medium_target():
+    """oracle_medium: no 'M', and A -> T -> B occurs as a subsequence."""
+    alphabet = ["A", "T", "B", "C", "M"]
+    dead = 4
+    delta = []
+    for progress in range(4):
+        row = {}
+        for a in alphabet:
+            if a == "M":
+                row[a] = dead
+            elif (progress, a) in ((0, "A"), (1, "T"), (2, "B")):
+                row[a] = progress + 1
+            else:
+                row[a] = progress
+        delta.append(row)
+    delta.append({a: dead for a in alphabet})
+    return TargetDFA("medium", alphabet, delta, accepting={3})
+
+
+def complex_target():
+    """oracle (complex): the A/T/B/C phase machine, 'M' always rejects."""
+    alphabet = ["A", "T", "B", "C", "M"]
+    dead = 4
+
+    def step(phase, sym):
+        if sym == "M":
+            return dead
+        if sym == "A":
+            return dead if phase >= 2 else max(phase, 1)
+        if sym == "T":
+            return dead if phase < 1 else max(phase, 2)
+        if sym == "B":
+            return dead if phase < 2 else 3
+        if sym == "C":
+            return phase if 1 <= phase <= 2 else dead
+        raise ValueError(f"Unknown symbol: {sym}")
+
+    delta = [{a: step(p, a) for a in alphabet} for p in range(4)]
+    delta.append({a: dead for a in alphabet})
+    return TargetDFA("complex", alphabet, delta, accepting={3})
+
+
+def random_target(n_states, alphabet_size, seed=0, accept_ratio=0.5):
+    """
+    Random complete DFA with every state reachable from the start.
+    A random spanning tree guarantees reachability; remaining transitions are uniform.
+    Up to len(SYMBOLS) the symbols are single characters; larger alphabets use
+    int symbols 0..alphabet_size-1 (like catalog-built api_alphabet.Alphabet ids).
+    """
+    if alphabet_size < 1:
+        raise ValueError("alphabet_size must be >= 1")
+    rng = random.Random(seed)
+    if alphabet_size <= len(SYMBOLS):
+        alphabet = list(SYMBOLS[:alphabet_size])
+    else:
+        alphabet = list(range(alphabet_size))
+    delta = [dict() for _ in range(n_states)]
+
+    # spanning tree: state i hangs off a random earlier state on a free symbol
+    for q in range(1, n_states):
+        while True:
+            parent = rng.randrange(q)
+            free = [a for a in alphabet if a not in delta[parent]]
+            if free:
+                delta[parent][rng.choice(free)] = q
+                break
+
+    for q in range(n_states):
+        for a in alphabet:
+            if a not in delta[q]:
+                delta[q][a] = rng.randrange(n_states)
+
+    accepting = {q for q in range(n_states) if rng.random() < accept_ratio}
+    return TargetDFA(f"random-{n_states}x{alphabet_size}-s{seed}", alphabet, delta, accepting)
+
+
+def get_target(spec):
+    """
+    Parse a target spec:
+        simple | medium | complex | random:<states>:<alphabet>[:<seed>]
+    """
+    if spec == "simple":
+        return simple_target()
+    if spec == "medium":
+        return medium_target()
+    if spec == "complex":
+        return complex_target()
+    if spec.startswith("random:"):
+        parts = spec.split(":")[1:]
+        n_states = int(parts[0])
+        alphabet_size = int(parts[1]) if len(parts) > 1 else 5
+        seed = int(parts[2]) if len(parts) > 2 else 0
+        return random_target(n_states, alphabet_size, seed=seed)
+    raise ValueError(f"Unknown target: {spec}")
+
+
+# ---------- exact equivalence against a learned hypothesis ----------
+def shortest_counterexample(target, hypothesis):
+    """
+    BFS over the product target × hypothesis; returns the shortest word on which
+    they disagree (as a list of symbols) or None. Missing hypothesis transitions
+    are a rejecting sink, matching DFA.accepts().
+    """
+    h_start = hypothesis.start_state
+    h_trans = hypothesis.transitions
+    h_acc = hypothesis.accepting
+    t_delta = target.delta
+    t_acc = target.accepting
+
+    start = (target.start, h_start)
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        t, h = pair
+        if (t in t_acc) != (h is not None and h in h_acc):
+            word = []
+            while parent[pair] is not None:
+                pair, a = parent[pair]
+                word.append(a)
+            word.reverse()
+            return word
+        for a in target.alphabet:
+            nxt = (t_delta[t][a], None if h is None else h_trans.get(h, {}).get(a))
+            if nxt not in parent:
+                parent[nxt] = (pair, a)
+                queue.append(nxt)
+    return None
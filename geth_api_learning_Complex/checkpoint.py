@@ -0,0 +1,110 @@
+# checkpoint.py
+# On-disk snapshots of a learner (and its oracle's caches), so that a run killed by
+# a node restart, a timeout or the OOM killer resumes where it stopped instead of
+# from zero, without re-asking any membership query that was already answered.
+import os
+import pickle
+
+
+class Checkpoint:
+    """
+    Pickled learner state (plus optional oracle state) in one file.
+
+    path:   checkpoint file; written atomically (temp file + os.replace), so a run
+            killed while saving keeps the previous snapshot
+    every:  snapshot every `every` save() calls (learners call it once per round)
+    oracle: optional oracle_base.Oracle whose cache, result store and counters are
+            saved with the learner
+    equivalence: optional equivalence.EquivalenceOracle; its random state as of the
+            snapshot is saved, so a resumed equivalence round re-draws the same
+            words (answered from the restored oracle cache) instead of new ones
+
+    Learners take checkpoint=Checkpoint(...): learn() first resumes from the file
+    if there is one, calls save() before each equivalence query (the learner state
+    is consistent there), and save_progress() when it is aborted by an exception.
+    The latter keeps the last snapshot's learner structure but stores the current
+    query trie and oracle caches, so no answer obtained since is lost either.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, every=1, oracle=None, equivalence=None):
+        self.path = path
+        self.every = max(1, int(every))
+        self.oracle = oracle
+        self.equivalence = equivalence
+        self.saves = 0
+        self._calls = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """The saved snapshot dict, or None if there is none."""
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != self.VERSION:
+            raise ValueError(f"{self.path}: unsupported checkpoint version {data.get('version')}")
+        return data
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+    def _write(self, algo, learner_state, eq_state=None):
+        data = {"version": self.VERSION, "algo": algo, "learner": learner_state}
+        if self.oracle is not None:
+            data["oracle"] = self.oracle.checkpoint_state()
+        if eq_state is not None:
+            data["equivalence"] = eq_state
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.saves += 1
+
+    # ---------- learner side ----------
+    def resume(self, learner):
+        """Restore learner (and oracle) from the file; returns False if there is nothing to resume."""
+        data = self.load()
+        if data is None:
+            return False
+        algo = type(learner).__name__
+        if data["algo"] != algo:
+            raise ValueError(f"{self.path}: checkpoint of {data['algo']}, not {algo}")
+        learner.restore_state(data["learner"])
+        if self.oracle is not None and "oracle" in data:
+            self.oracle.restore_state(data["oracle"])
+        if self.equivalence is not None and "equivalence" in data:
+            self.equivalence.restore_state(data["equivalence"])
+        return True
+
+    def save(self, learner, force=False):
+        self._calls += 1
+        if force or self._calls % self.every == 0:
+            eq_state = self.equivalence.checkpoint_state() if self.equivalence is not None else None
+            self._write(type(learner).__name__, learner.checkpoint_state(), eq_state)
+
+    def save_progress(self, learner):
+        """
+        Snapshot after an abort: the learner may be mid-update, so keep the last
+        consistent structure and only swap in the current words. The structure is
+        read back from the file: learner states share the learner's live lists and
+        dicts, so anything kept in memory would have changed with them since. The
+        trie is append-only, so its handles still mean the same words in the old
+        structure. Only if an answer it was built on has changed since (a warm start
+        dropped a wrong seed, see dfa_io.PriorSeeds) are the words saved alone.
+        """
+        data = self.load()
+        words = learner.words
+        if data is None or any(words.verdict.get(h) != v for h, v in data["learner"]["words"].verdict.items()):
+            self._write(type(learner).__name__, learner.checkpoint_state(words_only=True))
+            return
+        state = data["learner"]
+        state["words"] = words
+        self._write(type(learner).__name__, state, data.get("equivalence"))
@@ -1,40 +1,116 @@
 # compare.py
-import sys
+import argparse
+import functools
+import os
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 
+import rpc_client
+
+
+# CLI: choose mode (+ RPC endpoints)
+
+ap = argparse.ArgumentParser()
+ap.add_argument("mode", nargs="?", default="complex", help="simple, medium or complex")
+ap.add_argument("--short-circuit", action="store_true",
+                help="evaluate the language automaton first; skip RPCs for rejected sequences")
+ap.add_argument("--footprint", choices=["set", "multiset"], default=None,
+                help="execute each distinct RPC footprint of a sequence once (order-independent)")
+ap.add_argument("--catalog", default=None,
+                help="learn over an alphabet built from a method catalog JSON (see api_catalog.json)")
+ap.add_argument("--eq-workers", type=int, default=0,
+                help="run equivalence random testing in this many worker processes (0 = serial)")
+ap.add_argument("--eq-shortest", action="store_true",
+                help="with --eq-workers: finish every slice and return the shortest counterexample")
+ap.add_argument("--checkpoint-dir", default=None,
+                help="snapshot each learner (+ oracle caches) here every round; a rerun resumes unfinished learners")
+ap.add_argument("--checkpoint-every", type=int, default=1,
+                help="with --checkpoint-dir: snapshot every N equivalence rounds")
+ap.add_argument("--prior", default=None,
+                help="warm-start every learner from a DFA saved with --save-dfa (verify + repair it)")
+ap.add_argument("--save-dfa", default=None,
+                help="write the DFA learned by TTT to this JSON file (usable as --prior later)")
+ap.add_argument("--prune-every", type=int, default=None,
+                help="L*: drop suffixes not needed to separate the table's states every N rounds")
+ap.add_argument("--eq-seed", type=int, default=0,
+                help="seed of the equivalence test words; every learner gets the same words")
+ap.add_argument("--concurrent", action="store_true",
+                help="run the learners at the same time, each with its own oracle and counters, "
+                     "sharing one physical RPC cache")
+rpc_client.add_cli_args(ap)
+args = ap.parse_args()
+
+Experiment_method = args.mode
+rpc_client.configure_from_args(args)
+
+
+# oracle by mode name
+
+from api_alphabet import ALPHABET, load_alphabet
+from oracle_base import SharedRpcCache, get_oracle, make_oracle
+
+if args.catalog:
+    alphabet = load_alphabet(args.catalog)
+    print(f"catalog alphabet: {alphabet}")
+    oracle = make_oracle(Experiment_method, alphabet=alphabet,
+                         short_circuit=args.short_circuit, footprint=args.footprint)
+else:
+    alphabet = ALPHABET
+    oracle = get_oracle(Experiment_method)
+    oracle.short_circuit = args.short_circuit
+    oracle.footprint = args.footprint
+reset_counter = oracle.reset_counter
 
-# CLI: choose mode
 
-if len(sys.argv) > 1:
-    Experiment_method = sys.argv[1]
-else:
-    Experiment_method = "complex"  # default
+# learners + alphabet
 
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+from my_lsharp.learner import LSharp
+from equivalence import make_equivalence_oracle
 
-# import oracle by mode
+symbols = list(alphabet)
 
-if Experiment_method == "complex":
-    from oracle import membership_oracle, reset_counter, API_CALL_COUNT, RPC_CALL_COUNT
-elif Experiment_method == "simple":
-    from oracle_simple import membership_oracle, reset_counter, API_CALL_COUNT, RPC_CALL_COUNT
-elif Experiment_method == "medium":
-    from oracle_medium import membership_oracle, reset_counter, API_CALL_COUNT, RPC_CALL_COUNT
-else:
-    raise ValueError(f"Unknown method: {Experiment_method}. Choose simple, medium, or complex.")
 
+def make_equivalence(o):
+    """A fresh equivalence oracle for one learner: same seed, so every learner is tested on the same words."""
+    if args.eq_workers > 0:
+        from parallel_equivalence import ParallelEquivalenceOracle
+        worker_oracle = functools.partial(make_oracle, Experiment_method,
+                                          alphabet=alphabet if args.catalog else None,
+                                          short_circuit=args.short_circuit, footprint=args.footprint)
+        return ParallelEquivalenceOracle(o.membership_oracle, worker_oracle, workers=args.eq_workers,
+                                         seed=args.eq_seed, alphabet=alphabet, shortest=args.eq_shortest,
+                                         counter=o)
+    return make_equivalence_oracle(o.membership_oracle, alphabet=alphabet, rng=random.Random(args.eq_seed))
 
-# learners + alphabet
 
-from my_lstar.learner import LStar
-from my_ttt.learner import TTTLearner
-from api_alphabet import ALPHABET
+# prior model (optional)
 
+import dfa_io
 
-# IMPORTANT: monkey-patch equivalence.py without editing it
+prior = dfa_io.load_dfa(args.prior) if args.prior else None
+if prior is not None:
+    print(f"prior model: {args.prior} ({len(prior.states)} states)")
 
-import equivalence as eq
-eq.membership_oracle = membership_oracle  # redirect to current mode oracle
+
+# checkpoints (optional): one file per learner, removed once it has finished
+
+from checkpoint import Checkpoint
+
+
+def make_checkpoint(tag, o, equivalence):
+    if not args.checkpoint_dir:
+        return None
+    return Checkpoint(os.path.join(args.checkpoint_dir, f"ckpt_{Experiment_method}_{tag}.pkl"),
+                      every=args.checkpoint_every, oracle=o, equivalence=equivalence)
+
+
+def finish_checkpoint(checkpoint):
+    if checkpoint is not None:
+        checkpoint.remove()
 
 
 # visualization helper
@@ -50,50 +126,92 @@ def add_bar_labels(ax, bars, fmt="{:.2f}", y_pad_ratio=-0.15):
         ax.text(x, h + pad, fmt.format(h), ha="center", va="bottom", fontsize=12)
 
 
-# run L*
-
-reset_counter()
-start = time.time()
-lstar_learner = LStar(ALPHABET, membership_oracle, eq.equivalence_oracle)  # function, not module
-lstar_dfa = lstar_learner.learn()
-lstar_time = time.time() - start
-lstar_requests = API_CALL_COUNT()
-lstar_rpc = RPC_CALL_COUNT()
-print(f"L* time: {lstar_time:.2f}s, Request: {lstar_requests}, RPC: {lstar_rpc}")
-
+# run the learners
+
+LEARNERS = [("L*", "lstar"), ("TTT", "ttt"), ("L#", "lsharp")]
+
+
+def run_learner(tag, o, equivalence):
+    """Learn with one algorithm against oracle o; returns (dfa, seconds, MQs, RPCs) as counted by o."""
+    start = time.time()
+    checkpoint = make_checkpoint(tag, o, equivalence)
+    if tag == "lstar":
+        learner = LStar(symbols, o.membership_oracle, equivalence, checkpoint=checkpoint,
+                        prior=prior, prune_every=args.prune_every)
+    elif tag == "ttt":
+        learner = TTTLearner(symbols, o.membership_oracle, equivalence,
+                             membership_many=o.membership_many, checkpoint=checkpoint, prior=prior)
+    else:
+        learner = LSharp(symbols, o.membership_oracle, equivalence,
+                         membership_many=o.membership_many, checkpoint=checkpoint, prior=prior)
+    dfa = learner.learn()
+    finish_checkpoint(checkpoint)
+    return dfa, time.time() - start, o.get_mq_count(), o.get_rpc_count()
+
+
+results = {}
+if args.concurrent:
+    # one oracle (cache, store, counters) and equivalence oracle per learner: MQ/RPC
+    # counts are those of a solo run, but no physical call is made twice
+    shared = SharedRpcCache()
+    runs = {}
+    for _, tag in LEARNERS:
+        o = make_oracle(Experiment_method, alphabet=alphabet if args.catalog else None,
+                        short_circuit=args.short_circuit, footprint=args.footprint, shared=shared)
+        runs[tag] = (o, make_equivalence(o))
+    if args.eq_workers > 0:
+        # fork the equivalence workers before any learner thread holds a lock
+        for _, eq in runs.values():
+            eq.start()
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=len(LEARNERS)) as pool:
+        futures = {tag: pool.submit(run_learner, tag, o, eq) for tag, (o, eq) in runs.items()}
+        results = {tag: f.result() for tag, f in futures.items()}
+    print(f"concurrent wall time: {time.time() - start:.2f}s, "
+          f"physical RPC: {shared.rpc_count} (shared: {shared.shared_hits})")
+    if args.eq_workers > 0:
+        for _, eq in runs.values():
+            eq.close()
+else:
+    for _, tag in LEARNERS:
+        reset_counter()
+        equivalence_oracle = make_equivalence(oracle)
+        results[tag] = run_learner(tag, oracle, equivalence_oracle)
+        if args.eq_workers > 0:
+            equivalence_oracle.close()
 
-# run TTT
+for label, tag in LEARNERS:
+    _, seconds, mq, rpc = results[tag]
+    print(f"{label} time: {seconds:.2f}s, Request: {mq}, RPC: {rpc}")
 
-reset_counter()
-start = time.time()
-ttt_learner = TTTLearner(ALPHABET, membership_oracle, eq.equivalence_oracle)  # function
-ttt_dfa = ttt_learner.learn()
-ttt_time = time.time() - start
-ttt_requests = API_CALL_COUNT()
-ttt_rpc = RPC_CALL_COUNT()
-print(f"TTT Time: {ttt_time:.2f}s, Request: {ttt_requests}, RPC: {ttt_rpc}")
+lstar_dfa, lstar_time, lstar_requests, lstar_rpc = results["lstar"]
+ttt_dfa, ttt_time, ttt_requests, ttt_rpc = results["ttt"]
+lsharp_dfa, lsharp_time, lsharp_requests, lsharp_rpc = results["lsharp"]
+if args.save_dfa:
+    dfa_io.save_dfa(ttt_dfa, args.save_dfa, symbols)
 
 
 # plot comparison (3 columns)
 
-labels = ["L*", "TTT"]
-times = [lstar_time, ttt_time]
-requests = [lstar_requests, ttt_requests]
-rpc_requests = [lstar_rpc, ttt_rpc]
+labels = ["L*", "TTT", "L#"]
+times = [lstar_time, ttt_time, lsharp_time]
+requests = [lstar_requests, ttt_requests, lsharp_requests]
+rpc_requests = [lstar_rpc, ttt_rpc, lsharp_rpc]
+colors = ["skyblue", "red", "seagreen"]
 
 fig, axes = plt.subplots(1, 3, figsize=(15, 4))
 
-bars_time = axes[0].bar(labels, times, color=["skyblue", "red"])
+bars_time = axes[0].bar(labels, times, color=colors)
 axes[0].set_title("Execution Time (s)")
 axes[0].set_ylabel("Seconds")
 add_bar_labels(axes[0], bars_time, fmt="{:.2f}")
 
-bars_req = axes[1].bar(labels, requests, color=["skyblue", "red"])
+bars_req = axes[1].bar(labels, requests, color=colors)
 axes[1].set_title("Membership Queries (MQ)")
 axes[1].set_ylabel("Count")
 add_bar_labels(axes[1], bars_req, fmt="{:d}")
 
-bars_rpc = axes[2].bar(labels, rpc_requests, color=["skyblue", "red"])
+bars_rpc = axes[2].bar(labels, rpc_requests, color=colors)
 axes[2].set_title("JSON-RPC Calls")
 axes[2].set_ylabel("Count")
 add_bar_labels(axes[2], bars_rpc, fmt="{:d}")
@@ -107,3 +225,4 @@ plt.show()
 
 lstar_dfa.visualize("dfa_lstar")
 ttt_dfa.visualize("dfa_ttt")
+lsharp_dfa.visualize("dfa_lsharp", title="Learned DFA (L#)")
@@ -0,0 +1,333 @@
+# dfa_io.py
+# Learned DFAs on disk (JSON), and warm starts from one: the prior is verified
+# as-is first, then seeds the learner and answers for the system where it is
+# still trusted (PriorSeeds).
+#
+# Works with either learner's DFA class (start_state, transitions, accepting);
+# missing transitions are a rejecting sink, as in DFA.accepts().
+import json
+from collections import deque
+
+from my_ttt.dfa import DFA
+from words import EMPTY, WordTrie, as_word
+
+
+def _symbols(dfa, alphabet):
+    if alphabet is not None:
+        return list(alphabet)
+    seen = {}
+    for trans in dfa.transitions.values():
+        seen.update(dict.fromkeys(trans))
+    return list(seen)
+
+
+# ---------- serialization ----------
+def to_dict(dfa, alphabet=None):
+    """JSON-ready form: states renumbered 0..n-1 in BFS order (0 = start)."""
+    symbols = _symbols(dfa, alphabet)
+    access = access_sequences(dfa, symbols)
+    ids = {q: i for i, q in enumerate(access)}
+    return {
+        "alphabet": symbols,
+        "start": 0,
+        "states": len(ids),
+        "accepting": sorted(ids[q] for q in access if q in dfa.accepting),
+        # [src, symbol, dst] triples keep symbol types (letters or int ids)
+        "transitions": [[ids[q], a, ids[t]] for q in access
+                        for a, t in dfa.transitions.get(q, {}).items() if t in ids],
+    }
+
+
+def save_dfa(dfa, path, alphabet=None):
+    with open(path, "w") as f:
+        json.dump(to_dict(dfa, alphabet), f, indent=1)
+
+
+def load_dfa(path):
+    """DFA (my_ttt.dfa.DFA with int states) saved by save_dfa()."""
+    with open(path) as f:
+        data = json.load(f)
+    transitions = {q: {} for q in range(data["states"])}
+    for q, a, t in data["transitions"]:
+        transitions[q][a] = t
+    dfa = DFA(states=set(transitions), start_state=data["start"],
+              accepting=set(data["accepting"]), transitions=transitions)
+    dfa.alphabet = data["alphabet"]
+    return dfa
+
+
+# ---------- warm start ----------
+def access_sequences(dfa, alphabet=None):
+    """Shortest access word of every reachable state, in BFS order (a prefix-closed set)."""
+    symbols = _symbols(dfa, alphabet)
+    start = dfa.start_state
+    access = {start: EMPTY}
+    queue = deque([start])
+    while queue:
+        q = queue.popleft()
+        trans = dfa.transitions.get(q, {})
+        for a in symbols:
+            t = trans.get(a)
+            if t is not None and t not in access:
+                access[t] = access[q] + (a,)
+                queue.append(t)
+    return access
+
+
+def restrict(prior, alphabet):
+    """
+    The prior as a hypothesis dict over `alphabet` (states, start_state, accepting,
+    transitions), for either learner's DFA(**...): it is offered to the
+    equivalence oracle as-is before any relearning.
+    """
+    symbols = list(alphabet)
+    access = access_sequences(prior, symbols)
+    transitions = {}
+    for q in access:
+        trans = prior.transitions.get(q, {})
+        transitions[q] = {a: trans[a] for a in symbols if a in trans}
+    return {
+        "states": set(access),
+        "start_state": prior.start_state,
+        "accepting": {q for q in access if q in prior.accepting},
+        "transitions": transitions,
+    }
+
+
+class PriorSeeds:
+    """
+    A prior model that failed verification, used to seed a learner and to answer
+    for the system where it is still trusted.
+
+    access:   shortest access word of each prior state (BFS order, prefix-closed)
+    suffixes: suffix-closed set separating all of them (ε first), taken from a
+              characterizing set by a splitting tree that reuses suffixes
+    identify: access word -> the suffixes telling its state apart from all others
+
+    Attached to a WordTrie (words.seeds), the prior's output stands in for the MQ
+    of any word whose run in the prior takes no distrusted transition (seeded
+    verdicts, words.seeded). Seeds are checked lazily: a counterexample found by
+    the equivalence oracle is asked for real, and if the prior predicted it wrong,
+    the transition at fault is located by binary search and distrusted (see
+    check()). The learner then restarts on its real answers and the seeds left.
+    Once the real answers outnumber max_real times the seeded ones left after a
+    discard, the prior no longer saves most of the queries (a different model
+    rather than a changed one) and is dropped altogether.
+    """
+
+    def __init__(self, prior, alphabet, max_real=0.25):
+        self.symbols = list(alphabet)
+        hyp = restrict(prior, self.symbols)
+        states = list(access_sequences(prior, self.symbols))
+        ids = {q: i for i, q in enumerate(states)}
+        sink = len(states)   # missing transitions: the rejecting sink
+        self._delta = [{a: ids.get(hyp["transitions"][q].get(a), sink) for a in self.symbols} for q in states]
+        self._delta.append(dict.fromkeys(self.symbols, sink))
+        self._out = [q in hyp["accepting"] for q in states] + [False]
+
+        self._access = {0: EMPTY}   # state -> shortest access word (the sink included, if reachable)
+        queue = deque([0])
+        while queue:
+            q = queue.popleft()
+            for a, t in self._delta[q].items():
+                if t not in self._access:
+                    self._access[t] = self._access[q] + (a,)
+                    queue.append(t)
+        self.access = [self._access[q] for q in range(len(states))]
+        path, used = self._splitting_tree(self._characterizing_set())
+        suffixes = {EMPTY: True}
+        for w in sorted(used, key=len):
+            for i in range(len(w) - 1, -1, -1):
+                suffixes[w[i:]] = True
+        self.suffixes = list(suffixes)
+        self.identify = {u: path[q] for q, u in enumerate(self.access)}
+
+        self.max_real = max_real
+        self.distrusted = set()     # (prior state, symbol)
+        self.active = True
+        self._state = {WordTrie.ROOT: 0}   # trie handle -> prior state (-1: untrusted run)
+
+    # ---------- prior model ----------
+    def _run(self, word, q=0):
+        delta = self._delta
+        for a in word:
+            q = delta[q][a]
+        return q
+
+    def accepts(self, word):
+        """The prior's output for word, trusted or not."""
+        return self._out[self._run(word)]
+
+    def _characterizing_set(self):
+        """
+        Moore-style refinement over the states reachable here: each new suffix is
+        a·w for an earlier w, so the set is suffix-closed. At most one per state.
+        """
+        states = list(self._access)
+        delta = self._delta
+        suffixes = [EMPTY]
+        sig = {q: (self._out[q],) for q in states}
+        while True:
+            blocks = {}
+            for q in states:
+                blocks.setdefault(sig[q], []).append(q)
+            split = None
+            for block in blocks.values():
+                first = block[0]
+                for a in self.symbols:
+                    s0 = sig[delta[first][a]]
+                    q = next((q for q in block[1:] if sig[delta[q][a]] != s0), None)
+                    if q is not None:
+                        s1 = sig[delta[q][a]]
+                        i = next(i for i, (x, y) in enumerate(zip(s0, s1)) if x != y)
+                        split = (a,) + suffixes[i]
+                        break
+                if split is not None:
+                    break
+            if split is None:
+                return suffixes
+            suffixes.append(split)
+            for q in states:
+                sig[q] = sig[q] + (self._out[self._run(split, q)],)
+
+    def _splitting_tree(self, cset):
+        """
+        Split the prior's states recursively, each block by the suffix of cset with
+        the most balanced split (suffixes already used preferred). Returns
+        ({state: suffixes on its root-to-leaf path}, used suffixes): a state's path
+        suffixes tell it apart from every other state.
+        """
+        states = list(range(len(self.access)))
+        out = {q: [self._out[self._run(w, q)] for w in cset] for q in states}
+        path = {q: [] for q in states}
+        used = {}
+        stack = [states]
+        while stack:
+            block = stack.pop()
+            if len(block) < 2:
+                continue
+            best = None
+            for pool in (list(used), range(len(cset))):
+                for i in pool:
+                    n_true = sum(1 for q in block if out[q][i])
+                    balance = min(n_true, len(block) - n_true)
+                    if balance and (best is None or balance > best[0]):
+                        best = (balance, i)
+                if best is not None:
+                    break
+            if best is None:
+                continue    # equivalent states (non-minimal prior)
+            i = best[1]
+            used[i] = True
+            for q in block:
+                path[q].append(cset[i])
+            stack.append([q for q in block if out[q][i]])
+            stack.append([q for q in block if not out[q][i]])
+        return path, [cset[i] for i in used]
+
+    # ---------- seeds ----------
+    def attach(self, words):
+        """Answer the queries of a WordTrie from the prior where it is trusted."""
+        words.seeds = self
+        words.seeded = set()
+        self._state = {WordTrie.ROOT: 0}
+
+    def trusted(self, word):
+        """True if the prior's run of word takes no distrusted transition."""
+        if not self.active:
+            return False
+        q = 0
+        for a in word:
+            if (q, a) in self.distrusted:
+                return False
+            q = self._delta[q][a]
+        return True
+
+    def predict(self, words, h):
+        """The prior's output for trie handle h, or None if its run is not trusted."""
+        if not self.active:
+            return None
+        state, parent = self._state, words._parent
+        path = []
+        while h not in state:
+            path.append(h)
+            h = parent[h]
+        q = state[h]
+        sym, delta, distrusted = words._sym, self._delta, self.distrusted
+        for n in reversed(path):
+            if q >= 0:
+                a = sym[n]
+                q = -1 if (q, a) in distrusted else delta[q][a]
+            state[n] = q
+        return None if q < 0 else self._out[q]
+
+    def _real(self, words, word, oracle):
+        """The system's answer for word (asked unless already known); replaces a seeded verdict."""
+        h = words.insert(word)
+        if h in words.verdict and h not in words.seeded:
+            return words.verdict[h]
+        v = bool(oracle(word))
+        words.verdict[h] = v
+        words.seeded.discard(h)
+        return v
+
+    def check(self, words, ce, oracle):
+        """
+        Check the seed behind counterexample ce (asked with oracle). Returns True if
+        it was wrong: a transition was distrusted and the verdicts seeded through it
+        dropped, so the learner has to restart; False if ce is a counterexample to
+        be processed as usual.
+        """
+        if not self.active:
+            return False
+        ce = as_word(ce)
+        h = words.insert(ce)
+        if h in words.verdict and h not in words.seeded:
+            return False
+        pred = self.predict(words, h)
+        if pred is None or self._real(words, ce, oracle) == pred:
+            return False
+        transition = self._locate(words, ce, oracle)
+        if transition is None:
+            self.active = False
+        else:
+            self.distrusted.add(transition)
+        self._state = {WordTrie.ROOT: 0}
+        for h in [h for h in words.seeded if self.predict(words, h) is None]:
+            del words.verdict[h]
+            words.seeded.discard(h)
+        if len(words.verdict) - len(words.seeded) > self.max_real * len(words.seeded):
+            self.active = False
+            for h in words.seeded:
+                del words.verdict[h]
+            words.seeded.clear()
+        return True
+
+    def _locate(self, words, word, oracle):
+        """
+        (state, symbol) of a prior transition on word's run that the system
+        contradicts, for a trusted word the prior predicts wrong; None for ε.
+        Rivest–Schapire on the prior's access words: beta(i) = real(⌊word[:i]⌋·word[i:])
+        starts with the wrong answer, and ends with the prediction if the access
+        word of the last state is predicted right (else that shorter word is used).
+        """
+        while word:
+            run = [0]
+            for a in word:
+                run.append(self._delta[run[-1]][a])
+            out = self._out[run[-1]]
+            u = self._access[run[-1]]
+            if self._real(words, u, oracle) == out:
+                lo, hi = 0, len(word)
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if self._real(words, self._access[run[mid]] + word[mid:], oracle) == out:
+                        hi = mid
+                    else:
+                        lo = mid
+                return run[lo], word[lo]
+            if len(u) < len(word) and self.trusted(u):
+                word = u
+            else:
+                return run[-2], word[-1]
+        return None
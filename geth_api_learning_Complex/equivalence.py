@@ -1,4 +1,5 @@
 # equivalence.py
+from collections import OrderedDict
 from api_alphabet import ALPHABET
 from oracle import membership_oracle
 import random
@@ -12,14 +13,121 @@ TEMPLATES = [
     "AC", "CA", "CB", "TC", "BC"
 ]
 
-def equivalence_oracle(hypothesis):
-    for seq in TEMPLATES:
-        if hypothesis.accepts(seq) != membership_oracle(seq):
+
+def template_words(alphabet):
+    """
+    TEMPLATES as tuple words over `alphabet`: letters are used as-is for the default
+    alphabet, catalog alphabets (api_alphabet.Alphabet) map each class letter to
+    its first symbol. Templates using symbols the alphabet lacks are skipped.
+    """
+    if hasattr(alphabet, "translate"):
+        words = []
+        for t in TEMPLATES:
+            try:
+                words.append(alphabet.translate(t))
+            except KeyError:
+                pass    # the catalog has no symbol of one of its classes
+        return words
+    symbols = set(alphabet)
+    return [tuple(t) for t in TEMPLATES if set(t) <= symbols]
+
+
+def random_testing(hypothesis, mq, num_tests=400, max_len=10, rng=random, alphabet=ALPHABET, templates=None):
+    if templates is None:
+        templates = template_words(alphabet)
+    symbols = list(alphabet)
+    for seq in templates:
+        if hypothesis.accepts(seq) != mq(seq):
             return seq
-    for _ in range(400):
-        length = random.randint(1, 10)
-        seq = "".join(random.choice(ALPHABET) for _ in range(length))
-        if hypothesis.accepts(seq) != membership_oracle(seq):
+    for _ in range(num_tests):
+        length = rng.randint(1, max_len)
+        seq = tuple(rng.choice(symbols) for _ in range(length))
+        if hypothesis.accepts(seq) != mq(seq):
             return seq
 
     return None
+
+
+class EquivalenceOracle:
+    """
+    Templates + random words, with a bounded pool of every word tested so far and its
+    oracle verdict. A new hypothesis is first checked against the pool (batch
+    acceptance, zero new MQs); only if it agrees on all of them are fresh words sampled.
+
+    pool_size: maximum pooled words (oldest evicted first; 0 disables the pool)
+    """
+
+    def __init__(self, mq, num_tests=400, max_len=10, rng=random, alphabet=ALPHABET, pool_size=4096):
+        self.mq = mq
+        self.num_tests = num_tests
+        self.max_len = max_len
+        self.rng = rng
+        self.alphabet = alphabet
+        self.templates = template_words(alphabet)
+        self.pool_size = pool_size
+        self.pool = OrderedDict()      # word -> oracle verdict
+        self.pool_hits = 0             # counterexamples found in the pool
+
+    def reset(self):
+        self.pool.clear()
+        self.pool_hits = 0
+
+    def checkpoint_state(self):
+        """Random state and pool (see checkpoint.Checkpoint(equivalence=...))."""
+        return {"rng": self.rng.getstate(), "pool": self.pool}
+
+    def restore_state(self, state):
+        self.rng.setstate(state["rng"])
+        for seq, verdict in state["pool"].items():
+            self._remember(seq, verdict)
+
+    def _remember(self, seq, verdict):
+        if self.pool_size <= 0 or seq in self.pool:
+            return
+        self.pool[seq] = verdict
+        if len(self.pool) > self.pool_size:
+            self.pool.popitem(last=False)
+
+    def check_pool(self, hypothesis):
+        """Shortest pooled word the hypothesis gets wrong, or None."""
+        if not self.pool:
+            return None
+        words = list(self.pool)
+        ce = None
+        for seq, got in zip(words, hypothesis.accepts_many(words)):
+            if got != self.pool[seq] and (ce is None or len(seq) < len(ce)):
+                ce = seq
+        return ce
+
+    def __call__(self, hypothesis):
+        ce = self.check_pool(hypothesis)
+        if ce is not None:
+            self.pool_hits += 1
+            return ce
+
+        symbols = list(self.alphabet)
+        for seq in self.templates:
+            verdict = self.mq(seq)
+            self._remember(seq, verdict)
+            if hypothesis.accepts(seq) != verdict:
+                return seq
+        for _ in range(self.num_tests):
+            length = self.rng.randint(1, self.max_len)
+            seq = tuple(self.rng.choice(symbols) for _ in range(length))
+            verdict = self.mq(seq)
+            self._remember(seq, verdict)
+            if hypothesis.accepts(seq) != verdict:
+                return seq
+
+        return None
+
+
+def make_equivalence_oracle(mq, num_tests=400, max_len=10, rng=random, alphabet=ALPHABET, pool_size=4096):
+    """Equivalence oracle (pool + templates + random words) bound to a given membership oracle."""
+    return EquivalenceOracle(mq, num_tests=num_tests, max_len=max_len, rng=rng,
+                             alphabet=alphabet, pool_size=pool_size)
+
+
+def equivalence_oracle(hypothesis):
+    # default: complex-mode oracle
+    return random_testing(hypothesis, membership_oracle)
@@ -0,0 +1,139 @@
+# instrumentation.py
+import time
+
+
+# Latency bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (count/sum/min/max + bucket counts).
+    bounds: sorted upper bounds; values above the last bound go to the overflow bucket.
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = list(bounds) if bounds is not None else list(LATENCY_BUCKETS_MS)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        i = 0
+        for b in self.bounds:
+            if value <= b:
+                break
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": (self.total / self.count) if self.count else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class _Phase:
+    """Context manager returned by Instrumentation.phase(); times one phase."""
+
+    __slots__ = ("_instr", "_name", "_t0")
+
+    def __init__(self, instr, name):
+        self._instr = instr
+        self._name = name
+        self._t0 = 0.0
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._instr.add_time(self._name, time.perf_counter() - self._t0)
+        return False
+
+
+class Instrumentation:
+    """
+    Counters, phase timers and histograms with an observer API.
+
+    - count(name, n):      increment a counter
+    - phase(name):         `with instr.phase("sift"): ...` accumulates wall time
+    - add_time(name, s):   same as phase() for callers that time themselves
+    - observe(name, v):    add a sample to a histogram (e.g. RPC latency in ms)
+
+    Observers are callables fn(kind, name, value) with kind in
+    {"count", "time", "observe"}; they are called synchronously on every event.
+    Nested phases are timed inclusively (e.g. "sift" inside "hypothesis_build").
+    """
+
+    def __init__(self):
+        self.counters = {}       # name -> int
+        self.timers = {}         # name -> [calls, seconds]
+        self.histograms = {}     # name -> Histogram
+        self._observers = []
+
+    # ---------- observer API ----------
+    def add_observer(self, fn):
+        self._observers.append(fn)
+        return fn
+
+    def remove_observer(self, fn):
+        if fn in self._observers:
+            self._observers.remove(fn)
+
+    def _emit(self, kind, name, value):
+        for fn in self._observers:
+            fn(kind, name, value)
+
+    # ---------- recording ----------
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        if self._observers:
+            self._emit("count", name, n)
+
+    def add_time(self, name, seconds):
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [1, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+        if self._observers:
+            self._emit("time", name, seconds)
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def observe(self, name, value, bounds=None):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Histogram(bounds)
+        h.add(value)
+        if self._observers:
+            self._emit("observe", name, value)
+
+    # ---------- export ----------
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        return {
+            "counters": dict(self.counters),
+            "timers": {k: {"calls": v[0], "seconds": v[1]} for k, v in self.timers.items()},
+            "histograms": {k: h.snapshot() for k, h in self.histograms.items()},
+        }
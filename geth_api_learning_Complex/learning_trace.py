@@ -0,0 +1,105 @@
+# learning_trace.py
+import json
+import os
+import time
+
+
+class TraceRecorder:
+    """
+    Per-round learning trace, written as JSONL (one object per equivalence round).
+
+    Every record carries:
+        round, elapsed (s since start()), mq, rpc (cumulative, if counters given)
+    plus whatever the learner passes to record(), e.g.
+        L*:  hyp_states, ce_len, P, S
+        TTT: hyp_states, ce_len, dt_depth, dt_leaves
+
+    A learner resumed from a checkpoint calls start(append=True): the file is kept,
+    a {"resumed": true, ...} marker row is written and rounds / elapsed continue
+    from its last row (see split_runs()).
+
+    path:      output file (None = keep in memory only, see .rows)
+    mq_count:  callable returning the cumulative membership-query count
+    rpc_count: callable returning the cumulative JSON-RPC call count
+    """
+
+    def __init__(self, path=None, mq_count=None, rpc_count=None, algo=None, mode=None):
+        self.path = path
+        self.mq_count = mq_count
+        self.rpc_count = rpc_count
+        self.algo = algo
+        self.mode = mode
+        self.rows = []
+        self._t0 = None
+        self._round = 0
+        self._fh = None
+
+    def start(self, append=False):
+        self._t0 = time.time()
+        self._round = 0
+        self.rows = []
+        if self.path is None:
+            return
+        if self._fh is not None:
+            self._fh.close()
+        previous = load_trace(self.path) if append and os.path.exists(self.path) else []
+        self._fh = open(self.path, "a" if previous else "w")
+        if previous:
+            last = previous[-1]
+            self._round = last.get("round", 0)
+            self._t0 -= last.get("elapsed", 0.0)
+            self._write(self._row(resumed=True))
+
+    def _row(self, **fields):
+        row = {"round": self._round, "elapsed": time.time() - self._t0}
+        if self.algo is not None:
+            row["algo"] = self.algo
+        if self.mode is not None:
+            row["mode"] = self.mode
+        if self.mq_count is not None:
+            row["mq"] = int(self.mq_count())
+        if self.rpc_count is not None:
+            row["rpc"] = int(self.rpc_count())
+        row.update(fields)
+        return row
+
+    def _write(self, row):
+        self._fh.write(json.dumps(row) + "\n")
+        self._fh.flush()
+
+    def record(self, **fields):
+        if self._t0 is None:
+            self.start()
+        self._round += 1
+        row = self._row(**fields)
+        self.rows.append(row)
+        if self._fh is not None:
+            self._write(row)
+        return row
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def load_trace(path):
+    """Read a JSONL trace written by TraceRecorder back into a list of dicts."""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def split_runs(rows):
+    """Split trace rows at resume markers: one list of round rows per process that ran the learner."""
+    runs = [[]]
+    for row in rows:
+        if row.get("resumed"):
+            runs.append([])
+        else:
+            runs[-1].append(row)
+    return [run for run in runs if run]
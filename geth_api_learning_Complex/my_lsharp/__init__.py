@@ -0,0 +1 @@
+from .observation_tree import ObservationTree
@@ -0,0 +1,348 @@
+# my_lsharp/learner.py
+from collections import deque
+from itertools import islice
+
+from my_lsharp.observation_tree import ObservationTree
+from my_ttt.dfa import DFA
+from instrumentation import Instrumentation
+from dfa_io import PriorSeeds, restrict
+from words import EMPTY, WordTrie, as_word
+
+
+class LSharp:
+    """
+    L# (Vaandrager et al., 2022): learns from an observation tree and apartness
+    instead of a table or a discrimination tree. Only queries that separate a
+    frontier node from a candidate state, or locate the conflict in a
+    counterexample, are asked.
+    """
+
+    def __init__(self, alphabet, membership_oracle, equivalence_oracle, instrumentation=None, trace=None,
+                 words=None, membership_many=None, checkpoint=None, prior=None):
+        self.A = list(alphabet)
+        self.mq_raw = membership_oracle
+        self.mq_many = membership_many   # optional batch oracle: list of words -> list of bools
+        self.eq = equivalence_oracle
+        self.instr = instrumentation if instrumentation is not None else Instrumentation()
+        self.trace = trace   # optional learning_trace.TraceRecorder
+        self.tree = ObservationTree(self.A, words=words, instrumentation=self.instr)
+        self.words = self.tree.words
+        self.checkpoint = checkpoint   # optional checkpoint.Checkpoint
+        self.prior = prior             # optional DFA to warm-start from (dfa_io.load_dfa)
+        self._reset_conflict_cache()
+
+    # ---------- queries ----------
+    def mq(self, word):
+        return self.words.query(self.words.insert(word), self.mq_raw)
+
+    def _query_many(self, handles):
+        """Fill the MQ cache for handles; uncached ones go out in one membership_many() call."""
+        if self.words.query_many(handles, self.mq_raw, self.mq_many):
+            self.instr.count("mq_batches")
+
+    # ---------- rules ----------
+    def _stabilize(self):
+        """
+        Apply the L# rules until every frontier node has exactly one candidate:
+        promotion (a frontier node apart from the whole basis joins it), extension
+        (outputs of the frontier) and separation (query a frontier node with the
+        witness of two of its candidates, one batch per pass).
+        """
+        tree = self.tree
+        words = self.words
+        instr = self.instr
+        while True:
+            self._query_many(tree.unqueried())
+            isolated = tree.update_candidates()
+            if isolated:
+                instr.count("promotions")
+                tree.promote(isolated[0])
+                continue
+
+            queries = []
+            for f in tree.ambiguous():
+                cands = tree.frontier[f]
+                queries.append(words.extend(f, tree.witness(cands[0], cands[1])))
+            if not queries:
+                return
+            instr.count("separations", len(queries))
+            self._query_many(queries)
+
+    # ---------- warm start ----------
+    def _warm_start(self):
+        """
+        Query each trusted access word of the prior with the suffixes identifying
+        its state there, answered by the prior: the states it predicts come out
+        pairwise apart, so the rules promote them and separate the frontier.
+        """
+        seeds = self.words.seeds
+        if seeds is None or not seeds.active:
+            return
+        words = self.words
+        with self.instr.phase("warm_start"):
+            self._query_many([words.extend(words.insert(u), w)
+                              for u in seeds.access if seeds.trusted(u) for w in seeds.identify[u]])
+
+    def _discard_seeds(self, ce):
+        """Check the prior's seed behind ce; if it was wrong, rebuild the tree without it."""
+        seeds = self.words.seeds
+        if seeds is None:
+            return False
+        with self.instr.phase("counterexample"):
+            if not seeds.check(self.words, ce, self.mq_raw):
+                return False
+            self.instr.count("prior_discards")
+            self.tree = ObservationTree(self.A, words=self.words, instrumentation=self.instr)
+            self._reset_conflict_cache()
+            self._warm_start()
+        return True
+
+    # ---------- hypothesis ----------
+    def _hypothesis(self):
+        """Transition function on basis handles: frontier successors go to their candidate."""
+        tree = self.tree
+        words = self.words
+        delta = {}
+        for b in tree.basis:
+            row = {}
+            for a in self.A:
+                c = words.child(b, a)
+                row[a] = c if tree.in_basis(c) else tree.frontier[c][0]
+            delta[b] = row
+        return delta
+
+    def _to_dfa(self, delta):
+        words = self.words
+        rep = {b: words.word(b) for b in delta}
+        return DFA(
+            states=set(rep.values()),
+            start_state=EMPTY,
+            accepting={rep[b] for b in delta if words.verdict[b]},
+            transitions={rep[b]: {a: rep[t] for a, t in row.items()} for b, row in delta.items()}
+        )
+
+    def _run(self, delta, word, q=WordTrie.ROOT):
+        for a in word:
+            q = delta[q][a]
+        return q
+
+    def _reset_conflict_cache(self):
+        self._consistent = {}       # frontier node -> (state, transitions its subtree's runs took)
+        self._conflict_checked = 0  # len(verdict) at the last conflict check
+        self._last_delta = {}
+
+    def _tree_conflict(self, delta):
+        """
+        Shortest observed word the hypothesis gets wrong (a counterexample for free), or None.
+        Every non-basis node lies below one frontier node, so the check runs per frontier
+        subtree. A subtree found consistent is checked again in full only when its state
+        or a transition its runs took changes; new outputs below it only need their
+        own paths run.
+        """
+        words = self.words
+        verdict, parent = words.verdict, words._parent
+        frontier = self.tree.frontier
+        consistent = self._consistent
+        new = {}    # checked frontier node -> new outputs below it
+        for h in islice(verdict, self._conflict_checked, None):
+            f = h
+            while f > 0 and f not in frontier:
+                f = parent[f]
+            if f in consistent:
+                new.setdefault(f, []).append(h)
+        self._conflict_checked = len(verdict)
+        last = self._last_delta
+        changed = set()
+        for b, row in delta.items():
+            old = last.get(b)
+            if old != row:
+                changed.update((b, a) for a, t in row.items() if old is None or old[a] != t)
+        self._last_delta = {b: dict(row) for b, row in delta.items()} if changed else last
+
+        best = None
+        for f, cands in frontier.items():
+            q = cands[0]
+            seen = consistent.get(f)
+            if seen is not None and seen[0] == q and seen[1].isdisjoint(changed):
+                if f not in new:
+                    continue
+                conflict, taken = self._path_conflict(delta, f, q, new[f])
+                seen[1].update(taken)
+            else:
+                conflict, taken = self._subtree_conflict(delta, f, q)
+                consistent[f] = (q, taken)
+            if conflict is not None:
+                del consistent[f]
+                conflict = (conflict[0] + len(words.word(f)), conflict[1])
+                if best is None or conflict[0] < best[0]:
+                    best = conflict
+        return None if best is None else best[1]
+
+    def _path_conflict(self, delta, f, q, hs):
+        """Like _subtree_conflict, but only runs the paths from f down to the nodes hs."""
+        verdict, parent, sym = self.words.verdict, self.words._parent, self.words._sym
+        taken = set()
+        best = None
+        for h in hs:
+            path = []
+            n = h
+            while n != f:
+                path.append(sym[n])
+                n = parent[n]
+            t = q
+            for a in reversed(path):
+                taken.add((t, a))
+                t = delta[t][a]
+            if verdict[h] != verdict[t] and (best is None or len(path) < best[0]):
+                best = (len(path), h)
+        return best, taken
+
+    def _subtree_conflict(self, delta, f, q):
+        """BFS of f's subtree run from state q: ((depth below f, node) of the first conflict, transitions taken)."""
+        verdict, nexts = self.words.verdict, self.words._next
+        taken = set()
+        queue = deque([(f, q, 0)])
+        while queue:
+            n, q, d = queue.popleft()
+            v = verdict.get(n)
+            if v is not None and v != verdict[q]:
+                return (d, n), taken
+            row = delta[q]
+            for a, c in nexts[n].items():
+                t = row.get(a)
+                if t is not None:
+                    taken.add((q, a))
+                    queue.append((c, t, d + 1))
+        return None, taken
+
+    # ---------- counterexample processing ----------
+    def _process_counterexample(self, delta, h):
+        """
+        h: tree node apart from its hypothesis state. Binary search towards the
+        frontier: for sigma = rho·sigma1·sigma2 (rho the first prefix outside the
+        basis) query ⌊rho·sigma1⌋·sigma2·eta; either rho·sigma1 is apart from its
+        state, or ⌊rho·sigma1⌋·sigma2 is a shorter conflict. Stops at a basis or
+        frontier node, whose candidate is then dropped by the next rule pass.
+        """
+        tree = self.tree
+        words = self.words
+        parent = words._parent
+        while not (tree.in_basis(h) or tree.in_basis(parent[h])):
+            sigma = words.word(h)
+            eta = tree.witness(h, self._run(delta, sigma))
+            if eta is None:
+                return
+
+            k = 0
+            node = WordTrie.ROOT
+            while tree.in_basis(node):
+                node = words.child(node, sigma[k])
+                k += 1
+            mid = (k + len(sigma)) // 2
+
+            q = self._run(delta, sigma[:mid])
+            r = words.insert(sigma[:mid])
+            access = words.extend(q, sigma[mid:])
+            self._query_many([words.extend(access, eta)])
+            h = r if tree.apart(r, q) else access
+
+    # ---------- checkpointing ----------
+    def checkpoint_state(self, words_only=False):
+        if words_only:
+            return {"words": self.words}
+        return {"words": self.words, "tree": self.tree.checkpoint_state()}
+
+    def restore_state(self, state):
+        if "tree" in state:
+            self.tree.restore_state(state["tree"], state["words"])
+        else:
+            # answers only: a fresh tree over the saved trie
+            self.tree = ObservationTree(self.A, words=state["words"], instrumentation=self.instr)
+        self.words = self.tree.words
+        self._reset_conflict_cache()
+
+    # ---------- main learning loop ----------
+    def _trace_round(self, hypothesis, ce):
+        if self.trace is None:
+            return
+        self.trace.record(
+            hyp_states=len(hypothesis.states),
+            ce_len=None if ce is None else len(ce),
+            basis=len(self.tree.basis),
+            frontier=len(self.tree.frontier),
+            tree=len(self.tree),
+        )
+
+    def learn(self, max_rounds=None):
+        """max_rounds: optional limit on equivalence queries (None = unbounded)."""
+        if self.checkpoint is None:
+            return self._learn(max_rounds)
+        resumed = self.checkpoint.resume(self)
+        if resumed:
+            self.instr.count("resumed")
+        try:
+            return self._learn(max_rounds, resumed=resumed)
+        except BaseException:
+            self.checkpoint.save_progress(self)
+            raise
+
+    def _learn(self, max_rounds, resumed=False):
+        if self.trace is not None:
+            self.trace.start(append=resumed)   # a resumed run continues its trace file
+
+        instr = self.instr
+        words = self.words
+        if self.prior is not None and words.seeds is None:
+            # offer the prior model first: unchanged, it is only verified
+            prior = DFA(**restrict(self.prior, self.A))
+            instr.count("rounds")
+            with instr.phase("equivalence_round"):
+                ce = self.eq(prior)
+            self._trace_round(prior, ce)
+            if ce is None:
+                instr.count("prior_confirmed")
+                return prior
+            PriorSeeds(self.prior, self.A).attach(words)
+        if len(self.tree.basis) == 1:
+            self._warm_start()
+
+        rounds = 0
+        while True:
+            with instr.phase("tree_rules"):
+                self._stabilize()
+            with instr.phase("hypothesis_build"):
+                delta = self._hypothesis()
+                hypothesis = self._to_dfa(delta)
+
+            # the tree already contradicts the hypothesis: no equivalence query needed
+            with instr.phase("counterexample"):
+                h = self._tree_conflict(delta)
+            if h is not None:
+                instr.count("tree_counterexamples")
+                with instr.phase("counterexample"):
+                    self._process_counterexample(delta, h)
+                continue
+
+            rounds += 1
+            instr.count("rounds")
+            if max_rounds is not None and rounds > max_rounds:
+                print(f"[L#] stop: round limit {max_rounds}")
+                return hypothesis
+
+            if self.checkpoint is not None:
+                self.checkpoint.save(self)
+            with instr.phase("equivalence_round"):
+                ce = self.eq(hypothesis)
+            self._trace_round(hypothesis, ce)
+            if ce is None:
+                return hypothesis
+            if self._discard_seeds(ce):
+                continue
+
+            ce = as_word(ce)
+            with instr.phase("counterexample"):
+                h = words.insert(ce)
+                if words.query(h, self.mq_raw) == hypothesis.accepts(ce):
+                    print("[L#] counterexample not confirmed by the membership oracle; returning hypothesis")
+                    return hypothesis
+                self._process_counterexample(delta, h)
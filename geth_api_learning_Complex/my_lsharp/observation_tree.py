@@ -0,0 +1,282 @@
+# my_lsharp/observation_tree.py
+from collections import deque
+from itertools import islice
+
+from instrumentation import Instrumentation
+from words import EMPTY, WordTrie
+
+
+class ObservationTree:
+    """
+    L# observation tree on top of a WordTrie: a node is a trie handle and its output
+    the MQ verdict (words.verdict, unknown until queried).
+
+    basis:    pairwise apart nodes, the hypothesis states (ROOT first)
+    frontier: one-symbol successors of the basis outside it -> the basis nodes they
+              are not (yet) apart from, i.e. their candidate states
+
+    Two nodes are apart when some suffix w has an observed, different output after
+    both of them. Apartness only grows as outputs are added, so candidate lists are
+    only ever filtered, and a pair only has to be re-checked along the paths of the
+    new outputs below it (see _recheck). The outputs below the frontier are indexed
+    by suffix, so the frontier nodes that share a suffix with a basis node are found
+    without walking their subtrees. Witnesses of basis pairs never change and are
+    cached.
+    """
+
+    def __init__(self, alphabet, words=None, instrumentation=None):
+        self.A = list(alphabet)
+        self.words = words if words is not None else WordTrie()
+        self.instr = instrumentation if instrumentation is not None else Instrumentation()
+        self.basis = [WordTrie.ROOT]
+        self._basis_set = {WordTrie.ROOT}
+        self.frontier = {}
+        self._watchers = {WordTrie.ROOT: set()}   # basis node -> checked frontier nodes it is a candidate of
+        self._checked = 0    # len(verdict) at the last candidate update
+        self._fresh = []     # frontier nodes not checked against any candidate yet
+        self._isolated = set()   # frontier nodes apart from the whole basis
+        self._witnesses = {}     # (basis, basis) -> separating suffix
+        self._ambiguous = set()  # frontier nodes with more than one candidate
+        self._below = {}         # suffix -> {frontier node g: node g·suffix} for the indexed outputs
+        self._add_frontier(WordTrie.ROOT)
+
+    def __len__(self):
+        return len(self.words.verdict)
+
+    def in_basis(self, h):
+        return h in self._basis_set
+
+    # ---------- checkpointing ----------
+    def checkpoint_state(self):
+        """Everything but the trie and instrumentation (saved / owned by the learner)."""
+        return {k: v for k, v in vars(self).items() if k not in ("words", "instr")}
+
+    def restore_state(self, state, words):
+        self.__dict__.update(state)
+        self.words = words
+        if "_ambiguous" not in state:
+            self._ambiguous = {f for f, cands in self.frontier.items() if len(cands) > 1}
+        if "_below" not in state:
+            self._below = {}
+            for f in self.frontier:
+                if f not in self._fresh:
+                    self._index(f)
+
+    # ---------- apartness ----------
+    def apart(self, p, q):
+        verdict, nexts = self.words.verdict, self.words._next
+        stack = [(p, q)]
+        while stack:
+            p, q = stack.pop()
+            vp = verdict.get(p)
+            if vp is not None:
+                vq = verdict.get(q)
+                if vq is not None and vp != vq:
+                    return True
+            np_, nq = nexts[p], nexts[q]
+            if len(nq) < len(np_):
+                for a, d in nq.items():
+                    c = np_.get(a)
+                    if c is not None:
+                        stack.append((c, d))
+            else:
+                for a, c in np_.items():
+                    d = nq.get(a)
+                    if d is not None:
+                        stack.append((c, d))
+        return False
+
+    def witness(self, p, q):
+        """
+        Shortest suffix separating p and q in the tree, or None if they are not apart.
+        For two basis nodes the first witness found is cached and reused.
+        """
+        basis = self._basis_set
+        if p in basis and q in basis:
+            key = (p, q) if p < q else (q, p)
+            w = self._witnesses.get(key)
+            if w is None:
+                w = self._witnesses[key] = self._shortest_witness(p, q)
+            return w
+        return self._shortest_witness(p, q)
+
+    def _shortest_witness(self, p, q):
+        verdict, nexts = self.words.verdict, self.words._next
+        queue = deque([(p, q, EMPTY)])
+        while queue:
+            p, q, w = queue.popleft()
+            vp = verdict.get(p)
+            if vp is not None:
+                vq = verdict.get(q)
+                if vq is not None and vp != vq:
+                    return w
+            nq = nexts[q]
+            for a, c in nexts[p].items():
+                d = nq.get(a)
+                if d is not None:
+                    queue.append((c, d, w + (a,)))
+        return None
+
+    # ---------- suffix index ----------
+    def _outputs(self, f):
+        """(node, suffix) for every output in f's subtree."""
+        verdict, nexts = self.words.verdict, self.words._next
+        out = []
+        stack = [(f, EMPTY)]
+        while stack:
+            n, u = stack.pop()
+            if n in verdict:
+                out.append((n, u))
+            for a, c in nexts[n].items():
+                stack.append((c, u + (a,)))
+        return out
+
+    def _index(self, f):
+        below = self._below
+        for n, u in self._outputs(f):
+            below.setdefault(u, {})[f] = n
+
+    def _unindex(self, f):
+        below = self._below
+        for _, u in self._outputs(f):
+            entry = below.get(u)
+            if entry is not None:
+                entry.pop(f, None)
+                if not entry:
+                    del below[u]
+
+    # ---------- basis / frontier ----------
+    def _add_frontier(self, b):
+        # every basis node is a candidate until the first check (watchers are set there)
+        words = self.words
+        for a in self.A:
+            f = words.child(b, a)
+            if f not in self._basis_set:
+                self.frontier[f] = list(self.basis)
+                if len(self.basis) > 1:
+                    self._ambiguous.add(f)
+                self._fresh.append(f)
+
+    def ambiguous(self):
+        """Frontier nodes with more than one candidate, in handle order."""
+        return sorted(self._ambiguous)
+
+    def unqueried(self):
+        """ROOT and the new frontier nodes (the only basis/frontier nodes that can lack an output)."""
+        verdict = self.words.verdict
+        return [h for h in [WordTrie.ROOT] + self._fresh if h not in verdict]
+
+    def promote(self, f):
+        """
+        Move frontier node f (apart from the whole basis) into the basis; called
+        right after update_candidates(), so every frontier output is indexed.
+        """
+        del self.frontier[f]
+        self._ambiguous.discard(f)
+        self._unindex(f)
+        self.basis.append(f)
+        self._basis_set.add(f)
+        watchers = self._watchers[f] = set()
+        verdict, below = self.words.verdict, self._below
+        apart = set()
+        for n, u in self._outputs(f):
+            v = verdict[n]
+            for g, m in below.get(u, {}).items():
+                if verdict[m] != v:
+                    apart.add(g)
+        for g, cands in self.frontier.items():
+            if g not in apart:
+                cands.append(f)
+                watchers.add(g)
+                if len(cands) > 1:
+                    self._ambiguous.add(g)
+        self._add_frontier(f)
+
+    def _drop(self, f, b):
+        cands = self.frontier[f]
+        cands.remove(b)
+        self._watchers[b].discard(f)
+        if len(cands) <= 1:
+            self._ambiguous.discard(f)
+
+    def update_candidates(self):
+        """
+        Drop candidates frontier nodes have become apart from; return the nodes left
+        with none. Only pairs with a new output below one of the two nodes since the
+        last update (or new frontier nodes) are re-checked.
+        """
+        verdict = self.words.verdict
+        frontier = self.frontier
+        if self._checked != len(verdict) or self._fresh:
+            self._isolated.update(self._recheck())
+        # nodes isolated earlier stay so until promoted (one promotion per call)
+        self._isolated = {f for f in self._isolated if f in frontier and not frontier[f]}
+        return sorted(self._isolated)
+
+    def _recheck(self):
+        """
+        Re-check the touched pairs; returns the frontier nodes whose candidates changed.
+        New frontier nodes are checked against their candidates in full. Otherwise a
+        pair (f, b) can only have become apart through a new output at f·w or b·w,
+        so for each new output h only the frontier / basis nodes on h's path are
+        visited, comparing h with the node at the same suffix below the other side.
+        """
+        verdict = self.words.verdict
+        with self.instr.phase("apartness"):
+            frontier = self.frontier
+            watchers = self._watchers
+            parent, sym, nexts = self.words._parent, self.words._sym, self.words._next
+
+            fresh = set(self._fresh)
+            self._fresh.clear()
+            apart = self.apart
+            for f in fresh:
+                vf = verdict.get(f)
+                leaf = not nexts[f]    # nothing below f yet: only its own output can differ
+                keep = []
+                for b in frontier[f]:
+                    if (vf is not None and verdict.get(b) not in (None, vf)) or (not leaf and apart(f, b)):
+                        watchers[b].discard(f)
+                    else:
+                        keep.append(b)
+                        watchers[b].add(f)
+                frontier[f] = keep
+                if len(keep) <= 1:
+                    self._ambiguous.discard(f)
+                self._index(f)
+            changed = set(fresh)
+            below = self._below
+
+            def differs(n, rev_suffix, v):
+                for a in reversed(rev_suffix):
+                    n = nexts[n].get(a)
+                    if n is None:
+                        return False
+                vn = verdict.get(n)
+                return vn is not None and vn != v
+
+            for h in islice(verdict, self._checked, None):
+                v = verdict[h]
+                rev_suffix = []     # symbols from the current ancestor down to h, reversed
+                n = h
+                while n >= 0:
+                    cands = frontier.get(n)
+                    if cands is not None:
+                        if n not in fresh:
+                            below.setdefault(tuple(reversed(rev_suffix)), {})[n] = h
+                            for b in [b for b in cands if differs(b, rev_suffix, v)]:
+                                self._drop(n, b)
+                                changed.add(n)
+                    else:
+                        ws = watchers.get(n)
+                        gs = below.get(tuple(reversed(rev_suffix))) if ws else None
+                        if gs:
+                            hits = [g for g in ws if g in gs] if len(ws) < len(gs) else [g for g in gs if g in ws]
+                            for g in hits:
+                                if g not in fresh and verdict[gs[g]] != v:
+                                    self._drop(g, n)
+                                    changed.add(g)
+                    rev_suffix.append(sym[n])
+                    n = parent[n]
+            self._checked = len(verdict)
+            return changed
@@ -1,5 +1,7 @@
 from .observation_table import ObservationTable
 from graphviz import Digraph
+from instrumentation import Instrumentation
+from dfa_io import PriorSeeds, restrict
 
 # my_lstar/dfa.py
 from graphviz import Digraph
@@ -28,6 +30,20 @@ class DFA:
                 return False
         return current_state in self.accepting
 
+    def accepts_many(self, sequences):
+        """accepts() for a batch of words (one pass, no per-word attribute lookups)."""
+        transitions, accepting, start = self.transitions, self.accepting, self.start_state
+        empty = {}
+        out = []
+        for seq in sequences:
+            s = start
+            for a in seq:
+                s = transitions.get(s, empty).get(a)
+                if s is None:
+                    break
+            out.append(s is not None and s in accepting)
+        return out
+
     def __repr__(self):
         return f"DFA(start={self.start_state}, #states={len(self.states)}, #accepting={len(self.accepting)})"
 
@@ -90,20 +106,114 @@ class DFA:
 
 
 class LStar:
-    def __init__(self, alphabet, membership_oracle, equivalence_oracle):
+    def __init__(self, alphabet, membership_oracle, equivalence_oracle, instrumentation=None, trace=None,
+                 words=None, checkpoint=None, prior=None, prune_every=None):
         self.alphabet = list(alphabet)
         self.mq = membership_oracle
         self.eq = equivalence_oracle
-        self.table = ObservationTable(self.alphabet)
+        self.instr = instrumentation if instrumentation is not None else Instrumentation()
+        self.trace = trace   # optional learning_trace.TraceRecorder
+        self.table = ObservationTable(self.alphabet, instrumentation=self.instr, words=words)
+        self.checkpoint = checkpoint   # optional checkpoint.Checkpoint
+        self.prior = prior             # optional DFA to warm-start from (dfa_io.load_dfa)
+        # drop redundant suffixes every prune_every rounds (None = never), see
+        # ObservationTable.reduce_suffixes()
+        self.prune_every = prune_every
+
+    @property
+    def words(self):
+        return self.table.words
+
+    # ---------- checkpointing ----------
+    def checkpoint_state(self, words_only=False):
+        if words_only:
+            return {"words": self.words}
+        return {"words": self.words, "table": self.table.checkpoint_state()}
+
+    def restore_state(self, state):
+        if "table" in state:
+            self.table.restore_state(state["table"], state["words"])
+        else:
+            # answers only: a fresh table over the saved trie
+            self.table = ObservationTable(self.alphabet, instrumentation=self.instr, words=state["words"])
+
+    # ---------- warm start ----------
+    def _seed_table(self):
+        """P: the prior's access words it still trusts; S: its characterizing set."""
+        seeds = self.words.seeds
+        if seeds is not None and seeds.active:
+            with self.instr.phase("warm_start"):
+                self.table.seed([u for u in seeds.access if seeds.trusted(u)], seeds.suffixes)
+
+    def _discard_seeds(self, counterexample):
+        """Check the prior's seed behind counterexample; if it was wrong, rebuild the table without it."""
+        seeds = self.words.seeds
+        if seeds is None:
+            return False
+        with self.instr.phase("counterexample"):
+            if not seeds.check(self.words, counterexample, self.mq):
+                return False
+            self.instr.count("prior_discards")
+            self.table = ObservationTable(self.alphabet, instrumentation=self.instr, words=self.words)
+            self._seed_table()
+            self.table.init_table(self.mq)
+        return True
+
+    def _trace_round(self, hypothesis, counterexample):
+        if self.trace is None:
+            return
+        self.trace.record(
+            hyp_states=len(hypothesis.states),
+            ce_len=None if counterexample is None else len(counterexample),
+            P=len(self.table.P),
+            S=len(self.table.S),
+        )
 
     def learn(self):
-        # Initialization
+        if self.checkpoint is None:
+            return self._learn()
+        resumed = self.checkpoint.resume(self)
+        if resumed:
+            self.instr.count("resumed")
+        try:
+            return self._learn(resumed=resumed)
+        except BaseException:
+            self.checkpoint.save_progress(self)
+            raise
+
+    def _learn(self, resumed=False):
+        instr = self.instr
+        if self.trace is not None:
+            self.trace.start(append=resumed)   # a resumed run continues its trace file
+
+        # Initialization. A prior model is first offered as the hypothesis; if the
+        # equivalence oracle finds a counterexample, P and S are seeded with its access
+        # words and characterizing set, its outputs answering the table where trusted.
+        if self.prior is not None and self.words.seeds is None:
+            prior = DFA(**restrict(self.prior, self.alphabet))
+            instr.count("rounds")
+            with instr.phase("equivalence_round"):
+                counterexample = self.eq(prior)
+            self._trace_round(prior, counterexample)
+            if counterexample is None:
+                instr.count("prior_confirmed")
+                return prior
+            PriorSeeds(self.prior, self.alphabet).attach(self.words)
+        if self.table.P == [()]:
+            self._seed_table()
         self.table.init_table(self.mq)
+        hypothesis_version = None
+        hypothesis = None
 
+        rounds = 0
         while True:
+            rounds += 1
+            instr.count("rounds")
             while True:
-                is_closed, p = self.table.closed()
-                is_consistent, _, s = self.table.consistent()
+                with instr.phase("closedness"):
+                    is_closed, p = self.table.closed()
+                with instr.phase("consistency"):
+                    is_consistent, _, s = self.table.consistent()
 
                 if is_closed and is_consistent:
                     break
@@ -112,23 +222,41 @@ class LStar:
                 if not is_consistent:
                     self.table.add_suffix(s, self.mq)
 
-            # Generate DFA
-            hypothesis_dict = self.table.to_dfa()
+            if self.prune_every and rounds % self.prune_every == 0:
+                self.table.reduce_suffixes()
+
+            # Generate DFA (only when the table's row classes changed)
+            with instr.phase("hypothesis_build"):
+                hypothesis_dict = self.table.to_dfa()
 
-            hypothesis = DFA(
-                states=hypothesis_dict["states"],
-                transitions=hypothesis_dict["transitions"],
-                start_state=hypothesis_dict["start_state"],
-                accepting=hypothesis_dict["accepting"]
-            )
+                if self.table.hypothesis_version != hypothesis_version:
+                    hypothesis_version = self.table.hypothesis_version
+                    hypothesis = DFA(
+                        states=hypothesis_dict["states"],
+                        transitions=hypothesis_dict["transitions"],
+                        start_state=hypothesis_dict["start_state"],
+                        accepting=hypothesis_dict["accepting"]
+                    )
+                else:
+                    instr.count("hypothesis_reused")
+
+            if self.checkpoint is not None:
+                self.checkpoint.save(self)
 
             # Get counterexample
-            counterexample = self.eq(hypothesis)
+            with instr.phase("equivalence_round"):
+                counterexample = self.eq(hypothesis)
+            self._trace_round(hypothesis, counterexample)
 
             if counterexample is None:
                 # all good, Finish
                 return hypothesis
 
-            # Find counterexample
-            self.table.add_counterexample(counterexample, self.mq)
+            # A wrong seed from the prior: start over on the real answers
+            if self._discard_seeds(counterexample):
+                hypothesis_version = None
+                continue
 
+            # Find counterexample
+            with instr.phase("counterexample"):
+                self.table.add_counterexample(counterexample, self.mq)
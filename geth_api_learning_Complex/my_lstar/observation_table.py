@@ -1,9 +1,34 @@
+from instrumentation import Instrumentation
+from words import EMPTY, WordTrie, as_word
+
+
 class ObservationTable:
-    def __init__(self, alphabet):
+    """
+    Words are tuples of symbols (words.py), so any hashable symbol works (single
+    letters, interned int ids from api_alphabet.Alphabet, ...).
+    """
+
+    def __init__(self, alphabet, instrumentation=None, words=None):
         self.A = list(alphabet)  # alphabet
-        self.P = ['']            # prefixes
-        self.S = ['']            # suffixes
-        self._T = {}             # table[p][s] -> {0,1}
+        self.P = [EMPTY]         # prefixes
+        self.S = [EMPTY]         # suffixes
+        self._P_set = {EMPTY}
+        self._S_set = {EMPTY}
+        self._T = {}             # table[p][s] -> {0,1}, rows = P ∪ P·A
+        # query words + MQ cache; cell p.s is found by walking s from p's handle
+        self.words = words if words is not None else WordTrie()
+        self._handle = {}        # row word -> trie handle
+        # filled incrementally: new rows get every suffix, new suffixes every row
+        self._new_rows = []
+        self._new_suffixes = []
+        self._row = {}           # p -> row tuple (state), kept in step with _T
+        # hypothesis view of the table, updated in to_dfa() (see there)
+        self._hyp = None
+        self._hyp_P = 0          # prefixes already folded into _hyp
+        self._hyp_S = 0          # |S| _hyp was built with
+        self.hypothesis_version = 0
+        self.instr = instrumentation if instrumentation is not None else Instrumentation()
+        self._add_rows(EMPTY, WordTrie.ROOT)
 
     # ---------- basic access ----------
     def cell(self, p, s):
@@ -11,63 +36,150 @@ class ObservationTable:
 
     def state(self, p):
         """return a row of tuple，marking the state of DFA"""
-        return tuple(self.cell(p, s) for s in self.S)
+        return self._row[p]
+
+    def _add_row(self, p, h):
+        if p not in self._T:
+            self._T[p] = {}
+            self._handle[p] = h
+            self._new_rows.append(p)
+
+    def _add_rows(self, p, h):
+        """Row p and its one-symbol extensions p·a."""
+        self._add_row(p, h)
+        h = self._handle[p]
+        for a in self.A:
+            self._add_row(p + (a,), self.words.child(h, a))
 
     # ---------- initialization ----------
+    def seed(self, prefixes, suffixes):
+        """Add prefixes (prefix-closed, e.g. a prior model's access words) and suffixes; filled by init_table()."""
+        for s in map(as_word, suffixes):
+            if s not in self._S_set:
+                self.S.append(s)
+                self._S_set.add(s)
+                self._new_suffixes.append(s)
+        for p in map(as_word, prefixes):
+            if p not in self._P_set:
+                self.P.append(p)
+                self._P_set.add(p)
+                self._add_rows(p, self.words.insert(p))
+
     def init_table(self, oracle):
-        self._T[''] = {'': oracle('')}
         self.update_table(oracle)
 
     def update_table(self, oracle):
-        def uniq(xs):
-            return list(dict.fromkeys(xs))
-
-        rows = self.P
-        aux = [p + a for p in self.P for a in self.A]
-        all_rows = uniq(rows + aux)
-
-        for p in all_rows:
-            if p not in self._T:
-                self._T[p] = {}
-            for s in self.S:
-                if s not in self._T[p]:
-                    self._T[p][s] = oracle(p + s)
+        words = self.words
+        handle = self._handle
+        with self.instr.phase("table_fill"):
+            filled = 0
+            new_s = self._new_suffixes
+            for s in new_s:
+                for p, row in self._T.items():
+                    if s not in row:
+                        row[s] = words.query(words.extend(handle[p], s), oracle)
+                        filled += 1
+            if new_s:
+                # S only grows at the end: extend the cached row tuples
+                for p, r in self._row.items():
+                    row = self._T[p]
+                    self._row[p] = r + tuple(row[s] for s in new_s)
+            for p in self._new_rows:
+                row = self._T[p]
+                hp = handle[p]
+                for s in self.S:
+                    if s not in row:
+                        row[s] = words.query(words.extend(hp, s), oracle)
+                        filled += 1
+                self._row[p] = tuple(row[s] for s in self.S)
+            self._new_suffixes.clear()
+            self._new_rows.clear()
+            self.instr.count("table_cells", filled)
 
     # ---------- closedness ----------
     def closed(self):
         states_in_P = {self.state(p) for p in self.P}
         for p in self.P:
             for a in self.A:
-                pa = p + a
+                pa = p + (a,)
                 if self.state(pa) not in states_in_P:
                     return False, pa
         return True, None
 
     def add_prefix(self, p, oracle):
-        if p in self.P:
+        p = as_word(p)
+        if p in self._P_set:
             return
         self.P.append(p)
+        self._P_set.add(p)
+        self._add_rows(p, self.words.insert(p))
         self.update_table(oracle)
 
     # ---------- consistency ----------
     def consistent(self):
-        for p1 in self.P:
-            for p2 in self.P:
-                if p1 == p2:
-                    continue
-                if self.state(p1) == self.state(p2):
-                    for a in self.A:
+        # only prefixes with equal rows need checking: group P by row first
+        groups = {}
+        for p in self.P:
+            groups.setdefault(self.state(p), []).append(p)
+
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            p1 = members[0]
+            for a in self.A:
+                row1 = self.state(p1 + (a,))
+                for p2 in members[1:]:
+                    if self.state(p2 + (a,)) != row1:
                         for s in self.S:
-                            if self.cell(p1 + a, s) != self.cell(p2 + a, s):
-                                return False, (p1, p2), a + s
+                            if self.cell(p1 + (a,), s) != self.cell(p2 + (a,), s):
+                                return False, (p1, p2), (a,) + s
         return True, None, None
 
     def add_suffix(self, s, oracle):
-        if s in self.S:
+        s = as_word(s)
+        if s in self._S_set:
             return
         self.S.append(s)
+        self._S_set.add(s)
+        self._new_suffixes.append(s)
         self.update_table(oracle)
 
+    # ---------- suffix reduction ----------
+    def _classes(self, cols):
+        """Number of distinct P rows over the column indices cols."""
+        return len({tuple(r[i] for i in cols) for r in (self._row[p] for p in self.P)})
+
+    def reduce_suffixes(self):
+        """
+        Drop suffixes not needed to tell the rows of P apart, newest first (ε is
+        kept). The P row classes are unchanged, so a closed, consistent table stays
+        so and gives the same hypothesis; new rows are no longer filled for the
+        dropped columns. Their cells stay cached in case a consistency check adds a
+        suffix back. Returns the dropped suffixes.
+        """
+        if self._new_suffixes or self._new_rows or len(self.S) < 2:
+            return []
+        with self.instr.phase("suffix_reduction"):
+            S = self.S
+            keep = list(range(len(S)))
+            n = self._classes(keep)
+            for i in range(len(S) - 1, 0, -1):
+                cols = [j for j in keep if j != i]
+                if self._classes(cols) == n:
+                    keep = cols
+            if len(keep) == len(S):
+                return []
+
+            kept = set(keep)
+            dropped = [s for i, s in enumerate(S) if i not in kept]
+            self.S = [S[i] for i in keep]
+            self._S_set = set(self.S)
+            for p, r in self._row.items():
+                self._row[p] = tuple(r[i] for i in keep)
+            self._hyp = None    # states are row tuples: rebuild on the next to_dfa()
+            self.instr.count("suffixes_pruned", len(dropped))
+            return dropped
+
     # ---------- hypothesis construction ----------
     def to_dfa(self):
         """
@@ -78,36 +190,63 @@ class ObservationTable:
             "accepting": [...],
             "transitions": {state: {symbol: next_state}}
         }
+
+        The hypothesis is kept as an incremental view of the table: a new suffix can
+        split any row class and forces a rebuild, but new prefixes only add states
+        (with their transitions) when their row is new. hypothesis_version changes
+        only when the row classes did; otherwise the previous dict is returned.
         """
-        # Using tuples describe states
-        states_map = {}  # tuple(row) -> p state
-        for p in self.P:
+        with self.instr.phase("hypothesis_update"):
+            if self._hyp is None or self._hyp_S != len(self.S):
+                self._rebuild_hypothesis()
+            elif self._hyp_P < len(self.P):
+                self._extend_hypothesis()
+            return self._hyp
+
+    def _rebuild_hypothesis(self):
+        self._states_map = {}  # tuple(row) -> p state
+        self._transitions = {}
+        self._accepting = []
+        self._hyp_S = len(self.S)
+        self._hyp_P = 0
+        self._extend_hypothesis(force=True)
+
+    def _extend_hypothesis(self, force=False):
+        states_map = self._states_map
+        changed = force
+        for p in self.P[self._hyp_P:]:
             st = self.state(p)
-            if st not in states_map:
-                states_map[st] = p  # marking state
+            if st in states_map:
+                continue
+            states_map[st] = p  # marking state
+            if self.cell(p, EMPTY) == 1:
+                self._accepting.append(st)
+            self._transitions[st] = {a: self.state(p + (a,)) for a in self.A}
+            changed = True
+        self._hyp_P = len(self.P)
+        if not changed:
+            return
 
-        states = list(states_map.keys())
-        start_state = self.state('')
+        self.hypothesis_version += 1
+        # fresh outer containers per version: earlier hypotheses stay unchanged
+        self._hyp = {
+            "states": list(states_map.keys()),
+            "start_state": self.state(EMPTY),
+            "accepting": list(self._accepting),
+            "transitions": dict(self._transitions)
+        }
 
-        # accept state
-        accepting = [st for st, p in states_map.items() if self.cell(p, '') == 1]
+    # ---------- checkpointing ----------
+    def checkpoint_state(self):
+        """Everything but the trie and instrumentation (saved / owned by the learner)."""
+        return {k: v for k, v in vars(self).items() if k not in ("words", "instr")}
 
-        # transitions
-        transitions = {}
-        for st, p in states_map.items():
-            transitions[st] = {}
-            for a in self.A:
-                next_state = self.state(p + a)
-                transitions[st][a] = next_state
-
-        return {
-            "states": states,
-            "start_state": start_state,
-            "accepting": accepting,
-            "transitions": transitions
-        }
+    def restore_state(self, state, words):
+        self.__dict__.update(state)
+        self.words = words
 
     # ---------- counterexample handling ----------
     def add_counterexample(self, ce, oracle):
+        ce = as_word(ce)
         for i in range(1, len(ce) + 1):
             self.add_prefix(ce[:i], oracle)
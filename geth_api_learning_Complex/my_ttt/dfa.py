@@ -23,6 +23,11 @@ class DFA:
         else:
             self.state_repr = state_repr
 
+    @property
+    def start_state(self):
+        """The start state under my_lstar.DFA's name, so callers can take either class."""
+        return self.start
+
     def __repr__(self):
         return f"DFA(start={self.start}, #states={len(self.states)}, #accepting={len(self.accepting)})"
 
@@ -34,6 +39,20 @@ class DFA:
                 return False
         return s in self.accepting
 
+    def accepts_many(self, sequences):
+        """accepts() for a batch of words (one pass, no per-word attribute lookups)."""
+        transitions, accepting, start = self.transitions, self.accepting, self.start
+        empty = {}
+        out = []
+        for seq in sequences:
+            s = start
+            for a in seq:
+                s = transitions.get(s, empty).get(a)
+                if s is None:
+                    break
+            out.append(s is not None and s in accepting)
+        return out
+
     def visualize(self, filename="dfa_ttt", title="Learned DFA (TTT)",
                   accept_label="accept: snapshot complete", reject_label="reject"):
         """
@@ -1,118 +1,326 @@
 # my_ttt/learner.py
 from my_ttt.dfa import DFA
 from my_ttt.node import DTNode
+from instrumentation import Instrumentation
+from dfa_io import PriorSeeds, restrict
+from words import EMPTY, WordTrie, as_word
 
 
 class TTTLearner:
-    def __init__(self, alphabet, membership_oracle, equivalence_oracle):
+    def __init__(self, alphabet, membership_oracle, equivalence_oracle, instrumentation=None, trace=None,
+                 words=None, membership_many=None, checkpoint=None, prior=None):
         self.A = list(alphabet)
         self.mq_raw = membership_oracle
+        self.mq_many = membership_many   # optional batch oracle: list of words -> list of bools
         self.eq = equivalence_oracle
+        self.instr = instrumentation if instrumentation is not None else Instrumentation()
+        self.trace = trace   # optional learning_trace.TraceRecorder
 
-        self.root = DTNode([], is_leaf=False)
+        self.root = DTNode(EMPTY, is_leaf=False)
         self.states = {}
-
-        # MQ cache: tuple(seq) -> bool
-        self._mq_cache = {}
+        # discriminators interned: nodes split by the same suffix share one tuple
+        self._discs = {}
+
+        # query words + MQ cache (handle -> bool); may be shared with other learners
+        self.words = words if words is not None else WordTrie()
+        # sift memo: handle -> node the word last reached. Splits turn a leaf into an
+        # inner node in place, so a re-sift resumes there instead of at the root.
+        self._sifted = {}
+        self.checkpoint = checkpoint   # optional checkpoint.Checkpoint
+        self._resumed = False
+        self.prior = prior             # optional DFA to warm-start from (dfa_io.load_dfa)
 
     # ---------- utilities ----------
-    def _to_list(self, seq):
-        if seq is None:
-            return []
-        if isinstance(seq, list):
-            return seq
-        if isinstance(seq, tuple):
-            return list(seq)
-        if isinstance(seq, str):
-            return list(seq)
-        return list(seq)
-
-    def mq(self, seq):
-        seq_list = self._to_list(seq)
-        key = tuple(seq_list)
-        if key in self._mq_cache:
-            return self._mq_cache[key]
-        ans = bool(self.mq_raw(seq_list))
-        self._mq_cache[key] = ans
-        return ans
+    # Words are tuples (see words.py); only counterexamples coming from the
+    # equivalence oracle are converted, once, with as_word(). The sift / build_dfa
+    # hot paths work on WordTrie handles instead of concatenating tuples.
+    def mq(self, word):
+        return self.words.query(self.words.insert(word), self.mq_raw)
+
+    def _query_many(self, handles):
+        """Fill the MQ cache for handles; uncached ones go out in one membership_many() call."""
+        if self.words.query_many(handles, self.mq_raw, self.mq_many):
+            self.instr.count("mq_batches")
 
     # ---------- discrimination tree ----------
-    def sift(self, seq):
-        seq = self._to_list(seq)
-        node = self.root
-        while not node.is_leaf():
-            d = node.discriminator if node.discriminator is not None else []
-            res = self.mq(seq + d)
-            if res not in node.children:
-                node.children[res] = DTNode([], is_leaf=True)
-                node.children[res].rep = []
-                self.states[node.children[res]] = []
-            node = node.children[res]
-        return node
+    def _child(self, node, res, h):
+        """Child of node for verdict res; a new leaf gets the sifted word (handle h) as its rep."""
+        child = node.true if res else node.false
+        if child is None:
+            rep = self.words.word(h)
+            child = DTNode(rep, is_leaf=True)
+            node.set_child(res, child)
+            self.states[child] = rep
+        return child
+
+    def sift(self, word):
+        return self.sift_handle(self.words.insert(word))
+
+    def sift_handle(self, h):
+        with self.instr.phase("sift"):
+            words = self.words
+            verdict, nexts = words.verdict, words._next
+            node = self._sifted.get(h, self.root)
+            disc = node.discriminator
+            while disc is not None:
+                q = h
+                for a in disc:   # inlined words.extend(h, discriminator)
+                    c = nexts[q].get(a)
+                    q = c if c is not None else words.child(q, a)
+                res = verdict.get(q)
+                if res is None:
+                    res = words.query(q, self.mq_raw)
+                child = node.true if res else node.false
+                node = child if child is not None else self._child(node, res, h)
+                disc = node.discriminator
+            self._sifted[h] = node
+            return node
+
+    def sift_many(self, handles):
+        """
+        Sift several words (trie handles) level by level: each round asks the MQs of
+        every word still at an inner node in one batch (see _query_many), so a whole
+        frontier costs about tree-depth oracle round-trips. Returns the leaves in order.
+        """
+        with self.instr.phase("sift"):
+            words = self.words
+            verdict = words.verdict
+            memo = self._sifted
+            nodes = [memo.get(h, self.root) for h in handles]
+            active = [i for i, node in enumerate(nodes) if node.discriminator is not None]
+            while active:
+                self.instr.count("sift_levels")
+                queries = [words.extend(handles[i], nodes[i].discriminator) for i in active]
+                self._query_many(queries)
+                still = []
+                for i, q in zip(active, queries):
+                    node = nodes[i] = self._child(nodes[i], verdict[q], handles[i])
+                    if node.discriminator is not None:
+                        still.append(i)
+                active = still
+            for h, node in zip(handles, nodes):
+                memo[h] = node
+            return nodes
+
+    def tree_stats(self):
+        """Return (depth, #leaves) of the discrimination tree."""
+        depth = 0
+        leaves = 0
+        stack = [(self.root, 0)]
+        while stack:
+            node, d = stack.pop()
+            if node.is_leaf():
+                leaves += 1
+                depth = max(depth, d)
+                continue
+            for _, child in node.children():
+                stack.append((child, d + 1))
+        return depth, leaves
+
+    def _trace_round(self, hypothesis, ce):
+        if self.trace is None:
+            return
+        depth, leaves = self.tree_stats()
+        self.trace.record(
+            hyp_states=len(hypothesis.states),
+            ce_len=None if ce is None else len(ce),
+            dt_depth=depth,
+            dt_leaves=leaves,
+        )
 
     def _ensure_leaf_rep(self, leaf):
         if getattr(leaf, "rep", None) is None:
-            leaf.rep = []
+            leaf.rep = EMPTY
         return leaf.rep
 
+    # ---------- checkpointing ----------
+    def checkpoint_state(self, words_only=False):
+        """
+        The discrimination tree as a flat node list (index 0 = root, children by
+        index), so pickling does not recurse along the tree.
+        """
+        if words_only:
+            return {"words": self.words}
+        nodes = []
+        ids = {}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            ids[node] = len(nodes)
+            nodes.append(node)
+            stack.extend(c for _, c in node.children())
+        return {
+            "words": self.words,
+            "tree": [(n.is_leaf(), n.rep, n.discriminator, {res: ids[c] for res, c in n.children()})
+                     for n in nodes],
+            "states": [(ids[leaf], rep) for leaf, rep in self.states.items() if leaf in ids],
+            "sifted": {h: ids[n] for h, n in self._sifted.items() if n in ids},
+        }
+
+    def restore_state(self, state):
+        self.words = state["words"]
+        if "tree" not in state:
+            return   # answers only: learn() starts over, on the saved MQ cache
+        nodes = []
+        self._discs = {}
+        for is_leaf, rep, disc, _ in state["tree"]:
+            node = DTNode(rep if is_leaf else self._intern(disc), is_leaf=is_leaf)
+            node.rep = rep
+            nodes.append(node)
+        for node, (_, _, _, children) in zip(nodes, state["tree"]):
+            for res, i in children.items():
+                node.set_child(res, nodes[i])
+        self.root = nodes[0]
+        self.states = {nodes[i]: rep for i, rep in state["states"]}
+        self._sifted = {h: nodes[i] for h, i in state["sifted"].items()}
+        self._resumed = True
+
     # ---------- main learning loop ----------
     def learn(self, max_rounds=300, max_refinements=80):
-        # init leaves for True/False
-        true_leaf = DTNode([], is_leaf=True)
-        false_leaf = DTNode([], is_leaf=True)
-
-        false_leaf.rep = []
-
-        # try find a short True witness for true_leaf
-        true_witness = None
-        for a in self.A:
-            if self.mq([a]) is True:
-                true_witness = [a]
-                break
-        if true_witness is None:
-            # fallback: leave empty; refinement will fix later
-            true_witness = []
-
-        true_leaf.rep = true_witness
+        """max_rounds / max_refinements: safety limits for live nodes (None = unbounded)."""
+        if self.checkpoint is None:
+            return self._learn(max_rounds, max_refinements)
+        resumed = self.checkpoint.resume(self)
+        if resumed:
+            self.instr.count("resumed")
+        try:
+            return self._learn(max_rounds, max_refinements, resumed=resumed)
+        except BaseException:
+            self.checkpoint.save_progress(self)
+            raise
+
+    def _learn(self, max_rounds, max_refinements, resumed=False):
+        if self.trace is not None:
+            self.trace.start(append=resumed)   # a resumed run continues its trace file
+
+        if self.prior is not None and self.words.seeds is None:
+            # a prior model is offered as the first hypothesis: unchanged, it is
+            # only verified; otherwise it seeds the tree (see _warm_start)
+            prior = DFA(**restrict(self.prior, self.A))
+            self.instr.count("rounds")
+            with self.instr.phase("equivalence_round"):
+                ce = self.eq(prior)
+            self._trace_round(prior, ce)
+            if ce is None:
+                self.instr.count("prior_confirmed")
+                return prior
+            PriorSeeds(self.prior, self.A).attach(self.words)
 
-        self.root.children = {True: true_leaf, False: false_leaf}
-        self.states = {true_leaf: true_leaf.rep, false_leaf: false_leaf.rep}
+        if not self._resumed:
+            self._init_tree()
 
         rounds = 0
         refinements = 0
+        instr = self.instr
 
         while True:
             rounds += 1
-            if rounds > max_rounds:
+            instr.count("rounds")
+            if max_rounds is not None and rounds > max_rounds:
                 print(f"[TTT] stop: round limit {max_rounds}")
                 return self.build_dfa()
 
-            hypothesis = self.build_dfa()
-            ce = self.eq(hypothesis)
+            with instr.phase("hypothesis_build"):
+                hypothesis = self.build_dfa()
+            if self.checkpoint is not None:
+                self.checkpoint.save(self)
+            with instr.phase("equivalence_round"):
+                ce = self.eq(hypothesis)
+            self._trace_round(hypothesis, ce)
 
             if ce is None:
                 return hypothesis
+            if self._discard_seeds(ce):
+                continue
 
-            ce_list = self._to_list(ce)
-
-            ok = self.refine(ce_list)
+            with instr.phase("counterexample"):
+                ok = self.refine(as_word(ce), hypothesis)
             if not ok:
                 print("[TTT] refine failed (no separating split); returning best-effort DFA")
                 return self.build_dfa()
 
             refinements += 1
-            if refinements >= max_refinements:
+            if max_refinements is not None and refinements >= max_refinements:
                 print(f"[TTT] stop: refinement limit {max_refinements}")
                 return self.build_dfa()
 
+    def _init_tree(self):
+        """
+        Init leaves for True/False: ε is the rep of its own leaf, and a one-symbol
+        word with the opposite verdict (if any) of the other one. With a prior
+        attached, its access words are sifted in (see _warm_start).
+        """
+        eps = self.mq(EMPTY)
+        eps_leaf = DTNode(EMPTY, is_leaf=True)
+        self.root.true = self.root.false = None
+        self.root.set_child(eps, eps_leaf)
+        self.states = {eps_leaf: EMPTY}
+
+        for a in self.A:
+            if self.mq((a,)) != eps:
+                # otherwise the leaf is created by the first sift that reaches it
+                other_leaf = DTNode((a,), is_leaf=True)
+                self.root.set_child(not eps, other_leaf)
+                self.states[other_leaf] = (a,)
+                break
+        self._warm_start()
+
+    # ---------- warm start ----------
+    def _warm_start(self):
+        """
+        Seed the tree from the prior: sift its trusted access words (shortest
+        first), and where one lands on a leaf with another rep, split that leaf
+        with a suffix of the prior's characterizing set, those the prior says
+        separate the two words first. A word no suffix separates is the same state.
+        """
+        seeds = self.words.seeds
+        if seeds is None or not seeds.active:
+            return
+        with self.instr.phase("warm_start"):
+            for u in seeds.access:
+                if not seeds.trusted(u):
+                    continue
+                leaf = self.sift(u)
+                rep = self._ensure_leaf_rep(leaf)
+                if rep == u:
+                    continue
+                ranked = sorted(seeds.suffixes, key=lambda w: seeds.accepts(u + w) == seeds.accepts(rep + w))
+                for w in ranked:
+                    if self.mq(u + w) != self.mq(rep + w):
+                        self.instr.count("warm_splits")
+                        self._split_leaf(leaf, u, rep, w)
+                        break
+
+    def _discard_seeds(self, ce):
+        """Check the prior's seed behind ce; if it was wrong, rebuild the tree without it."""
+        seeds = self.words.seeds
+        if seeds is None:
+            return False
+        with self.instr.phase("counterexample"):
+            if not seeds.check(self.words, ce, self.mq_raw):
+                return False
+            self.instr.count("prior_discards")
+            self.root = DTNode(EMPTY, is_leaf=False)
+            self._discs = {}
+            self._sifted = {}
+            self._init_tree()
+        return True
+
     # ---------- refinement ----------
-    def refine(self, ce):
+    def refine(self, ce, hypothesis=None):
         """
         refine:
+        0) With the hypothesis at hand, binary-search the counterexample for the
+           breakpoint (Rivest–Schapire) and split exactly there
         1) Frist, check 1-step discriminator [a]
         2) If that fails, try using the suffix ce[i:] of counterexample as the discriminator (which is stronger).
         """
-        ce = self._to_list(ce)
+        ce = as_word(ce)
+
+        if hypothesis is not None and self._refine_rivest_schapire(ce, hypothesis):
+            self.instr.count("refine_binary_search")
+            return True
+        self.instr.count("refine_linear")
 
         # Pass 1: your original 1-step split
         for i in range(len(ce) + 1):
@@ -121,8 +329,8 @@ class TTTLearner:
             rep = self._ensure_leaf_rep(leaf)
 
             for a in self.A:
-                if self.mq(prefix + [a]) != self.mq(rep + [a]):
-                    disc = [a]
+                if self.mq(prefix + (a,)) != self.mq(rep + (a,)):
+                    disc = (a,)
                     return self._split_leaf(leaf, prefix, rep, disc)
 
         # Pass 2: suffix-based discriminator (key improvement)
@@ -141,78 +349,108 @@ class TTTLearner:
 
             # Check if suffix distinguishes prefix vs rep
             if self.mq(prefix + suffix) != self.mq(rep + suffix):
-                disc = suffix[:]  # use full suffix as discriminator
+                disc = suffix  # use full suffix as discriminator
                 return self._split_leaf(leaf, prefix, rep, disc)
 
         return False
 
-    def _split_leaf(self, leaf, rep1, rep2, disc):
-        rep1 = list(rep1)
-        rep2 = list(rep2)
-        disc = list(disc)
+    def _access(self, hypothesis, word):
+        """⌊word⌋: access sequence (leaf rep) of the hypothesis state reached by word."""
+        st = hypothesis.start
+        for a in word:
+            st = hypothesis.transitions.get(st, {}).get(a)
+            if st is None:
+                return None
+        return st
 
+    def _refine_rivest_schapire(self, ce, hypothesis):
+        """
+        alpha(i) = mq(⌊ce[:i]⌋ + ce[i:]); alpha(0) = mq(ce) differs from
+        alpha(n) = hypothesis(ce), so some i has alpha(i) != alpha(i+1), found in
+        O(log |ce|) MQs. Then u = ⌊ce[:i]⌋, a = ce[i], v = ce[i+1:]: u·a reaches the
+        state of rep = ⌊ce[:i+1]⌋ in the hypothesis, yet v separates u·a from rep.
+        """
+        n = len(ce)
+        access = [self._access(hypothesis, ce[:i]) for i in range(n + 1)]
+        if any(u is None for u in access):
+            return False
+
+        def alpha(i):
+            return self.mq(access[i] + ce[i:])
+
+        lo, hi = 0, n
+        a_lo, a_hi = alpha(lo), alpha(hi)
+        if a_lo == a_hi:
+            return False    # not a counterexample for this hypothesis
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if alpha(mid) == a_lo:
+                lo = mid
+            else:
+                hi = mid
+
+        new_rep = access[lo] + (ce[lo],)
+        leaf = self.sift(new_rep)
+        rep = self._ensure_leaf_rep(leaf)
+        if rep != access[lo + 1] or rep == new_rep:
+            return False
+        return self._split_leaf(leaf, new_rep, rep, ce[lo + 1:])
+
+    def _split_leaf(self, leaf, rep1, rep2, disc):
         b1 = self.mq(rep1 + disc)
         b2 = self.mq(rep2 + disc)
 
         if b1 == b2:
             return False
 
-        new_node = DTNode(disc, is_leaf=False)
-
         child1 = DTNode(rep1, is_leaf=True)
-        child1.rep = rep1
         child2 = DTNode(rep2, is_leaf=True)
-        child2.rep = rep2
+        leaf.split(self._intern(disc), b1, child1, child2)
+        self.states.pop(leaf, None)   # now an inner node
 
-        new_node.children[b1] = child1
-        new_node.children[b2] = child2
-
-        leaf.become(new_node)
-
-        if child1 not in self.states:
-            self.states[child1] = child1.rep
-        if child2 not in self.states:
-            self.states[child2] = child2.rep
+        self.states[child1] = rep1
+        self.states[child2] = rep2
 
         return True
 
+    def _intern(self, disc):
+        return self._discs.setdefault(disc, disc)
+
     # ---------- DFA construction ----------
+    def _transitions(self, states):
+        """Yield (state, {symbol: target rep}) with all state·a words sifted together."""
+        words = self.words
+        targets = [words.child(words.insert(st), a) for st in states for a in self.A]
+        leaves = iter(self.sift_many(targets))
+        for st in states:
+            yield st, {a: self._ensure_leaf_rep(next(leaves)) for a in self.A}
+
     def build_dfa(self):
-        accepting = set()
         transitions = {}
         all_states = set()
 
         # collect states from current leaves
         for leaf, rep in list(self.states.items()):
-            rep = self._to_list(rep)
             leaf.rep = rep
-            st = tuple(rep)
-            all_states.add(st)
-            if self.mq(rep):
-                accepting.add(st)
+            all_states.add(rep)
 
-        start = tuple([])
+        start = EMPTY
         all_states.add(start)
 
-        # transitions
-        for st in list(all_states):
-            st_list = list(st)
-            transitions[st] = {}
-            for a in self.A:
-                t_leaf = self.sift(st_list + [a])
-                t_rep = self._ensure_leaf_rep(t_leaf)
-                transitions[st][a] = tuple(t_rep)
-                all_states.add(tuple(t_rep))
-
-        # one more closure pass (bounded)
-        for st in list(all_states):
-            if st not in transitions:
-                st_list = list(st)
-                transitions[st] = {}
-                for a in self.A:
-                    t_leaf = self.sift(st_list + [a])
-                    t_rep = self._ensure_leaf_rep(t_leaf)
-                    transitions[st][a] = tuple(t_rep)
+        # transitions: one trie step per (state, symbol), each frontier sifted as one
+        # batch; sifting may discover new leaves, whose reps are closed over as well
+        frontier = list(all_states)
+        while frontier:
+            found = []
+            for st, t_rep in self._transitions(frontier):
+                transitions[st] = t_rep
+                found.extend(t_rep.values())
+            frontier = [st for st in dict.fromkeys(found) if st not in transitions]
+
+        words = self.words
+        reps = {st: words.insert(st) for st in transitions}
+        self._query_many(list(reps.values()))
+        accepting = {st for st, h in reps.items() if words.verdict[h]}
 
         return DFA(
             states=set(transitions.keys()),
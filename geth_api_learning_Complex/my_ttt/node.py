@@ -2,51 +2,55 @@
 
 class DTNode:
     """
-    Discrimination Tree Node.
+    Discrimination Tree Node (__slots__: no per-node __dict__ or children dict).
 
     - Leaf node:
-        is_leaf=True
-        rep: list (representative access string)
-        children: empty
+        discriminator: None
+        rep: tuple word (representative access string)
 
     - Internal node:
-        is_leaf=False
-        discriminator: list (suffix used to distinguish)
-        children: dict {True: DTNode, False: DTNode}
+        discriminator: tuple word (suffix used to distinguish)
+        true / false: child for that MQ verdict (None until a word reaches it)
     """
 
-    def __init__(self, value=None, is_leaf=False):
-        self._is_leaf = is_leaf
+    __slots__ = ("rep", "discriminator", "true", "false")
 
-        # for leaf
-        self.rep = None
+    def __init__(self, value=None, is_leaf=False):
+        value = value if value is not None else ()
+        # leaf: value is representative; internal: value is discriminator
+        self.rep = value if is_leaf else None
+        self.discriminator = None if is_leaf else value
+        self.true = None
+        self.false = None
 
-        # for internal
-        self.discriminator = None
+    def is_leaf(self):
+        return self.discriminator is None
 
-        self.children = {}
+    def child(self, res):
+        return self.true if res else self.false
 
-        if is_leaf:
-            # value is representative
-            self.rep = value if value is not None else []
+    def set_child(self, res, node):
+        if res:
+            self.true = node
         else:
-            # value is discriminator
-            self.discriminator = value if value is not None else []
+            self.false = node
 
-    def is_leaf(self):
-        return self._is_leaf
+    def children(self):
+        """(verdict, child) pairs of the children that exist."""
+        return [(res, c) for res, c in ((True, self.true), (False, self.false)) if c is not None]
 
-    def become(self, other_node):
+    def split(self, discriminator, res, child, other):
         """
-        Replace this node in-place with other_node's content.
-        This is what learner expects: leaf.become(new_internal_node).
+        Turn this leaf into an internal node in place (nodes pointing at it, e.g. the
+        learner's sift memo, then continue below it): child for verdict res, other
+        for the opposite one.
         """
-        self._is_leaf = other_node._is_leaf
-        self.rep = other_node.rep
-        self.discriminator = other_node.discriminator
-        self.children = other_node.children
+        self.rep = None
+        self.discriminator = discriminator
+        self.set_child(res, child)
+        self.set_child(not res, other)
 
     def __repr__(self):
-        if self._is_leaf:
+        if self.discriminator is None:
             return f"DTLeaf(rep={self.rep})"
-        return f"DTNode(disc={self.discriminator}, children={list(self.children.keys())})"
+        return f"DTNode(disc={self.discriminator}, children={[res for res, _ in self.children()]})"
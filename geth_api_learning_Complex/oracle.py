@@ -1,100 +1,57 @@
 # oracle.py
-import requests
-from api_alphabet import API_MAP
+from oracle_base import REJECT, Oracle, RpcExecutor, Semantics
 
-RPC_URL = "http://127.0.0.1:8545"
 
-class Oracle:
-    def __init__(self):
-        self.API_CALL_COUNT = 0      # Membership Query count
-        self.RPC_CALL_COUNT = 0      # Actual JSON-RPC calls
-        self.cache = {}              # sequence(tuple) -> bool
+class ComplexSemantics(Semantics):
+    """
+    Complex language (account snapshot):
+    - 'M' always rejects
+    - A (balance) must come before T (nonce), T before B (code); no A after T
+    - C (eth_call) only while 1 <= phase <= 2
+    - Accept iff B has been reached (phase 3) and every call succeeded
+    """
 
-    def reset_counter(self):
-        self.API_CALL_COUNT = 0
-        self.RPC_CALL_COUNT = 0
-        self.cache.clear()
+    name = "complex"
 
-    def membership_oracle(self, sequence):
-        if isinstance(sequence, str):
-            sequence = list(sequence)
+    def start(self):
+        return 0  # 0 none, 1 have A, 2 have A+T, 3 have A+T+B (accept)
 
-        key = tuple(sequence)
-        if key in self.cache:
-            return self.cache[key]
+    def step(self, phase, sym):
+        if sym == "M":
+            return REJECT
 
-        # ---- MQ count ----
-        self.API_CALL_COUNT += 1
+        if sym == "A":
+            if phase >= 2:
+                return REJECT
+            return max(phase, 1)
 
-        phase = 0  # 0 none, 1 have A, 2 have A+T, 3 have A+T+B (accept)
+        if sym == "T":
+            if phase < 1:
+                return REJECT
+            return max(phase, 2)
 
-        for sym in sequence:
-            # ---- language semantics ----
-            if sym == "M":
-                self.cache[key] = False
-                return False
+        if sym == "B":
+            if phase < 2:
+                return REJECT
+            return 3
 
-            if sym == "A":
-                if phase >= 2:
-                    self.cache[key] = False
-                    return False
-                phase = max(phase, 1)
+        if sym == "C":
+            if not (1 <= phase <= 2):
+                return REJECT
+            return phase
 
-            elif sym == "T":
-                if phase < 1:
-                    self.cache[key] = False
-                    return False
-                phase = max(phase, 2)
+        raise ValueError(f"Unknown symbol: {sym}")
 
-            elif sym == "B":
-                if phase < 2:
-                    self.cache[key] = False
-                    return False
-                phase = 3
-
-            elif sym == "C":
-                if not (1 <= phase <= 2):
-                    self.cache[key] = False
-                    return False
-
-            else:
-                raise ValueError(f"Unknown symbol: {sym}")
-
-            # ---- RPC call  ----
-            payload = {
-                "jsonrpc": "2.0",
-                "method": API_MAP[sym]["method"],
-                "params": API_MAP[sym]["params"],
-                "id": 1
-            }
-
-            try:
-                self.RPC_CALL_COUNT += 1
-                r = requests.post(RPC_URL, json=payload, timeout=3)
-                resp = r.json()
-            except Exception:
-                self.cache[key] = False
-                return False
-
-            if "error" in resp:
-                self.cache[key] = False
-                return False
-
-        result = (phase == 3)
-        self.cache[key] = result
-        return result
-
-    # -------- getters --------
-    def get_mq_count(self):
-        return self.API_CALL_COUNT
-
-    def get_rpc_count(self):
-        return self.RPC_CALL_COUNT
+    def accepting(self, phase):
+        return phase == 3
 
 
 # ---- singleton exports  ----
-oracle = Oracle()
+oracle = Oracle(ComplexSemantics(), RpcExecutor(timeout=3))
 membership_oracle = oracle.membership_oracle
+membership_many = oracle.membership_many
+membership_with_prefixes = oracle.membership_with_prefixes
 reset_counter = oracle.reset_counter
 API_CALL_COUNT = oracle.get_mq_count
 RPC_CALL_COUNT = oracle.get_rpc_count
+INSTRUMENTATION = oracle.instr
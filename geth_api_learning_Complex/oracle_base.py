@@ -0,0 +1,684 @@
+# oracle_base.py
+import importlib
+import threading
+import time
+from collections import Counter
+
+import rpc_client
+from api_alphabet import API_MAP
+from instrumentation import Instrumentation
+from words import as_word
+
+
+# mode name -> module exporting a configured `oracle`
+ORACLE_MODULES = {
+    "simple": "oracle_simple",
+    "medium": "oracle_medium",
+    "complex": "oracle",
+}
+
+REJECT = None   # Semantics.step() result for "sequence can no longer be accepted"
+
+FOOTPRINTS = ("set", "multiset")
+
+
+class Semantics:
+    """
+    Language semantics: a small state machine over symbols.
+
+    step(state, sym) is evaluated *before* the symbol's RPC is issued and returns
+    the next state, or REJECT to reject the sequence without calling the node.
+    A sequence is accepted iff every step succeeds, every RPC succeeds and the
+    final state is accepting.
+    """
+
+    name = ""
+
+    def start(self):
+        return 0
+
+    def step(self, state, sym):
+        raise NotImplementedError
+
+    def accepting(self, state):
+        raise NotImplementedError
+
+
+class ClassMappedSemantics(Semantics):
+    """
+    Run a mode's Semantics over a catalog alphabet: each symbol (an interned id)
+    is mapped to its semantic class letter before stepping.
+    """
+
+    def __init__(self, base, classes):
+        self.base = base
+        self.classes = classes
+        self.name = base.name
+
+    def start(self):
+        return self.base.start()
+
+    def step(self, state, sym):
+        if sym not in self.classes:
+            raise ValueError(f"Unknown symbol: {sym}")
+        return self.base.step(state, self.classes[sym])
+
+    def accepting(self, state):
+        return self.base.accepting(state)
+
+
+class RpcExecutor:
+    """
+    Executes symbols as JSON-RPC calls through rpc_client (pooled, rate limited).
+    call() / call_batch() return True per call that came back without an "error";
+    transport and throttling failures raise rpc_client.RpcTransportError.
+    """
+
+    def __init__(self, api_map=None, timeout=5):
+        self.api_map = api_map if api_map is not None else API_MAP
+        self.timeout = timeout
+
+    def payload(self, sym, req_id=1):
+        if sym not in self.api_map:
+            raise ValueError(f"Unknown symbol: {sym}")
+        return {
+            "jsonrpc": "2.0",
+            "method": self.api_map[sym]["method"],
+            "params": self.api_map[sym]["params"],
+            "id": req_id
+        }
+
+    def call(self, sym):
+        resp = rpc_client.post(self.payload(sym), timeout=self.timeout)
+        return "error" not in resp
+
+    def call_batch(self, syms):
+        """One JSON-RPC batch array for all syms; results in input order."""
+        if not syms:
+            return []
+        payload = [self.payload(sym, req_id=i) for i, sym in enumerate(syms)]
+        # a non-list or truncated reply is a transport failure, not a rejection
+        resp = rpc_client.check_batch_reply(payload, rpc_client.post(payload, timeout=self.timeout))
+        by_id = {item.get("id"): item for item in resp if isinstance(item, dict)}
+        return ["error" not in by_id[i] for i in range(len(syms))]
+
+
+class ResultStore:
+    """
+    Raw RPC outcomes by executed prefix: prefix(tuple) -> True if every call in it
+    succeeded, False if its last call failed (earlier ones succeeded).
+    Independent of any language semantics, so it can be shared between oracles.
+
+    footprint_ok: RPC footprint -> True if all of its calls succeeded
+                  (see Oracle(footprint=...)).
+    """
+
+    def __init__(self):
+        self.ok = {}
+        self.footprint_ok = {}
+
+    def clear(self):
+        self.ok.clear()
+        self.footprint_ok.clear()
+
+    def known(self, key):
+        """
+        Walk the executed prefixes of key. Returns (i, failed): the first i calls
+        are known to have succeeded, or failed=True if a call within key is known to fail.
+        """
+        ok = self.ok
+        i = 0
+        while i < len(key):
+            v = ok.get(key[:i + 1])
+            if v is None:
+                break
+            if v is False:
+                return i + 1, True
+            i += 1
+        return i, False
+
+    def record(self, key, start, oks):
+        """Record outcomes oks[j] of calls key[start + j] (stops at the first failure)."""
+        for j, good in enumerate(oks):
+            self.ok[key[:start + j + 1]] = bool(good)
+            if not good:
+                break
+
+
+class SharedRpcCache:
+    """
+    Physical call outcomes shared by oracles that run concurrently (one learner per
+    thread, see Oracle(shared=...)): call key -> True if the call succeeded.
+
+    A key names one executed call by what precedes it (the executed prefix ending
+    with it, or (footprint, i)), as in ResultStore. Every oracle keeps its own
+    cache, store and counters, so its logical MQ / RPC counts are those of a run on
+    its own; only the physical calls are shared. A call another thread is already
+    executing is waited for rather than issued twice.
+    """
+
+    def __init__(self):
+        self.ok = {}
+        self._in_flight = {}     # key -> threading.Event, set once the outcome is known
+        self._lock = threading.Lock()
+        self.rpc_count = 0       # physical JSON-RPC calls
+        self.shared_hits = 0     # calls answered by another execution (done or in flight)
+
+    def run(self, keys, syms, call_batch):
+        """
+        Outcomes for keys (syms[i] is the call behind keys[i]). Unknown calls that no
+        other thread is executing go out in one call_batch(syms) call.
+        """
+        mine = []
+        waits = []
+        with self._lock:
+            for i, k in enumerate(keys):
+                if k in self.ok:
+                    continue
+                ev = self._in_flight.get(k)
+                if ev is None:
+                    self._in_flight[k] = threading.Event()
+                    mine.append(i)
+                else:
+                    waits.append(ev)
+            self.shared_hits += len(keys) - len(mine)
+        try:
+            if mine:
+                oks = call_batch([syms[i] for i in mine])
+                with self._lock:
+                    self.rpc_count += len(mine)
+                    for i, good in zip(mine, oks):
+                        self.ok[keys[i]] = bool(good)
+        finally:
+            with self._lock:
+                for i in mine:
+                    self._in_flight.pop(keys[i]).set()
+        for ev in waits:
+            ev.wait()
+        # a call whose owner failed (transport error) is still unknown: execute it here
+        missing = [i for i, k in enumerate(keys) if k not in self.ok]
+        if missing:
+            self.run([keys[i] for i in missing], [syms[i] for i in missing], call_batch)
+        return [self.ok[k] for k in keys]
+
+
+class Oracle:
+    """
+    Membership oracle = Semantics (language) + executor (RPC side).
+
+    Caching, MQ/RPC counters, instrumentation and batching live here once;
+    the mode modules (oracle.py, oracle_simple.py, oracle_medium.py) only
+    provide their Semantics.
+
+    short_circuit: run the language automaton over the whole sequence first; a
+                   sequence it rejects costs no RPC at all, and for the others only
+                   calls whose outcome is not already in `store` are executed.
+    footprint:     "set" or "multiset" (None = off). All API_MAP calls are read-only,
+                   so the RPC side of a verdict only depends on which calls are made,
+                   not their order. The sequence is reduced to its footprint (distinct
+                   calls, or calls with multiplicity), each footprint is executed once
+                   as one JSON-RPC batch, and the language automaton is evaluated
+                   locally. Implies the automaton-first check of short_circuit.
+    shared:        optional SharedRpcCache. Calls are looked up there (and recorded)
+                   before going to the node, so oracles running concurrently in
+                   other threads never repeat one another's calls; RPC_CALL_COUNT
+                   stays the logical count of this oracle alone.
+    """
+
+    def __init__(self, semantics, executor=None, short_circuit=False, store=None, footprint=None,
+                 shared=None):
+        if footprint not in (None,) + FOOTPRINTS:
+            raise ValueError(f"Unknown footprint: {footprint}. Choose {', '.join(FOOTPRINTS)}.")
+        self.semantics = semantics
+        self.executor = executor if executor is not None else RpcExecutor()
+        self.short_circuit = short_circuit
+        self.footprint = footprint
+        self._owns_store = store is None     # a shared store is cleared by its owner
+        self.store = store if store is not None else ResultStore()
+        self.shared = shared
+        self.API_CALL_COUNT = 0      # Membership Query count (cache misses)
+        self.RPC_CALL_COUNT = 0      # Actual JSON-RPC calls
+        self.cache = {}              # word (tuple) -> bool
+        self.instr = Instrumentation()
+
+    @property
+    def name(self):
+        return self.semantics.name
+
+    def reset_counter(self):
+        self.API_CALL_COUNT = 0
+        self.RPC_CALL_COUNT = 0
+        self.cache.clear()
+        if self._owns_store:
+            self.store.clear()
+        self.instr.reset()
+
+    # ---------- RPC side ----------
+    # key: the call's identity in a SharedRpcCache (executed prefix, or (footprint, i))
+    def _call(self, sym, key):
+        t0 = time.perf_counter()
+        try:
+            self.RPC_CALL_COUNT += 1
+            if self.shared is not None:
+                return self.shared.run([key], [sym], lambda syms: [self.executor.call(syms[0])])[0]
+            return self.executor.call(sym)
+        except rpc_client.RpcTransportError:
+            self.instr.count("rpc_unavailable")
+            raise
+        finally:
+            self.instr.observe("rpc_latency_ms", (time.perf_counter() - t0) * 1000.0)
+
+    def _call_batch(self, syms, keys):
+        t0 = time.perf_counter()
+        try:
+            self.RPC_CALL_COUNT += len(syms)
+            if self.shared is not None:
+                return self.shared.run(keys, syms, self.executor.call_batch)
+            return self.executor.call_batch(syms)
+        except rpc_client.RpcTransportError:
+            self.instr.count("rpc_unavailable")
+            raise
+        finally:
+            self.instr.observe("rpc_batch_latency_ms", (time.perf_counter() - t0) * 1000.0)
+
+    # ---------- membership queries ----------
+    def _lookup(self, sequence):
+        key = as_word(sequence)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.instr.count("cache_hit")
+        return key, cached
+
+    def _run_automaton(self, key):
+        """States after each prefix of key: [s_0, ..., s_m]; m < len(key) means symbol m was rejected."""
+        sem = self.semantics
+        state = sem.start()
+        states = [state]
+        for sym in key:
+            state = sem.step(state, sym)
+            if state is REJECT:
+                break
+            states.append(state)
+        return states
+
+    def _automaton_accepts(self, key):
+        states = self._run_automaton(key)
+        return len(states) == len(key) + 1 and self.semantics.accepting(states[-1])
+
+    # ---------- prefix harvesting ----------
+    # Evaluating a word also decides many of its prefixes: prefix i is accepted iff the
+    # automaton accepts it and its first i calls succeed. Whatever is known from the
+    # automaton states and call outcomes of this one execution is cached as well.
+    def _prefix_verdicts(self, key, states, n_ok, failed_at=None):
+        """
+        Verdicts for the prefixes key[:0] ... key[:len(key)] (None = unknown).
+        n_ok: leading calls known to succeed; failed_at: index of a call known to fail.
+        """
+        accepting = self.semantics.accepting
+        m = len(states) - 1
+        verdicts = []
+        for i in range(len(key) + 1):
+            if i > m or (failed_at is not None and i > failed_at):
+                verdicts.append(False)
+            elif i <= n_ok:
+                verdicts.append(accepting(states[i]))
+            elif not accepting(states[i]):
+                verdicts.append(False)
+            else:
+                verdicts.append(None)
+        return verdicts
+
+    def _harvest(self, key, verdicts):
+        """Cache the known prefix verdicts of key (the full word itself included)."""
+        cache = self.cache
+        harvested = 0
+        for i, v in enumerate(verdicts[:-1]):
+            if v is None:
+                continue
+            prefix = key[:i]
+            if prefix not in cache:
+                cache[prefix] = v
+                harvested += 1
+        cache[key] = verdicts[-1]
+        if harvested:
+            self.instr.count("prefix_harvest", harvested)
+
+    def _evaluate_short_circuit(self, key, states):
+        if len(states) <= len(key) or not self.semantics.accepting(states[-1]):
+            self.instr.count("short_circuit_reject")
+            start, failed = self.store.known(key)
+            if failed:
+                return self._prefix_verdicts(key, states, start - 1, start - 1)
+            return self._prefix_verdicts(key, states, start)
+        start, failed = self.store.known(key)
+        if failed:
+            return self._prefix_verdicts(key, states, start - 1, start - 1)
+        for i in range(start, len(key)):
+            ok = self._call(key[i], key[:i + 1])
+            self.store.record(key, i, [ok])
+            if not ok:
+                return self._prefix_verdicts(key, states, i, i)
+        return self._prefix_verdicts(key, states, len(key))
+
+    def footprint_of(self, key):
+        if self.footprint == "set":
+            return frozenset(key)
+        return tuple(sorted(Counter(key).items()))
+
+    def _footprint_calls(self, fp):
+        if self.footprint == "set":
+            return sorted(fp)
+        return [sym for sym, n in fp for _ in range(n)]
+
+    def _evaluate_footprint(self, key, states):
+        if len(states) <= len(key) or not self.semantics.accepting(states[-1]):
+            self.instr.count("short_circuit_reject")
+            return self._prefix_verdicts(key, states, 0)
+        fp = self.footprint_of(key)
+        ok = self.store.footprint_ok.get(fp)
+        if ok is None:
+            calls = self._footprint_calls(fp)
+            ok = all(self._call_batch(calls, [(fp, j) for j in range(len(calls))]))
+            self.store.footprint_ok[fp] = ok
+        else:
+            self.instr.count("footprint_hit")
+        return self._footprint_verdicts(key, states, ok)
+
+    def _footprint_verdicts(self, key, states, ok):
+        if ok:
+            return self._prefix_verdicts(key, states, len(key))
+        # some call failed, but which one is unknown: only the full word is decided
+        verdicts = self._prefix_verdicts(key, states, 0)
+        verdicts[-1] = False
+        return verdicts
+
+    def _evaluate(self, key):
+        """Prefix verdict vector of key (last entry: the verdict for key itself)."""
+        states = self._run_automaton(key)
+        if self.footprint is not None:
+            return self._evaluate_footprint(key, states)
+        if self.short_circuit:
+            return self._evaluate_short_circuit(key, states)
+        # plain mode: call each symbol the automaton allows, up to the first failure
+        for i in range(len(states) - 1):
+            if not self._call(key[i], key[:i + 1]):
+                return self._prefix_verdicts(key, states, i, i)
+        return self._prefix_verdicts(key, states, len(states) - 1)
+
+    def membership_oracle(self, sequence):
+        key, cached = self._lookup(sequence)
+        if cached is not None:
+            return cached
+
+        # ---- MQ count ----
+        self.API_CALL_COUNT += 1
+        self.instr.count("cache_miss")
+        try:
+            verdicts = self._evaluate(key)
+        except rpc_client.RpcTransportError:
+            # transport / throttling failure is not a verdict: nothing is cached
+            # and the MQ is not counted, so a retried query is counted once
+            self.API_CALL_COUNT -= 1
+            raise
+
+        self._harvest(key, verdicts)
+        return verdicts[-1]
+
+    def membership_with_prefixes(self, sequence):
+        """
+        Verdicts for every prefix of sequence, [mq(()), mq(seq[:1]), ..., mq(seq)].
+        One execution of the full word usually decides all of them; prefixes it
+        leaves open (short-circuit / footprint modes) are queried individually.
+        """
+        key = as_word(sequence)
+        self.membership_oracle(key)
+        cache = self.cache
+        return [cache[key[:i]] if key[:i] in cache else self.membership_oracle(key[:i])
+                for i in range(len(key) + 1)]
+
+    def membership_many(self, sequences):
+        """
+        Answer several MQs with JSON-RPC batches. Plain mode resolves in rounds:
+        round i sends call i of every uncached sequence whose first i calls
+        succeeded (up to its first semantic rejection), so, as with
+        membership_oracle(), no call follows a failed one.
+        """
+        if self.footprint is not None:
+            return self._membership_many_footprint(sequences)
+        if self.short_circuit:
+            return self._membership_many_short_circuit(sequences)
+
+        keys = []
+        results = {}
+        pending = []            # (key, automaton states)
+        for seq in sequences:
+            key, cached = self._lookup(seq)
+            keys.append(key)
+            if cached is not None or key in results:
+                results.setdefault(key, cached)
+                continue
+            pending.append((key, self._run_automaton(key)))
+            results[key] = None
+
+        if pending:
+            failed = [None] * len(pending)
+            running = [j for j, (_, states) in enumerate(pending) if len(states) > 1]
+            i = 0
+            while running:
+                prefixes = [pending[j][0][:i + 1] for j in running]
+                oks = self._call_batch([p[-1] for p in prefixes], prefixes)
+                still = []
+                for j, ok in zip(running, oks):
+                    if not ok:
+                        failed[j] = i
+                    elif i + 2 < len(pending[j][1]):
+                        still.append(j)
+                running = still
+                i += 1
+            for (key, states), failed_at in zip(pending, failed):
+                if failed_at is None:
+                    verdicts = self._prefix_verdicts(key, states, len(states) - 1)
+                else:
+                    verdicts = self._prefix_verdicts(key, states, failed_at, failed_at)
+                self.API_CALL_COUNT += 1
+                self.instr.count("cache_miss")
+                self._harvest(key, verdicts)
+                results[key] = verdicts[-1]
+
+        return [results[k] for k in keys]
+
+    def _membership_many_short_circuit(self, sequences):
+        keys = []
+        results = {}
+        pending = []            # (key, automaton states, index of first unknown call)
+        for seq in sequences:
+            key, cached = self._lookup(seq)
+            keys.append(key)
+            if cached is not None or key in results:
+                results.setdefault(key, cached)
+                continue
+            self.API_CALL_COUNT += 1
+            self.instr.count("cache_miss")
+            states = self._run_automaton(key)
+            rejected = len(states) <= len(key) or not self.semantics.accepting(states[-1])
+            if rejected:
+                self.instr.count("short_circuit_reject")
+            start, failed = self.store.known(key)
+            if failed:
+                verdicts = self._prefix_verdicts(key, states, start - 1, start - 1)
+            elif rejected:
+                verdicts = self._prefix_verdicts(key, states, start)
+            elif start < len(key):
+                pending.append((key, states, start))
+                results[key] = None
+                continue
+            else:
+                verdicts = self._prefix_verdicts(key, states, len(key))
+            self._harvest(key, verdicts)
+            results[key] = verdicts[-1]
+
+        if pending:
+            # several pending words may share unknown calls; send each (prefix, call) once
+            slots = {}
+            flat = []
+            for key, _, start in pending:
+                for i in range(start, len(key)):
+                    if key[:i + 1] not in slots:
+                        slots[key[:i + 1]] = len(flat)
+                        flat.append(key[i])
+            try:
+                oks = self._call_batch(flat, list(slots))
+            except rpc_client.RpcTransportError:
+                self.API_CALL_COUNT -= len(pending)
+                raise
+            for key, states, start in pending:
+                outcome = [oks[slots[key[:i + 1]]] for i in range(start, len(key))]
+                self.store.record(key, start, outcome)
+                failed_at = next((start + j for j, ok in enumerate(outcome) if not ok), None)
+                if failed_at is None:
+                    verdicts = self._prefix_verdicts(key, states, len(key))
+                else:
+                    verdicts = self._prefix_verdicts(key, states, failed_at, failed_at)
+                self._harvest(key, verdicts)
+                results[key] = verdicts[-1]
+
+        return [results[k] for k in keys]
+
+    def _membership_many_footprint(self, sequences):
+        keys = []
+        results = {}
+        pending = {}            # footprint -> [(key, automaton states) waiting for it]
+        for seq in sequences:
+            key, cached = self._lookup(seq)
+            keys.append(key)
+            if cached is not None or key in results:
+                results.setdefault(key, cached)
+                continue
+            self.API_CALL_COUNT += 1
+            self.instr.count("cache_miss")
+            states = self._run_automaton(key)
+            if len(states) <= len(key) or not self.semantics.accepting(states[-1]):
+                self.instr.count("short_circuit_reject")
+                verdicts = self._prefix_verdicts(key, states, 0)
+            else:
+                fp = self.footprint_of(key)
+                ok = self.store.footprint_ok.get(fp)
+                if ok is None:
+                    pending.setdefault(fp, []).append((key, states))
+                    results[key] = None
+                    continue
+                self.instr.count("footprint_hit")
+                verdicts = self._footprint_verdicts(key, states, ok)
+            self._harvest(key, verdicts)
+            results[key] = verdicts[-1]
+
+        if pending:
+            fps = list(pending)
+            calls = [self._footprint_calls(fp) for fp in fps]
+            try:
+                oks = self._call_batch([sym for c in calls for sym in c],
+                                       [(fp, j) for fp, c in zip(fps, calls) for j in range(len(c))])
+            except rpc_client.RpcTransportError:
+                self.API_CALL_COUNT -= sum(len(ks) for ks in pending.values())
+                raise
+            i = 0
+            for fp, c in zip(fps, calls):
+                ok = all(oks[i:i + len(c)])
+                i += len(c)
+                self.store.footprint_ok[fp] = ok
+                for key, states in pending[fp]:
+                    self._harvest(key, self._footprint_verdicts(key, states, ok))
+                    results[key] = ok
+
+        return [results[k] for k in keys]
+
+    # -------- checkpointing (see checkpoint.py) --------
+    def checkpoint_state(self):
+        """Counters, verdict cache and raw RPC outcomes: everything a resumed run must not re-ask."""
+        return {
+            "mq": self.API_CALL_COUNT,
+            "rpc": self.RPC_CALL_COUNT,
+            "cache": self.cache,
+            "ok": self.store.ok,
+            "footprint_ok": self.store.footprint_ok,
+        }
+
+    def restore_state(self, state):
+        self.API_CALL_COUNT = state["mq"]
+        self.RPC_CALL_COUNT = state["rpc"]
+        self.cache.update(state["cache"])
+        self.store.ok.update(state["ok"])
+        self.store.footprint_ok.update(state["footprint_ok"])
+
+    # -------- getters --------
+    def get_mq_count(self):
+        return self.API_CALL_COUNT
+
+    def get_rpc_count(self):
+        return self.RPC_CALL_COUNT
+
+    get_count = get_mq_count
+
+
+class MultiOracleSession:
+    """
+    Several modes learned against one shared raw-result store.
+
+    Every mode gets its own Oracle (own cache and logical MQ counter), but all of
+    them read and write the same ResultStore, so a call sequence executed for one
+    mode is never executed again for another. short_circuit is always on, since
+    that is the path that consults the store.
+
+        session = MultiOracleSession()
+        for mode in ("simple", "medium", "complex"):
+            o = session.oracle(mode)
+            LStar(ALPHABET, o.membership_oracle, make_equivalence_oracle(o.membership_oracle)).learn()
+        session.rpc_count()   # physical JSON-RPC calls for the whole sweep
+    """
+
+    def __init__(self, modes=None, footprint=None, alphabet=None):
+        self.modes = list(modes) if modes is not None else list(ORACLE_MODULES)
+        self.store = ResultStore()
+        self.oracles = {}
+        for mode in self.modes:
+            self.oracles[mode] = make_oracle(mode, alphabet=alphabet, short_circuit=True,
+                                             store=self.store, footprint=footprint)
+
+    def oracle(self, mode):
+        return self.oracles[mode]
+
+    def membership_all(self, sequence):
+        """Verdict of every mode for one sequence; its calls are executed at most once."""
+        return {mode: o.membership_oracle(sequence) for mode, o in self.oracles.items()}
+
+    def rpc_count(self):
+        # each physical call is issued (and counted) by exactly one of the oracles
+        return sum(o.RPC_CALL_COUNT for o in self.oracles.values())
+
+    def mq_counts(self):
+        return {mode: o.API_CALL_COUNT for mode, o in self.oracles.items()}
+
+    def reset(self):
+        for o in self.oracles.values():
+            o.reset_counter()
+        self.store.clear()
+
+
+def get_oracle(mode):
+    """Return the configured Oracle for a mode name (simple / medium / complex)."""
+    if mode not in ORACLE_MODULES:
+        raise ValueError(f"Unknown method: {mode}. Choose {', '.join(ORACLE_MODULES)}.")
+    return importlib.import_module(ORACLE_MODULES[mode]).oracle
+
+
+def make_oracle(mode, alphabet=None, **kwargs):
+    """
+    A fresh Oracle with the semantics of `mode`. With an api_alphabet.Alphabet
+    (catalog-built, int symbols) the semantics see each symbol's class and the
+    executor dispatches through alphabet.api_map. kwargs go to Oracle().
+    """
+    base = get_oracle(mode)
+    if alphabet is None:
+        return Oracle(base.semantics, base.executor, **kwargs)
+    return Oracle(ClassMappedSemantics(base.semantics, alphabet.classes),
+                  RpcExecutor(alphabet.api_map, timeout=base.executor.timeout), **kwargs)
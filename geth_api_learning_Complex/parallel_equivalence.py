@@ -0,0 +1,255 @@
+# parallel_equivalence.py
+# Random-testing equivalence with the sampling spread over worker processes.
+#
+# The hypothesis is shipped as a compact transition table (CompactDFA); each worker
+# holds its own oracle (own RpcPool / connections, own cache, kept across rounds)
+# and tests its own seeded slice of the random words; verdicts the parent already
+# knows for a slice's words are shipped with it. The first counterexample
+# cancels the other workers, unless shortest=True, in which case every slice runs
+# to the end and the shortest counterexample found wins.
+import multiprocessing
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import rpc_client
+from api_alphabet import ALPHABET
+from equivalence import EquivalenceOracle
+
+
+class CompactDFA:
+    """
+    Picklable transition table of a hypothesis (either learner's DFA class).
+    States are 0..n-1 with 0 the start; delta[q][j] is the successor on symbols[j]
+    (-1 = missing transition, i.e. reject).
+    """
+
+    def __init__(self, hypothesis, symbols):
+        start = hypothesis.start_state
+        index = {start: 0}
+        order = [start]
+        self.symbols = list(symbols)
+        self.delta = []
+        i = 0
+        while i < len(order):
+            row = []
+            trans = hypothesis.transitions.get(order[i], {})
+            for a in self.symbols:
+                t = trans.get(a)
+                if t is None:
+                    row.append(-1)
+                    continue
+                if t not in index:
+                    index[t] = len(order)
+                    order.append(t)
+                row.append(index[t])
+            self.delta.append(row)
+            i += 1
+        self.accepting = [st in hypothesis.accepting for st in order]
+
+    def accepts_indices(self, word):
+        q = 0
+        delta = self.delta
+        for j in word:
+            q = delta[q][j]
+            if q < 0:
+                return False
+        return self.accepting[q]
+
+
+# ---------- worker side (one oracle per process) ----------
+_worker = {}
+
+
+def _init_worker(oracle_factory, rpc_urls, rpc_strategy, rpc_kwargs, cancel):
+    # fresh pool: never share the parent's keep-alive sockets
+    rpc_client.configure(rpc_urls, rpc_strategy, **rpc_kwargs)
+    _worker["oracle"] = oracle_factory()
+    _worker["cancel"] = cancel
+
+
+def _ready():
+    return True
+
+
+def _slice_words(n, seed, count, max_len):
+    """The slice's random words as symbol-index lists (the parent regenerates them too)."""
+    rng = random.Random(seed)
+    words = []
+    for _ in range(count):
+        length = rng.randint(1, max_len)
+        words.append([rng.randrange(n) for _ in range(length)])
+    return words
+
+
+def _test_slice(table, seed, count, max_len, shortest, known):
+    """
+    Test `count` random words; known: the parent's verdicts for some of them, used
+    without a query. Returns (counterexample, [(word, verdict, mq)], mq, rpc) where
+    the per-word mq is the MQs that word cost this worker (0 or 1).
+    """
+    oracle = _worker["oracle"]
+    cancel = _worker["cancel"]
+    mq0, rpc0 = oracle.get_mq_count(), oracle.get_rpc_count()
+    symbols = table.symbols
+    tested = []
+    ce = None
+    for idx in _slice_words(len(symbols), seed, count, max_len):
+        if cancel.is_set():
+            break
+        if ce is not None and len(idx) >= len(ce):
+            continue   # cannot beat the counterexample already found
+        word = tuple(symbols[j] for j in idx)
+        if word in known:
+            verdict = known[word]
+        else:
+            before = oracle.get_mq_count()
+            verdict = oracle.membership_oracle(word)
+            tested.append((word, verdict, oracle.get_mq_count() - before))
+        if table.accepts_indices(idx) != verdict:
+            ce = word
+            if not shortest:
+                cancel.set()
+                break
+    return ce, tested, oracle.get_mq_count() - mq0, oracle.get_rpc_count() - rpc0
+
+
+class ParallelEquivalenceOracle(EquivalenceOracle):
+    """
+    EquivalenceOracle whose random-word phase runs in `workers` processes.
+
+    oracle_factory: picklable zero-argument callable building a worker's membership
+                    oracle, e.g. functools.partial(oracle_base.make_oracle, "complex")
+    counter:        optional parent Oracle; its cached verdicts go out with each slice,
+                    the workers' MQ/RPC counts are added to it (a word it already
+                    knows by then costs no MQ), and their verdicts seed its cache
+                    and the replay pool
+    shortest:       run every slice to the end and return the shortest counterexample
+
+    Workers are forked (the CLIs are scripts, which spawn-started workers would
+    re-run). They are started on first use, or by start(); call close() when done.
+    reset() restarts them, so the next learner does not get the previous one's
+    worker caches for free.
+    """
+
+    def __init__(self, mq, oracle_factory, workers=4, num_tests=400, max_len=10, seed=0,
+                 alphabet=ALPHABET, pool_size=4096, shortest=False, counter=None, mp_context=None):
+        super().__init__(mq, num_tests=num_tests, max_len=max_len, alphabet=alphabet, pool_size=pool_size)
+        self.oracle_factory = oracle_factory
+        self.workers = workers
+        self.seed = seed
+        self.shortest = shortest
+        self.counter = counter
+        if mp_context is None:
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = "fork" if "fork" in methods else "spawn"
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._executor = None
+        self._cancel = None
+        self.rounds = 0
+
+    def checkpoint_state(self):
+        # slice seeds derive from (seed, rounds): restoring rounds replays the same slices
+        state = super().checkpoint_state()
+        state["rounds"] = self.rounds
+        return state
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.rounds = state.get("rounds", self.rounds)
+
+    def reset(self):
+        super().reset()
+        self.close()      # worker oracles and their caches go with the processes
+        self.rounds = 0
+
+    def start(self):
+        """
+        Fork the workers now. With other threads running, a fork may copy locks they
+        hold (RPC pool, shared caches, logging): call start() before starting them.
+        """
+        if self._executor is not None:
+            return
+        pool = rpc_client.get_pool()
+        rpc_kwargs = {"max_retries": pool.max_retries}
+        if pool.bucket.max_rate is not None:
+            # share the configured request rate between the workers
+            rpc_kwargs["rate"] = pool.bucket.max_rate / self.workers
+        self._cancel = self._ctx.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=self._ctx, initializer=_init_worker,
+            initargs=(self.oracle_factory, pool.urls, pool.strategy, rpc_kwargs, self._cancel))
+        # a fork-context executor launches all of its workers on the first submit
+        self._executor.submit(_ready).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._cancel.set()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _random_phase(self, hypothesis):
+        self.start()
+        self.rounds += 1
+        table = CompactDFA(hypothesis, self.alphabet)
+        self._cancel.clear()
+
+        per, extra = divmod(self.num_tests, self.workers)
+        base = (self.seed * 1_000_003 + self.rounds) * 1009
+        futures = []
+        for i in range(self.workers):
+            seed, count = base + i, per + (i < extra)
+            futures.append(self._executor.submit(_test_slice, table, seed, count, self.max_len,
+                                                 self.shortest, self._known(table.symbols, seed, count)))
+
+        found = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                ce, tested, _, rpc = f.result()
+                self._absorb(tested, rpc)
+                if ce is not None:
+                    found.append(ce)
+            if found and not self.shortest:
+                self._cancel.set()   # remaining slices stop at their next word
+        if not found:
+            return None
+        return min(found, key=len)
+
+    def _known(self, symbols, seed, count):
+        """The counter's cached verdicts for the words of one slice."""
+        if self.counter is None:
+            return {}
+        cache = self.counter.cache
+        words = (tuple(symbols[j] for j in idx) for idx in _slice_words(len(symbols), seed, count, self.max_len))
+        return {w: cache[w] for w in words if w in cache}
+
+    def _absorb(self, tested, rpc):
+        for word, verdict, _ in tested:
+            self._remember(word, verdict)
+        counter = self.counter
+        if counter is None:
+            return
+        # an earlier slice of this round may have answered the same word already
+        counter.API_CALL_COUNT += sum(cost for word, _, cost in tested if word not in counter.cache)
+        counter.RPC_CALL_COUNT += rpc
+        for word, verdict, _ in tested:
+            counter.cache.setdefault(word, verdict)
+
+    def __call__(self, hypothesis):
+        ce = self.check_pool(hypothesis)
+        if ce is not None:
+            self.pool_hits += 1
+            return ce
+        for seq in self.templates:
+            verdict = self.mq(seq)
+            self._remember(seq, verdict)
+            if hypothesis.accepts(seq) != verdict:
+                return seq
+        return self._random_phase(hypothesis)
@@ -0,0 +1,530 @@
+# rpc_client.py
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+
+# Environment: RPC_URL="http://a:8545,http://b:8545"  RPC_STRATEGY="round_robin"|"least_latency"
+#              RPC_RATE="50" (requests/s, unset = unlimited)
+RPC_URL_ENV = "RPC_URL"
+RPC_STRATEGY_ENV = "RPC_STRATEGY"
+RPC_RATE_ENV = "RPC_RATE"
+
+STRATEGIES = ("round_robin", "least_latency")
+
+# HTTP statuses and JSON-RPC replies that mean "slow down / try again", not "this call is invalid"
+RETRYABLE_HTTP = {408, 425, 429, 500, 502, 503, 504}
+THROTTLE_CODES = {-32005, 429}          # EIP-1474 "limit exceeded", some providers use 429
+THROTTLE_MARKERS = ("rate limit", "too many requests", "too many concurrent", "limit exceeded",
+                    "capacity exceeded", "try again")
+
+
+class RpcTransportError(Exception):
+    """No endpoint produced a usable reply (connection error, timeout, bad body). Retryable."""
+
+
+class RpcThrottled(RpcTransportError):
+    """The endpoint asked us to back off (HTTP 429, rate-limit JSON-RPC error). Retryable."""
+
+    def __init__(self, msg, retry_after=None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class RpcUnavailable(RpcTransportError):
+    """Retries exhausted: the query cannot be answered right now. Never a verdict."""
+
+
+def _is_throttle_error(err):
+    if not isinstance(err, dict):
+        return False
+    if err.get("code") in THROTTLE_CODES:
+        return True
+    msg = str(err.get("message", "")).lower()
+    return any(m in msg for m in THROTTLE_MARKERS)
+
+
+def check_batch_reply(payload, resp):
+    """
+    Raise RpcTransportError unless resp answers every request of the batch payload
+    (a list with one item per request id). A truncated or non-list reply says
+    nothing about the calls, so it must be retried, never read as rejections.
+    """
+    if not isinstance(resp, list):
+        raise RpcTransportError(f"batch of {len(payload)} answered with a non-list reply: {resp!r}")
+    got = {item.get("id") for item in resp if isinstance(item, dict)}
+    missing = [req.get("id") for req in payload if req.get("id") not in got]
+    if missing:
+        raise RpcTransportError(f"batch reply is missing {len(missing)} of {len(payload)} ids")
+    return resp
+
+
+def classify_reply(status_code, resp, retry_after=None):
+    """
+    Raise RpcThrottled / RpcTransportError for retryable replies; return resp otherwise.
+    A semantic JSON-RPC error (e.g. execution reverted, method not found) is returned
+    as-is so the oracle can reject the sequence.
+    """
+    if status_code == 429:
+        raise RpcThrottled("HTTP 429", retry_after=retry_after)
+    if status_code in RETRYABLE_HTTP:
+        raise RpcTransportError(f"HTTP {status_code}")
+    items = resp if isinstance(resp, list) else [resp]
+    for item in items:
+        if not isinstance(item, dict):
+            raise RpcTransportError(f"malformed reply: {item!r}")
+        if "error" in item and _is_throttle_error(item["error"]):
+            raise RpcThrottled(str(item["error"].get("message", "rate limited")), retry_after=retry_after)
+    return resp
+
+
+# ---------- client-side flow control ----------
+class TokenBucket:
+    """
+    Blocking token bucket. rate: tokens/s (None = unlimited until throttled),
+    burst: bucket size. The rate adapts AIMD-style: throttled() halves the lower
+    of the current rate and the measured request rate over the last `window`
+    seconds (not below min_rate, at most once per `cooldown` seconds so a burst
+    of 429s counts as one signal); an unlimited bucket starts limiting from there.
+    succeeded() adds `increase` tokens/s per second's worth of successes, up to
+    the configured rate if any (increase defaults to 5% of the starting rate).
+    """
+
+    def __init__(self, rate=None, burst=None, min_rate=1.0, increase=None, cooldown=1.0, window=1.0):
+        self.max_rate = rate
+        self.rate = rate
+        self._fixed_burst = burst is not None
+        self._fixed_increase = increase is not None
+        self.burst = burst if burst is not None else max(1.0, (rate or 1.0))
+        self.min_rate = min_rate
+        self.increase = increase if increase is not None else max(1.0, 0.05 * (rate or 0.0))
+        self.cooldown = cooldown
+        self.window = window
+        self._sent = deque()     # acquire() times within the last `window` seconds
+        self._last_cut = float("-inf")
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _measured_rate(self, now):
+        sent = self._sent
+        while sent and now - sent[0] > self.window:
+            sent.popleft()
+        if len(sent) < 2:
+            return None
+        return len(sent) / max(now - sent[0], 1e-3)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate is None:
+                    self._sent.append(now)
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self._sent.append(now)
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_cut < self.cooldown:
+                return
+            self._last_cut = now
+            measured = self._measured_rate(now)
+            if measured is None:
+                measured = self.rate or self.min_rate
+            if self.rate is None:
+                # first throttle of an unlimited bucket: start from what was being sent
+                if not self._fixed_burst:
+                    self.burst = max(1.0, measured)
+                if not self._fixed_increase:
+                    self.increase = max(1.0, 0.05 * measured)
+                self._last = now
+            rate = measured if self.rate is None else min(self.rate, measured)
+            self.rate = max(self.min_rate, rate * 0.5)
+            self._tokens = min(self._tokens, 0.0)
+
+    def succeeded(self):
+        with self._lock:
+            if self.rate is None:
+                return
+            rate = self.rate + self.increase / self.rate
+            self.rate = rate if self.max_rate is None else min(self.max_rate, rate)
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency window: +1 per window of successes, x0.5 on throttling
+    (at most once per `cooldown` seconds). acquire() blocks while `limit`
+    requests are in flight.
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=64, decrease=0.5, cooldown=0.1):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_cut = float("-inf")
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_cut >= self.cooldown:
+                    self._last_cut = now
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / max(1.0, self.limit))
+            self._cond.notify_all()
+
+
+class Endpoint:
+    """One JSON-RPC replica: pooled HTTP session + health bookkeeping."""
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()   # keep-alive connection pool
+        self.ewma_ms = None                  # smoothed latency of successful calls
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.throttled = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now):
+        return now >= self.ejected_until
+
+    def snapshot(self):
+        return {
+            "url": self.url,
+            "calls": self.calls,
+            "failures": self.failures,
+            "throttled": self.throttled,
+            "ewma_ms": self.ewma_ms,
+            "ejected": self.ejected_until > time.time(),
+        }
+
+
+class RpcPool:
+    """
+    Distribute JSON-RPC posts over one or more endpoints.
+
+    strategy:       "round_robin" or "least_latency" (EWMA latency x in-flight)
+    max_failures:   consecutive transport failures before an endpoint is ejected
+    slow_ms:        eject an endpoint whose EWMA latency exceeds this (None = never),
+                    as long as another endpoint is still in rotation
+    eject_seconds:  how long an ejected endpoint stays out before it is retried
+
+    rate, burst:    client-side token bucket (requests/s; None = unlimited)
+    concurrency:    initial AIMD in-flight window (None = no window)
+    max_retries:    retries for transport/throttling failures, with exponential
+                    backoff + jitter (Retry-After is honoured); then RpcUnavailable
+
+    Retries skip the endpoint that just failed or throttled, unless it is the only
+    one. A throttled reply is counted per endpoint but is neither a failure nor a
+    latency sample (a 429 comes back fast). If every endpoint is ejected,
+    the one that comes back soonest is used anyway rather than failing outright.
+    Semantic JSON-RPC errors are returned to the caller, never retried.
+    """
+
+    def __init__(self, urls, strategy="round_robin", max_failures=3, slow_ms=None,
+                 eject_seconds=30.0, ewma_alpha=0.2, rate=None, burst=None,
+                 concurrency=8, max_concurrency=64, max_retries=6,
+                 backoff_base=0.05, backoff_max=5.0):
+        if isinstance(urls, str):
+            urls = parse_urls(urls)
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint URL")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}. Choose {', '.join(STRATEGIES)}.")
+        self.endpoints = [Endpoint(u) for u in urls]
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.slow_ms = slow_ms
+        self.eject_seconds = eject_seconds
+        self.ewma_alpha = ewma_alpha
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AIMDLimiter(concurrency, maximum=max_concurrency) if concurrency else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.throttled = 0
+        self._rr = 0
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._health_stop = threading.Event()
+
+    @property
+    def urls(self):
+        return [e.url for e in self.endpoints]
+
+    # ---------- endpoint selection ----------
+    def _pick(self, exclude=()):
+        now = time.time()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.is_healthy(now)]
+            if not candidates:
+                rest = [e for e in self.endpoints if e not in exclude]
+                if not rest:
+                    return None
+                # everything ejected: fall back to the endpoint that recovers first
+                candidates = [min(rest, key=lambda e: e.ejected_until)]
+
+            if self.strategy == "least_latency":
+                ep = min(candidates, key=lambda e: (e.ewma_ms or 0.0) * (e.in_flight + 1))
+            else:
+                ep = candidates[self._rr % len(candidates)]
+                self._rr += 1
+            ep.in_flight += 1
+            return ep
+
+    def _eject(self, ep, now):
+        ep.ejected_until = now + self.eject_seconds
+        ep.consecutive_failures = 0
+
+    def _record_throttle(self, ep):
+        with self._lock:
+            ep.in_flight -= 1
+            ep.calls += 1
+            ep.throttled += 1
+            self.throttled += 1
+
+    def _record(self, ep, ok, latency_ms):
+        now = time.time()
+        with self._lock:
+            ep.in_flight -= 1
+            ep.calls += 1
+            if not ok:
+                ep.failures += 1
+                ep.consecutive_failures += 1
+                if ep.consecutive_failures >= self.max_failures:
+                    self._eject(ep, now)
+                return
+
+            ep.consecutive_failures = 0
+            if ep.ewma_ms is None:
+                ep.ewma_ms = latency_ms
+            else:
+                ep.ewma_ms += self.ewma_alpha * (latency_ms - ep.ewma_ms)
+
+            if self.slow_ms is not None and ep.ewma_ms > self.slow_ms:
+                others = [e for e in self.endpoints if e is not ep and e.is_healthy(now)]
+                if others:
+                    self._eject(ep, now)
+                    ep.ewma_ms = None   # re-measure after probation
+
+    # ---------- posting ----------
+    def _post_once(self, ep, payload, timeout):
+        try:
+            r = ep.session.post(ep.url, json=payload, timeout=timeout)
+        except Exception as e:
+            raise RpcTransportError(repr(e))
+        retry_after = r.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            retry_after = None
+        try:
+            resp = r.json()
+        except ValueError:
+            resp = None
+        if resp is None and r.status_code not in RETRYABLE_HTTP:
+            raise RpcTransportError(f"HTTP {r.status_code}: non-JSON body")
+        resp = classify_reply(r.status_code, resp, retry_after)
+        if isinstance(payload, list):
+            check_batch_reply(payload, resp)
+        return resp
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def post(self, payload, timeout=5):
+        """
+        POST a JSON-RPC payload (object or batch array); return the decoded JSON reply.
+        Raises RpcUnavailable when retries are exhausted.
+        """
+        last_exc = None
+        ep = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self._backoff(attempt - 1, getattr(last_exc, "retry_after", None)))
+
+            self.bucket.acquire()
+            if self.limiter is not None:
+                self.limiter.acquire()
+            # a retry goes to another endpoint if there is one
+            ep = self._pick(exclude=(ep,)) or self._pick()
+            t0 = time.perf_counter()
+            throttled = False
+            try:
+                resp = self._post_once(ep, payload, timeout)
+            except RpcThrottled as e:
+                # the endpoint is alive, just saturated: back off, don't eject
+                throttled = True
+                last_exc = e
+                self.bucket.throttled()
+                self._record_throttle(ep)
+                continue
+            except RpcTransportError as e:
+                last_exc = e
+                self._record(ep, False, 0.0)
+                continue
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release(throttled=throttled)
+
+            self.bucket.succeeded()
+            self._record(ep, True, (time.perf_counter() - t0) * 1000.0)
+            return resp
+
+        raise RpcUnavailable(f"gave up after {self.max_retries} retries: {last_exc}")
+
+    # ---------- health checks ----------
+    def health_check(self, timeout=2):
+        """Probe every endpoint with eth_blockNumber; re-admit healthy ones, eject failing ones."""
+        payload = {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1}
+        for ep in self.endpoints:
+            t0 = time.perf_counter()
+            try:
+                resp = ep.session.post(ep.url, json=payload, timeout=timeout).json()
+                ok = "error" not in resp
+            except Exception:
+                ok = False
+            latency_ms = (time.perf_counter() - t0) * 1000.0
+            now = time.time()
+            with self._lock:
+                if not ok:
+                    ep.failures += 1
+                    self._eject(ep, now)
+                elif self.slow_ms is not None and latency_ms > self.slow_ms:
+                    self._eject(ep, now)
+                else:
+                    ep.ejected_until = 0.0
+                    ep.consecutive_failures = 0
+        return self.stats()
+
+    def start_health_checks(self, interval=10.0):
+        """Run health_check() every `interval` seconds in a daemon thread."""
+        if self._health_thread is not None:
+            return
+
+        def _loop():
+            while not self._health_stop.wait(interval):
+                self.health_check()
+
+        self._health_stop.clear()
+        self._health_thread = threading.Thread(target=_loop, daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        self._health_stop.set()
+        self._health_thread = None
+
+    def stats(self):
+        with self._lock:
+            return [e.snapshot() for e in self.endpoints]
+
+    def flow_stats(self):
+        return {
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "rate": self.bucket.rate,
+            "concurrency": self.limiter.limit if self.limiter is not None else None,
+        }
+
+
+# ---------- process-wide default pool ----------
+def parse_urls(value):
+    """Split a comma/whitespace separated endpoint list."""
+    return [u.strip() for u in str(value).replace(" ", ",").split(",") if u.strip()]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(urls=None, strategy=None, **kwargs):
+    """
+    (Re)build the default pool. urls: list or comma-separated string;
+    falls back to $RPC_URL, then DEFAULT_RPC_URL. strategy falls back to $RPC_STRATEGY.
+    """
+    global _pool
+    if urls is None or urls == "" or urls == []:
+        urls = os.environ.get(RPC_URL_ENV, DEFAULT_RPC_URL)
+    if isinstance(urls, str):
+        urls = parse_urls(urls)
+    if strategy is None:
+        strategy = os.environ.get(RPC_STRATEGY_ENV, "round_robin")
+    if "rate" not in kwargs and os.environ.get(RPC_RATE_ENV):
+        kwargs["rate"] = float(os.environ[RPC_RATE_ENV])
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop_health_checks()
+        _pool = RpcPool(urls, strategy=strategy, **kwargs)
+    return _pool
+
+
+def get_pool():
+    if _pool is None:
+        configure()
+    return _pool
+
+
+def post(payload, timeout=5):
+    return get_pool().post(payload, timeout=timeout)
+
+
+def add_cli_args(ap):
+    """
+    Register --rpc-url / --rpc-strategy / --rpc-rate / --rpc-retries /
+    --rpc-health-interval on an argparse parser.
+    """
+    ap.add_argument("--rpc-url", default="",
+                    help=f"comma-separated JSON-RPC endpoints (default: ${RPC_URL_ENV} or {DEFAULT_RPC_URL})")
+    ap.add_argument("--rpc-strategy", default=None, choices=STRATEGIES,
+                    help=f"load-balancing strategy (default: ${RPC_STRATEGY_ENV} or round_robin)")
+    ap.add_argument("--rpc-rate", type=float, default=None,
+                    help=f"client-side request rate limit in req/s (default: ${RPC_RATE_ENV} or unlimited)")
+    ap.add_argument("--rpc-retries", type=int, default=6,
+                    help="retries for transport/throttling failures before giving up")
+    ap.add_argument("--rpc-health-interval", type=float, default=None,
+                    help="probe every endpoint this often (seconds) to eject / re-admit it (default: off)")
+
+
+def configure_from_args(args):
+    kwargs = {"max_retries": args.rpc_retries}
+    if args.rpc_rate is not None:
+        kwargs["rate"] = args.rpc_rate
+    pool = configure(args.rpc_url or None, args.rpc_strategy, **kwargs)
+    if args.rpc_health_interval:
+        pool.start_health_checks(args.rpc_health_interval)
+    return pool
@@ -0,0 +1,62 @@
+# tests/conftest.py
+# The modules live flat in the project directory; make them importable from tests/.
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rpc_client  # noqa: E402
+from bench.local_oracle import LocalExecutor  # noqa: E402
+from bench.mock_node import MockNode  # noqa: E402
+from oracle_base import Oracle, get_oracle  # noqa: E402
+
+MODES = ["simple", "medium", "complex"]
+FAILING = [(), ("C",), ("T",), ("A", "B")]   # symbols whose call fails
+
+
+def failing_id(fail):
+    return "fail-" + ("".join(fail) or "none")
+
+
+@pytest.fixture
+def local_oracle():
+    """Factory: an Oracle with `mode`'s semantics over a LocalExecutor(fail)."""
+    def make(mode, fail=(), **kwargs):
+        return Oracle(get_oracle(mode).semantics, LocalExecutor(fail), **kwargs)
+    return make
+
+
+@pytest.fixture
+def baseline(local_oracle):
+    """Verdicts of a fresh plain oracle per word: nothing cached or harvested from other words."""
+    def verdicts(mode, fail, words):
+        return [local_oracle(mode, fail).membership_oracle(w) for w in words]
+    return verdicts
+
+
+@pytest.fixture
+def mock_rpc():
+    """Factory: start a MockNode(**node_kwargs) and point the default pool at it (restored afterwards)."""
+    saved, nodes = rpc_client._pool, []
+
+    def start(pool_kwargs=None, **node_kwargs):
+        node = MockNode(**node_kwargs).start()
+        nodes.append(node)
+        rpc_client.configure([node.url], **(pool_kwargs or {"backoff_base": 0.001, "backoff_max": 0.01}))
+        return node
+    yield start
+    for node in nodes:
+        node.stop()
+    rpc_client._pool = saved
+
+
+@pytest.fixture(scope="session")
+def sample_words():
+    rng = random.Random(0)
+    words = {()}
+    while len(words) < 250:
+        words.add(tuple(rng.choice("ATBCM") for _ in range(rng.randint(1, 6))))
+    return sorted(words)
@@ -0,0 +1,37 @@
+# tests/test_batch_reply.py
+# A batch reply that is not a list, or lacks some request ids, is a transport
+# failure: it is retried and never cached as a rejection of the missing calls.
+import pytest
+
+import rpc_client
+from conftest import MODES
+from oracle_base import Oracle, RpcExecutor, get_oracle
+
+
+@pytest.mark.parametrize("resp", [{"jsonrpc": "2.0", "id": None, "error": {"code": -32600}},
+                                  [{"jsonrpc": "2.0", "id": 0, "result": "0x"}],
+                                  []])
+def test_check_batch_reply_rejects_partial_replies(resp):
+    payload = [{"jsonrpc": "2.0", "method": "eth_chainId", "params": [], "id": i} for i in range(2)]
+    with pytest.raises(rpc_client.RpcTransportError):
+        rpc_client.check_batch_reply(payload, resp)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_truncated_batches_are_retried_not_rejected(mock_rpc, local_oracle, sample_words, mode):
+    node = mock_rpc(truncate_rate=0.3, seed=1)
+    oracle = Oracle(get_oracle(mode).semantics, RpcExecutor())
+    got = oracle.membership_many(sample_words)
+
+    # the mock node answers every call successfully, so only the automaton rejects
+    assert got == [local_oracle(mode).membership_oracle(w) for w in sample_words]
+    assert node.stats["truncated"] > 0
+    assert rpc_client.get_pool().retries >= node.stats["truncated"]
+
+
+def test_always_truncated_batch_raises_unavailable(mock_rpc):
+    mock_rpc(truncate_rate=1.0)
+    oracle = Oracle(get_oracle("complex").semantics, RpcExecutor())
+    with pytest.raises(rpc_client.RpcUnavailable):
+        oracle.membership_many([("A", "T", "B"), ("A", "C", "T", "B")])
+    assert not oracle.cache
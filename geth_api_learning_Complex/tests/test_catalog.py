@@ -0,0 +1,80 @@
+# tests/test_catalog.py
+# Catalog-built alphabets (api_alphabet.build_alphabet) and learning over int symbols.
+import itertools
+import os
+import random
+
+import pytest
+
+from api_alphabet import Alphabet, build_alphabet, load_alphabet
+from bench.local_oracle import LocalExecutor
+from bench.targets import get_target
+from equivalence import TEMPLATES, make_equivalence_oracle, template_words
+from my_lsharp.learner import LSharp
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+from oracle_base import ClassMappedSemantics, Oracle, get_oracle
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api_catalog.json")
+
+SMALL = {
+    "variables": {"address": ["0x01", "0x02"], "block": ["latest"]},
+    "methods": [
+        {"class": "A", "method": "eth_getBalance", "params": ["$address", "$block"]},
+        {"class": "T", "method": "eth_getTransactionCount", "params": ["$address", "$block"]},
+        {"class": "B", "method": "eth_getCode", "params": ["$address", "$block"]},
+        {"class": "C", "method": "eth_call", "params": [{"to": "$address", "data": "0x"}, "$block"]},
+        {"class": "M", "method": "eth_feeHistory", "params": ["0x1", "$block", []]},
+    ],
+}
+
+
+def test_shipped_catalog_expands_every_combination():
+    alphabet = load_alphabet(CATALOG)
+    # 4 addresses x 3 blocks for A/T/B, x 2 call data for C, 3 blocks for M
+    assert [len(alphabet.by_class(c)) for c in "ATBCM"] == [12, 12, 12, 24, 3]
+    assert alphabet.symbols == list(range(len(alphabet)))
+    params = [alphabet.api_map[s]["params"] for s in alphabet.by_class("C")]
+    assert all("$" not in repr(p) for p in params)
+    assert len({repr(p) for p in params}) == 24
+
+
+def test_intern_deduplicates():
+    alphabet = Alphabet()
+    a = alphabet.intern("A", "eth_getBalance", ["0x1", "latest"])
+    assert alphabet.intern("A", "eth_getBalance", ["0x1", "latest"]) == a
+    assert alphabet.intern("T", "eth_getBalance", ["0x1", "latest"]) != a
+    assert len(alphabet) == 2
+
+
+@pytest.mark.parametrize("entry", [{"class": "X", "method": "eth_chainId", "params": []},
+                                   {"class": "A", "method": "eth_getBalance", "params": ["$who", "latest"]}])
+def test_build_alphabet_rejects_bad_entries(entry):
+    with pytest.raises(ValueError):
+        build_alphabet({"variables": {}, "methods": [entry]})
+
+
+def test_translate_and_template_skip():
+    alphabet = build_alphabet({"variables": SMALL["variables"],
+                               "methods": [m for m in SMALL["methods"] if m["class"] != "C"]})
+    first = {c: alphabet.by_class(c)[0] for c in "ATBM"}
+    assert alphabet.translate("ATB") == (first["A"], first["T"], first["B"])
+    with pytest.raises(KeyError):
+        alphabet.translate("AC")
+
+    # templates that need a C symbol are skipped
+    assert template_words(alphabet) == [alphabet.translate(t) for t in TEMPLATES if "C" not in t]
+
+
+@pytest.mark.parametrize("learner_cls", [LStar, TTTLearner, LSharp])
+def test_learners_handle_int_symbols(learner_cls):
+    alphabet = build_alphabet(SMALL)
+    oracle = Oracle(ClassMappedSemantics(get_oracle("complex").semantics, alphabet.classes), LocalExecutor())
+    eq = make_equivalence_oracle(oracle.membership_oracle, alphabet=alphabet, rng=random.Random(0))
+    dfa = learner_cls(list(alphabet), oracle.membership_oracle, eq).learn()
+
+    target = get_target("complex")
+    classes = alphabet.classes
+    for n in range(5):
+        for w in itertools.product(alphabet.symbols, repeat=n):
+            assert dfa.accepts(w) == target.accepts([classes[s] for s in w])
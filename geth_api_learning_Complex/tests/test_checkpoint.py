@@ -0,0 +1,118 @@
+# tests/test_checkpoint.py
+# An aborted run resumed from its checkpoint re-asks no answered query.
+import pickle
+
+import pytest
+
+from bench.local_oracle import BudgetExceeded, LocalExecutor, LocalOracle
+from bench.targets import get_target, shortest_counterexample
+from checkpoint import Checkpoint
+from my_lsharp.learner import LSharp
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+from oracle_base import Oracle, get_oracle
+
+LEARNERS = [
+    (LStar, {}),
+    (TTTLearner, {"max_rounds": None, "max_refinements": None}),
+    (LSharp, {}),
+]
+
+
+class Abort(Exception):
+    pass
+
+
+def asking(oracle, asked, limit=None):
+    def mq(word):
+        if limit is not None and len(asked) >= limit:
+            raise Abort()
+        asked.append(tuple(word))
+        return oracle(word)
+    return mq
+
+
+@pytest.mark.parametrize("frac", [0.3, 0.7])
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_resume_asks_no_answered_query(tmp_path, learner, kw, frac):
+    target = get_target("random:40:4")
+    full = LocalOracle(target)
+    learner(target.alphabet, full.membership_oracle, full.equivalence_oracle).learn(**kw)
+
+    path = str(tmp_path / "ckpt.pkl")
+    first, second = [], []
+    o = LocalOracle(target)
+    with pytest.raises(Abort):
+        learner(target.alphabet, asking(o.membership_oracle, first, int(full.get_mq_count() * frac)),
+                o.equivalence_oracle, checkpoint=Checkpoint(path)).learn(**kw)
+
+    o = LocalOracle(target)
+    resumed = learner(target.alphabet, asking(o.membership_oracle, second), o.equivalence_oracle,
+                      checkpoint=Checkpoint(path))
+    dfa = resumed.learn(**kw)
+
+    assert resumed.instr.snapshot()["counters"]["resumed"] == 1
+    assert not set(first) & set(second)
+    assert len(first) + len(second) == full.get_mq_count()
+    assert shortest_counterexample(target, dfa) is None
+
+
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_resume_restores_oracle_state(tmp_path, learner, kw):
+    target = get_target("complex")
+    semantics = get_oracle("complex").semantics
+
+    def eq(hypothesis):
+        ce = shortest_counterexample(target, hypothesis)
+        return None if ce is None else tuple(ce)
+
+    full = Oracle(semantics, LocalExecutor())
+    learner(target.alphabet, full.membership_oracle, eq).learn(**kw)
+
+    path = str(tmp_path / "ckpt.pkl")
+    before = Oracle(semantics, LocalExecutor())
+    with pytest.raises(Abort):
+        learner(target.alphabet, asking(before.membership_oracle, [], full.API_CALL_COUNT // 2), eq,
+                checkpoint=Checkpoint(path, oracle=before)).learn(**kw)
+
+    o = Oracle(semantics, LocalExecutor())
+    misses = []
+
+    def mq(word):
+        if tuple(word) not in o.cache:
+            misses.append(tuple(word))
+        return o.membership_oracle(word)
+
+    dfa = learner(target.alphabet, mq, eq, checkpoint=Checkpoint(path, oracle=o)).learn(**kw)
+    # answers (and harvested prefixes) from before the abort are never evaluated again
+    assert not set(misses) & set(before.cache)
+    assert o.API_CALL_COUNT == before.API_CALL_COUNT + len(misses)
+    assert o.RPC_CALL_COUNT >= before.RPC_CALL_COUNT
+    assert shortest_counterexample(target, dfa) is None
+
+
+class Recording(Checkpoint):
+    """Keeps a copy of the learner structure of every snapshot written by save()."""
+
+    def save(self, learner, force=False):
+        saves = self.saves
+        super().save(learner, force)
+        if self.saves != saves:
+            self.structure = pickle.loads(pickle.dumps(self.load()["learner"]))
+
+
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_abort_snapshot_keeps_last_saved_structure(tmp_path, learner, kw):
+    target = get_target("random:40:4")
+    o = LocalOracle(target, max_mq=700)
+    checkpoint = Recording(str(tmp_path / "ckpt.pkl"), every=3)
+    with pytest.raises(BudgetExceeded):
+        learner(target.alphabet, o.membership_oracle, o.equivalence_oracle, checkpoint=checkpoint).learn(**kw)
+
+    saved = checkpoint.load()["learner"]
+    # the learner kept changing after its last snapshot; the abort must not leak that in
+    assert set(saved) == set(checkpoint.structure)
+    for k in saved:
+        if k != "words":
+            assert pickle.dumps(saved[k]) == pickle.dumps(checkpoint.structure[k]), k
+    assert len(saved["words"]) > len(checkpoint.structure["words"])
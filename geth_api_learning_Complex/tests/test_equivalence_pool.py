@@ -0,0 +1,61 @@
+# tests/test_equivalence_pool.py
+# EquivalenceOracle's pool of tested words: replayed against each new hypothesis
+# with no new MQs, bounded, and carried through checkpoint state.
+import random
+
+from bench.local_oracle import LocalOracle
+from bench.targets import get_target
+from equivalence import EquivalenceOracle
+from my_lstar.learner import LStar
+
+TARGET = "random:30:3"
+
+
+def hypothesis_of(spec):
+    target = get_target(spec)
+    o = LocalOracle(target)
+    return LStar(target.alphabet, o.membership_oracle, o.equivalence_oracle).learn()
+
+
+def make_eq(target, **kwargs):
+    o = LocalOracle(target)
+    return o, EquivalenceOracle(o.membership_oracle, alphabet=target.alphabet, rng=random.Random(0), **kwargs)
+
+
+def test_pool_finds_shortest_disagreement_without_mq():
+    target = get_target(TARGET)
+    o, eq = make_eq(target)
+    assert eq(hypothesis_of(TARGET)) is None
+    mq = o.get_mq_count()
+
+    wrong = hypothesis_of(TARGET + ":1")
+    ce = eq(wrong)
+    assert o.get_mq_count() == mq and eq.pool_hits == 1
+    disagreeing = [w for w in eq.pool if wrong.accepts(w) != target.accepts(w)]
+    assert len(ce) == min(map(len, disagreeing))
+
+
+def test_pool_is_bounded_oldest_first():
+    target = get_target(TARGET)
+    _, eq = make_eq(target, pool_size=50)
+    eq(hypothesis_of(TARGET))
+    assert len(eq.pool) == 50
+    assert all(eq.pool[w] == target.accepts(w) for w in eq.pool)
+
+
+def test_pool_size_zero_disables_the_pool():
+    target = get_target(TARGET)
+    _, eq = make_eq(target, pool_size=0)
+    eq(hypothesis_of(TARGET))
+    assert eq(hypothesis_of(TARGET + ":1")) is not None
+    assert not eq.pool and eq.pool_hits == 0
+
+
+def test_pool_survives_checkpoint_state():
+    target = get_target(TARGET)
+    _, eq = make_eq(target)
+    eq(hypothesis_of(TARGET))
+    _, restored = make_eq(target)
+    restored.restore_state(eq.checkpoint_state())
+    assert list(restored.pool.items()) == list(eq.pool.items())
+    assert restored.rng.getstate() == eq.rng.getstate()
@@ -0,0 +1,31 @@
+# tests/test_footprint.py
+# Footprint (partial-order) reduction: same verdicts, one execution per footprint.
+import pytest
+
+from conftest import FAILING, MODES, failing_id
+
+
+@pytest.mark.parametrize("footprint", ["set", "multiset"])
+@pytest.mark.parametrize("fail", FAILING, ids=failing_id)
+@pytest.mark.parametrize("mode", MODES)
+def test_verdicts_match_plain_oracle(mode, fail, footprint, local_oracle, baseline, sample_words):
+    expected = baseline(mode, fail, sample_words)
+    o = local_oracle(mode, fail, footprint=footprint)
+    assert [o.membership_oracle(w) for w in sample_words] == expected
+    assert local_oracle(mode, fail, footprint=footprint).membership_many(sample_words) == expected
+
+
+@pytest.mark.parametrize("footprint", ["set", "multiset"])
+@pytest.mark.parametrize("mode", MODES)
+def test_each_footprint_executed_once(mode, footprint, local_oracle, sample_words):
+    o = local_oracle(mode, footprint=footprint)
+    for w in sample_words:
+        o.membership_oracle(w)
+    assert o.executor.calls == sum(len(o._footprint_calls(fp)) for fp in o.store.footprint_ok)
+    for w in sample_words:
+        perm = w[::-1]
+        calls = o.executor.calls
+        known = o.footprint_of(perm) in o.store.footprint_ok
+        o.membership_oracle(perm)
+        if known:
+            assert o.executor.calls == calls, perm
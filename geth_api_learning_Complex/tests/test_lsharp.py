@@ -0,0 +1,83 @@
+# tests/test_lsharp.py
+# L#: exact learning, and the incremental apartness / tree-conflict bookkeeping
+# against a from-scratch recomputation.
+import random
+from collections import deque
+
+import pytest
+
+from bench.local_oracle import BudgetExceeded, LocalOracle
+from bench.targets import get_target, shortest_counterexample
+from checkpoint import Checkpoint
+from equivalence import make_equivalence_oracle
+from my_lsharp.learner import LSharp
+from my_lsharp.observation_tree import ObservationTree
+from words import WordTrie
+
+TARGETS = ["complex", "medium", "random:20:3", "random:40:4:2", "random:30:12:5"]
+
+
+def learner_for(spec, random_eq=False, **kwargs):
+    target = get_target(spec)
+    o = LocalOracle(target)
+    eq = o.equivalence_oracle
+    if random_eq:
+        # long random words leave deep conflicts in the tree
+        eq = make_equivalence_oracle(o.membership_oracle, alphabet=target.alphabet, rng=random.Random(1), max_len=30)
+    return target, o, LSharp(target.alphabet, o.membership_oracle, eq, **kwargs)
+
+
+def full_conflict_depth(learner, delta):
+    verdict, nexts = learner.words.verdict, learner.words._next
+    queue = deque([(WordTrie.ROOT, WordTrie.ROOT, 0)])
+    while queue:
+        n, q, d = queue.popleft()
+        v = verdict.get(n)
+        if v is not None and v != verdict[q]:
+            return d
+        for a, c in nexts[n].items():
+            queue.append((c, delta[q][a], d + 1))
+    return None
+
+
+@pytest.mark.parametrize("random_eq", [False, True])
+@pytest.mark.parametrize("spec", TARGETS)
+def test_incremental_checks_match_full_recomputation(monkeypatch, spec, random_eq):
+    update, conflict = ObservationTree.update_candidates, LSharp._tree_conflict
+
+    def checked_update(tree):
+        isolated = update(tree)
+        for f, cands in tree.frontier.items():
+            assert sorted(cands) == sorted(b for b in tree.basis if not tree.apart(f, b))
+            assert (len(cands) > 1) == (f in tree._ambiguous)
+        return isolated
+
+    def checked_conflict(learner, delta):
+        n = conflict(learner, delta)
+        assert (None if n is None else len(learner.words.word(n))) == full_conflict_depth(learner, delta)
+        return n
+
+    monkeypatch.setattr(ObservationTree, "update_candidates", checked_update)
+    monkeypatch.setattr(LSharp, "_tree_conflict", checked_conflict)
+    target, _, learner = learner_for(spec, random_eq)
+    assert shortest_counterexample(target, learner.learn()) is None
+
+
+def test_resumes_tree_saved_without_indexes(tmp_path):
+    target = get_target("random:40:4:2")
+    path = str(tmp_path / "ckpt.pkl")
+    o = LocalOracle(target, max_mq=400)
+    with pytest.raises(BudgetExceeded):
+        LSharp(target.alphabet, o.membership_oracle, o.equivalence_oracle, checkpoint=Checkpoint(path)).learn()
+
+    # a snapshot from before the suffix index / ambiguity set existed
+    ckpt = Checkpoint(path)
+    data = ckpt.load()
+    assert "tree" in data["learner"]
+    for key in ("_below", "_ambiguous", "_witnesses"):
+        data["learner"]["tree"].pop(key)
+    ckpt._write(data["algo"], data["learner"], data.get("equivalence"))
+
+    o = LocalOracle(target)
+    learner = LSharp(target.alphabet, o.membership_oracle, o.equivalence_oracle, checkpoint=Checkpoint(path))
+    assert shortest_counterexample(target, learner.learn()) is None
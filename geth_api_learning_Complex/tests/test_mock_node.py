@@ -0,0 +1,108 @@
+# tests/test_mock_node.py
+# bench.mock_node: latency specs, API_MAP methods, fault injection and limits.
+import http.client
+import json
+import random
+import threading
+import time
+
+import pytest
+import requests
+
+from api_alphabet import API_MAP
+from bench.mock_node import MockNode, parse_latency
+
+
+def rpc(method, req_id=1):
+    return {"jsonrpc": "2.0", "method": method, "params": [], "id": req_id}
+
+
+def post_raw(conn, body):
+    conn.request("POST", "/", body=json.dumps(body), headers={"Content-Type": "application/json"})
+    r = conn.getresponse()
+    return r.status, json.loads(r.read())
+
+
+@pytest.mark.parametrize("spec, lo, hi", [("0", 0, 0), ("const:5", 0.005, 0.005), ("7", 0.007, 0.007),
+                                          ("uniform:1:3", 0.001, 0.003), ("exp:0", 0, 0)])
+def test_parse_latency(spec, lo, hi):
+    sample = parse_latency(spec)
+    rng = random.Random(0)
+    for _ in range(50):
+        assert lo <= sample(rng) <= hi
+
+
+def test_parse_latency_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1:2")
+
+
+def test_serves_api_map_singly_and_in_batches():
+    methods = sorted({spec["method"] for spec in API_MAP.values()})
+    with MockNode() as node:
+        for m in methods:
+            assert "result" in requests.post(node.url, json=rpc(m)).json()
+        replies = requests.post(node.url, json=[rpc(m, i) for i, m in enumerate(methods)]).json()
+        assert sorted(r["id"] for r in replies) == list(range(len(methods)))
+        assert all("result" in r for r in replies)
+        assert "error" in requests.post(node.url, json=rpc("eth_sendTransaction")).json()
+        assert node.stats["batches"] == 1
+
+
+def test_injected_faults():
+    with MockNode(error_rate=1.0) as node:
+        assert requests.post(node.url, json=rpc("eth_chainId")).json()["error"]["code"] == -32000
+    with MockNode(throttle_rate=1.0) as node:
+        assert requests.post(node.url, json=rpc("eth_chainId")).status_code == 429
+    with MockNode(drop_rate=1.0) as node:
+        with pytest.raises(requests.ConnectionError):
+            requests.post(node.url, json=rpc("eth_chainId"))
+    with MockNode(truncate_rate=1.0) as node:
+        assert len(requests.post(node.url, json=[rpc("eth_chainId", i) for i in range(4)]).json()) == 2
+
+
+def test_latency_is_applied():
+    with MockNode(latency="const:50") as node:
+        t0 = time.perf_counter()
+        requests.post(node.url, json=rpc("eth_chainId"))
+        assert time.perf_counter() - t0 >= 0.05
+
+
+def test_max_connections_counts_open_connections():
+    with MockNode(max_connections=2) as node:
+        conns = [http.client.HTTPConnection(node.host, node.port) for _ in range(3)]
+        for c in conns:
+            c.connect()
+        statuses = [post_raw(c, rpc("eth_chainId"))[0] for c in conns]
+        assert sorted(statuses) == [200, 200, 429]
+
+        # the refused connection is closed; the other two keep their slots
+        for c, status in zip(conns, statuses):
+            if status == 200:
+                assert post_raw(c, rpc("eth_chainId"))[0] == 200
+            c.close()
+        assert node.stats["over_connections"] == 1 and node.stats["max_connections"] == 3
+
+
+def test_max_in_flight_is_node_wide():
+    with MockNode(latency="const:100", max_in_flight=1) as node:
+        statuses = []
+
+        def call():
+            statuses.append(requests.post(node.url, json=rpc("eth_chainId")).status_code)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert statuses.count(200) >= 1 and statuses.count(429) >= 1
+        assert node.stats["over_limit"] == statuses.count(429)
+
+
+def test_max_rate_limits_requests_per_second():
+    with MockNode(max_rate=5) as node:
+        with requests.Session() as s:
+            statuses = [s.post(node.url, json=rpc("eth_chainId")).status_code for _ in range(8)]
+        assert statuses == [200] * 5 + [429] * 3
+        assert node.stats["over_rate"] == 3
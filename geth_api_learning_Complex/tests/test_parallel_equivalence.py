@@ -0,0 +1,82 @@
+# tests/test_parallel_equivalence.py
+# ParallelEquivalenceOracle: counterexamples from the worker slices, and MQ counts
+# that charge the parent for each word it did not know yet, once.
+import functools
+
+import pytest
+
+from bench.local_oracle import LocalOracle
+from bench.targets import get_target
+from my_lstar.learner import LStar
+from parallel_equivalence import ParallelEquivalenceOracle, _slice_words
+
+TARGET = "random:30:3"
+
+
+def hypothesis_of(spec):
+    target = get_target(spec)
+    o = LocalOracle(target)
+    return LStar(target.alphabet, o.membership_oracle, o.equivalence_oracle).learn()
+
+
+def slice_words(eq, symbols):
+    """Every word the workers draw in eq's latest round."""
+    per, extra = divmod(eq.num_tests, eq.workers)
+    base = (eq.seed * 1_000_003 + eq.rounds) * 1009
+    return {tuple(symbols[j] for j in idx)
+            for i in range(eq.workers)
+            for idx in _slice_words(len(symbols), base + i, per + (i < extra), eq.max_len)}
+
+
+@pytest.fixture
+def parallel_eq():
+    made = []
+
+    def make(target, parent, **kwargs):
+        eq = ParallelEquivalenceOracle(parent.membership_oracle, functools.partial(LocalOracle, target),
+                                       alphabet=target.alphabet, counter=parent, **kwargs)
+        made.append(eq)
+        return eq
+    yield make
+    for eq in made:
+        eq.close()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_correct_hypothesis_charges_each_new_word_once(parallel_eq, workers):
+    target = get_target(TARGET)
+    parent = LocalOracle(target)
+    eq = parallel_eq(target, parent, workers=workers, pool_size=0)
+    assert eq(hypothesis_of(TARGET)) is None
+
+    words = slice_words(eq, target.alphabet)
+    assert set(eq.templates) | words == set(parent.cache)
+    assert parent.get_mq_count() == len(parent.cache)
+
+
+def test_known_words_cost_no_mq(parallel_eq):
+    target = get_target(TARGET)
+    parent = LocalOracle(target)
+    eq = parallel_eq(target, parent, workers=2, pool_size=0)
+    hypothesis = hypothesis_of(TARGET)
+    assert eq(hypothesis) is None
+    before = parent.get_mq_count()
+
+    # fresh workers, same round seeds: the parent ships the verdicts it already has
+    eq.reset()
+    assert eq(hypothesis) is None
+    assert parent.get_mq_count() == before
+
+
+@pytest.mark.parametrize("shortest", [False, True])
+def test_counterexample_is_a_disagreement(parallel_eq, shortest):
+    target = get_target(TARGET)
+    parent = LocalOracle(target)
+    eq = parallel_eq(target, parent, workers=3, shortest=shortest)
+    wrong = hypothesis_of(TARGET + ":1")
+    ce = eq(wrong)
+    assert ce is not None
+    assert wrong.accepts(ce) != target.accepts(ce)
+    if shortest:
+        disagreeing = [w for w in slice_words(eq, target.alphabet) if wrong.accepts(w) != target.accepts(w)]
+        assert len(ce) == min(map(len, disagreeing))
@@ -0,0 +1,43 @@
+# tests/test_prefix_harvest.py
+# Prefix verdicts harvested from one execution, and batched queries.
+import pytest
+
+from conftest import FAILING, MODES, failing_id
+
+VARIANTS = {
+    "plain": {},
+    "short_circuit": {"short_circuit": True},
+    "footprint": {"footprint": "multiset"},
+}
+
+
+@pytest.mark.parametrize("variant", list(VARIANTS))
+@pytest.mark.parametrize("fail", FAILING, ids=failing_id)
+@pytest.mark.parametrize("mode", MODES)
+def test_harvested_verdicts_are_correct(mode, fail, variant, local_oracle, baseline, sample_words):
+    o = local_oracle(mode, fail, **VARIANTS[variant])
+    for w in sample_words:
+        o.membership_oracle(w)
+    words = list(o.cache)
+    assert [o.cache[w] for w in words] == baseline(mode, fail, words)
+
+
+@pytest.mark.parametrize("variant", list(VARIANTS))
+@pytest.mark.parametrize("fail", FAILING, ids=failing_id)
+@pytest.mark.parametrize("mode", MODES)
+def test_membership_with_prefixes(mode, fail, variant, local_oracle, baseline, sample_words):
+    o = local_oracle(mode, fail, **VARIANTS[variant])
+    for w in sample_words[::10]:
+        assert o.membership_with_prefixes(w) == baseline(mode, fail, [w[:i] for i in range(len(w) + 1)])
+
+
+@pytest.mark.parametrize("fail", FAILING, ids=failing_id)
+@pytest.mark.parametrize("mode", MODES)
+def test_plain_batch_stops_at_first_failed_call(mode, fail, local_oracle, baseline, sample_words):
+    assert local_oracle(mode, fail).membership_many(sample_words) == baseline(mode, fail, sample_words)
+    for w in sample_words:
+        single = local_oracle(mode, fail)
+        single.membership_oracle(w)
+        batched = local_oracle(mode, fail)
+        batched.membership_many([w])
+        assert batched.executor.calls == single.executor.calls, w
@@ -0,0 +1,186 @@
+# tests/test_rpc_pool.py
+# rpc_client.RpcPool: client-side flow control (token bucket, AIMD window, throttles)
+# and endpoint handling (balancing, failover, ejection, health checks).
+import threading
+import time
+
+import pytest
+
+import rpc_client
+from bench.mock_node import MockNode
+from rpc_client import AIMDLimiter, RpcPool, TokenBucket
+
+CHAIN_ID = {"jsonrpc": "2.0", "method": "eth_chainId", "params": [], "id": 1}
+
+
+def fast_pool(urls, **kwargs):
+    return RpcPool(urls, backoff_base=0.001, backoff_max=0.01, **kwargs)
+
+
+# ---------- token bucket ----------
+def test_bucket_spaces_requests_at_its_rate():
+    bucket = TokenBucket(rate=50, burst=1)
+    t0 = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - t0 >= 0.18
+
+
+def test_bucket_halves_once_per_cooldown_and_recovers():
+    bucket = TokenBucket(rate=100, increase=10, cooldown=60)
+    bucket.throttled()
+    assert bucket.rate == 50
+    bucket.throttled()                 # same burst of 429s: one signal
+    assert bucket.rate == 50
+    for _ in range(1000):
+        bucket.succeeded()
+    assert bucket.rate == 100          # back to the configured rate, not above
+
+
+def test_unlimited_bucket_starts_limiting_at_half_the_measured_rate():
+    bucket = TokenBucket(window=10)
+    for _ in range(20):
+        bucket.acquire()
+        time.sleep(0.01)
+    assert bucket.rate is None
+    bucket.throttled()
+    assert bucket.min_rate <= bucket.rate < 60
+
+
+# ---------- AIMD window ----------
+def test_aimd_window_halves_on_throttle_and_grows_on_success():
+    limiter = AIMDLimiter(initial=8, maximum=10, cooldown=60)
+    for throttled in (True, True):
+        limiter.acquire()
+        limiter.release(throttled=throttled)
+    assert limiter.limit == 4
+    for _ in range(200):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 10
+
+
+def test_aimd_window_blocks_beyond_limit():
+    limiter = AIMDLimiter(initial=2)
+    limiter.acquire()
+    limiter.acquire()
+    third = threading.Thread(target=limiter.acquire)
+    third.start()
+    third.join(0.05)
+    assert third.is_alive()
+    limiter.release()
+    third.join(1)
+    assert not third.is_alive()
+
+
+# ---------- throttled replies ----------
+def test_throttle_is_neither_failure_nor_latency_sample():
+    with MockNode() as node:
+        pool = fast_pool([node.url])
+        ep = pool._pick()
+        pool._record(ep, False, 0.0)
+        pool._pick()
+        pool._record_throttle(ep)
+        assert ep.consecutive_failures == 1
+        assert ep.ewma_ms is None
+        assert ep.snapshot()["throttled"] == 1 and pool.throttled == 1
+
+
+def test_throttled_post_moves_on_without_feeding_health():
+    with MockNode(throttle_rate=1.0) as busy, MockNode() as idle:
+        pool = fast_pool([busy.url, idle.url], rate=1000)
+        assert pool.post(CHAIN_ID)["result"] == "0xfa"
+        busy_ep, idle_ep = pool.endpoints
+        assert (busy_ep.throttled, busy_ep.failures, busy_ep.ewma_ms) == (1, 0, None)
+        assert idle_ep.ewma_ms is not None
+
+
+def test_failing_endpoint_is_skipped_on_retry():
+    with MockNode(drop_rate=1.0) as broken, MockNode() as good:
+        # least_latency keeps preferring the never-measured broken node
+        pool = fast_pool([broken.url, good.url], strategy="least_latency", max_retries=1, max_failures=100)
+        for _ in range(10):
+            assert pool.post(CHAIN_ID)["result"] == "0xfa"
+        assert broken.stats["dropped"] == 10
+        assert good.stats["calls"] == 10
+
+
+def test_rate_limited_node_is_not_overrun():
+    with MockNode(max_rate=100) as node:
+        pool = RpcPool([node.url], max_retries=10, backoff_max=0.5)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(40):
+                    pool.post(CHAIN_ID)
+            except rpc_client.RpcTransportError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert pool.throttled > 0 and pool.bucket.rate is not None
+        assert node.stats["calls"] == 320
+
+
+# ---------- endpoints: balancing, failover, health ----------
+def dead_url():
+    node = MockNode().start()
+    node.stop()
+    return node.url
+
+
+def test_round_robin_spreads_posts():
+    with MockNode() as a, MockNode() as b:
+        pool = fast_pool([a.url, b.url])
+        for _ in range(10):
+            pool.post(CHAIN_ID)
+        assert a.stats["calls"] == b.stats["calls"] == 5
+
+
+def test_least_latency_prefers_faster_node():
+    with MockNode(latency="const:30") as slow, MockNode() as fast:
+        pool = fast_pool([slow.url, fast.url], strategy="least_latency")
+        for _ in range(20):
+            pool.post(CHAIN_ID)
+        assert slow.stats["calls"] == 1 and fast.stats["calls"] == 19
+
+
+def test_dead_endpoint_fails_over_and_is_ejected():
+    with MockNode() as alive:
+        pool = fast_pool([dead_url(), alive.url], max_failures=2)
+        for _ in range(10):
+            assert pool.post(CHAIN_ID)["result"] == "0xfa"
+        dead, _ = pool.stats()
+        assert dead["ejected"] and dead["failures"] == 2
+        assert alive.stats["calls"] == 10 and pool.retries == 2
+
+
+def test_slow_endpoint_is_ejected_while_another_serves():
+    with MockNode(latency="const:50") as slow, MockNode() as fast:
+        pool = fast_pool([slow.url, fast.url], slow_ms=20)
+        for _ in range(6):
+            pool.post(CHAIN_ID)
+        assert [s["ejected"] for s in pool.stats()] == [True, False]
+        assert slow.stats["calls"] == 1
+
+
+def test_health_check_ejects_and_readmits():
+    url = dead_url()
+    pool = fast_pool([url])
+    assert pool.health_check()[0]["ejected"]
+
+    with MockNode(port=int(url.rsplit(":", 1)[1])):
+        assert not pool.health_check()[0]["ejected"]
+        assert pool.post(CHAIN_ID)["result"] == "0xfa"
+
+
+def test_all_endpoints_down_raises_unavailable():
+    pool = fast_pool([dead_url(), dead_url()], max_retries=3)
+    with pytest.raises(rpc_client.RpcUnavailable):
+        pool.post(CHAIN_ID)
+    assert pool.retries == 3
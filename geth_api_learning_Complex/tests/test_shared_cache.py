@@ -0,0 +1,92 @@
+# tests/test_shared_cache.py
+# Oracles sharing a SharedRpcCache keep the logical counts of a run on their own.
+import random
+import threading
+
+import pytest
+
+from bench.local_oracle import LocalExecutor
+from bench.targets import get_target, shortest_counterexample
+from my_lsharp.learner import LSharp
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+from oracle_base import Oracle, SharedRpcCache, get_oracle
+
+VARIANTS = [{}, {"short_circuit": True}, {"footprint": "multiset"}]
+
+
+def in_threads(*fns):
+    out = [None] * len(fns)
+    errors = []
+
+    def run(i, fn):
+        try:
+            out[i] = fn()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i, fn)) for i, fn in enumerate(fns)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors
+    return out
+
+
+@pytest.mark.parametrize("kwargs", VARIANTS, ids=lambda k: "-".join(map(str, k.values())) or "plain")
+def test_shared_oracles_count_as_alone(kwargs):
+    semantics = get_oracle("medium").semantics
+    rng = random.Random(1)
+    words = [tuple(rng.choice("ATBCM") for _ in range(rng.randint(0, 7))) for _ in range(400)]
+
+    orders = [words, words[::-1], sorted(words)]
+    alone = []
+    for ws in orders:
+        o = Oracle(semantics, LocalExecutor(("C",)), **kwargs)
+        alone.append((dict(zip(ws, map(o.membership_oracle, ws))), o.API_CALL_COUNT, o.RPC_CALL_COUNT))
+
+    shared = SharedRpcCache()
+    executor = LocalExecutor(("C",))
+    oracles = [Oracle(semantics, executor, shared=shared, **kwargs) for _ in orders]
+    answers = in_threads(*[lambda o=o, ws=ws: dict(zip(ws, map(o.membership_oracle, ws)))
+                           for o, ws in zip(oracles, orders)])
+
+    for o, got, (verdicts, mq, rpc) in zip(oracles, answers, alone):
+        assert got == verdicts
+        assert (o.API_CALL_COUNT, o.RPC_CALL_COUNT) == (mq, rpc)
+    # every physical call is made once, whichever thread needed it first
+    assert executor.calls == shared.rpc_count == len(shared.ok)
+    assert shared.rpc_count <= min(rpc for _, _, rpc in alone)
+
+
+def test_concurrent_learners_count_as_sequential():
+    target = get_target("medium")
+    semantics = get_oracle("medium").semantics
+    learners = [
+        (LStar, {}),
+        (TTTLearner, {"max_rounds": None, "max_refinements": None}),
+        (LSharp, {}),
+    ]
+
+    def eq(hypothesis):
+        ce = shortest_counterexample(target, hypothesis)
+        return None if ce is None else tuple(ce)
+
+    def run(learner, kw, oracle):
+        return learner(target.alphabet, oracle.membership_oracle, eq).learn(**kw)
+
+    sequential = []
+    for learner, kw in learners:
+        o = Oracle(semantics, LocalExecutor())
+        run(learner, kw, o)
+        sequential.append((o.API_CALL_COUNT, o.RPC_CALL_COUNT))
+
+    shared = SharedRpcCache()
+    oracles = [Oracle(semantics, LocalExecutor(), shared=shared) for _ in learners]
+    dfas = in_threads(*[lambda learner=learner, kw=kw, o=o: run(learner, kw, o)
+                        for (learner, kw), o in zip(learners, oracles)])
+
+    assert [(o.API_CALL_COUNT, o.RPC_CALL_COUNT) for o in oracles] == sequential
+    assert shared.rpc_count < sum(rpc for _, rpc in sequential)
+    assert all(shortest_counterexample(target, d) is None for d in dfas)
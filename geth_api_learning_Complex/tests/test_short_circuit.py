@@ -0,0 +1,32 @@
+# tests/test_short_circuit.py
+# Semantics-first short-circuit mode against the plain oracle and the bench targets.
+import pytest
+
+from bench.targets import get_target
+from conftest import FAILING, MODES, failing_id
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_plain_oracle_matches_bench_target(mode, baseline, sample_words):
+    target = get_target(mode)
+    assert baseline(mode, (), sample_words) == [target.accepts(w) for w in sample_words]
+
+
+@pytest.mark.parametrize("fail", FAILING, ids=failing_id)
+@pytest.mark.parametrize("mode", MODES)
+def test_verdicts_match_plain_oracle(mode, fail, local_oracle, baseline, sample_words):
+    expected = baseline(mode, fail, sample_words)
+    o = local_oracle(mode, fail, short_circuit=True)
+    assert [o.membership_oracle(w) for w in sample_words] == expected
+    assert local_oracle(mode, fail, short_circuit=True).membership_many(sample_words) == expected
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_rejection_costs_no_rpc(mode, local_oracle, sample_words):
+    target = get_target(mode)
+    o = local_oracle(mode, short_circuit=True)
+    for w in sample_words:
+        before = o.executor.calls
+        o.membership_oracle(w)
+        if not target.accepts(w):
+            assert o.executor.calls == before, w
@@ -0,0 +1,70 @@
+# tests/test_suffix_pruning.py
+# ObservationTable.reduce_suffixes() and LStar(prune_every=...).
+import pytest
+
+from bench.local_oracle import BudgetExceeded, LocalOracle
+from bench.targets import get_target, shortest_counterexample
+from checkpoint import Checkpoint
+from my_lstar.learner import LStar
+from words import EMPTY
+
+TARGETS = ["complex", "random:30:3", "random:60:4:1"]
+
+
+def learned(spec, **kwargs):
+    target = get_target(spec)
+    o = LocalOracle(target)
+    learner = LStar(target.alphabet, o.membership_oracle, o.equivalence_oracle, **kwargs)
+    return target, learner, learner.learn()
+
+
+def row_classes(table):
+    classes = {}
+    for p in table.P:
+        classes.setdefault(table.state(p), set()).add(p)
+    return sorted(map(sorted, classes.values()))
+
+
+@pytest.mark.parametrize("spec", TARGETS)
+def test_reduce_keeps_row_classes(spec):
+    _, learner, dfa = learned(spec)
+    table = learner.table
+    S, classes = list(table.S), row_classes(table)
+
+    dropped = table.reduce_suffixes()
+    assert dropped
+    assert table.S == [s for s in S if s not in dropped]
+    assert table.S[0] == EMPTY
+    assert row_classes(table) == classes
+    assert table.closed()[0] and table.consistent()[0]
+    assert len(table.to_dfa()["states"]) == len(dfa.states)
+
+
+@pytest.mark.parametrize("prune_every", [1, 2])
+@pytest.mark.parametrize("spec", TARGETS[1:])
+def test_pruned_lstar_learns_target(spec, prune_every):
+    target, learner, dfa = learned(spec, prune_every=prune_every)
+    _, plain, _ = learned(spec)
+    assert shortest_counterexample(target, dfa) is None
+    assert len(learner.table.S) < len(plain.table.S)
+    assert learner.instr.snapshot()["counters"]["suffixes_pruned"] > 0
+
+
+@pytest.mark.parametrize("every, cut", [(1, 300), (2, 501), (3, 600), (4, 640)])
+def test_pruned_lstar_resumes_from_checkpoint(tmp_path, every, cut):
+    target = get_target("random:30:3")
+    full = LocalOracle(target)
+    LStar(target.alphabet, full.membership_oracle, full.equivalence_oracle, prune_every=1).learn()
+
+    path = str(tmp_path / "ckpt.pkl")
+    o = LocalOracle(target, max_mq=cut)
+    with pytest.raises(BudgetExceeded):
+        LStar(target.alphabet, o.membership_oracle, o.equivalence_oracle, prune_every=1,
+              checkpoint=Checkpoint(path, every=every)).learn()
+    first = set(o.cache)
+
+    o = LocalOracle(target, max_mq=full.get_mq_count())
+    dfa = LStar(target.alphabet, o.membership_oracle, o.equivalence_oracle, prune_every=1,
+                checkpoint=Checkpoint(path, every=every)).learn()
+    assert not first & set(o.cache)
+    assert shortest_counterexample(target, dfa) is None
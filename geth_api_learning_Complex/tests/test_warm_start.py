@@ -0,0 +1,90 @@
+# tests/test_warm_start.py
+# A saved model of a slightly changed target seeds the learner: far fewer MQs than cold.
+import copy
+
+import pytest
+
+from bench.local_oracle import LocalOracle
+from bench.targets import TargetDFA, get_target, shortest_counterexample
+from checkpoint import Checkpoint
+from dfa_io import load_dfa, save_dfa
+from my_lsharp.learner import LSharp
+from my_lstar.learner import LStar
+from my_ttt.learner import TTTLearner
+
+LEARNERS = [
+    (LStar, {}),
+    (TTTLearner, {"max_rounds": None, "max_refinements": None}),
+    (LSharp, {}),
+]
+
+
+class Abort(Exception):
+    pass
+
+
+def learn(learner, kw, target, prior=None, **extra):
+    o = LocalOracle(target)
+    dfa = learner(target.alphabet, o.membership_oracle, o.equivalence_oracle, prior=prior, **extra).learn(**kw)
+    assert shortest_counterexample(target, dfa) is None
+    return o.get_mq_count()
+
+
+def mutated(target, state, sym):
+    """target with one transition redirected to a state of the other verdict."""
+    delta = copy.deepcopy(target.delta)
+    accepting = delta[state][sym] in target.accepting
+    delta[state][sym] = next(q for q in range(target.size) if (q in target.accepting) != accepting)
+    return TargetDFA(target.name + "-mut", target.alphabet, delta, target.accepting)
+
+
+@pytest.fixture
+def prior(tmp_path):
+    target = get_target("random:50:5")
+    o = LocalOracle(target)
+    path = str(tmp_path / "model.json")
+    save_dfa(LSharp(target.alphabet, o.membership_oracle, o.equivalence_oracle).learn(), path)
+    return target, load_dfa(path)
+
+
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_unchanged_prior_is_only_verified(prior, learner, kw):
+    target, model = prior
+    assert learn(learner, kw, target, model) == 0
+
+
+@pytest.mark.parametrize("state, sym", [(3, "a"), (17, "c"), (41, "e")])
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_one_changed_transition_costs_a_fraction_of_cold(prior, learner, kw, state, sym):
+    target, model = prior
+    changed = mutated(target, state, sym)
+    assert learn(learner, kw, changed, model) < learn(learner, kw, changed) / 10
+
+
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_unrelated_prior_is_dropped(prior, learner, kw):
+    _, model = prior
+    target = get_target("random:20:5:4")
+    assert learn(learner, kw, target, model) < 4 * learn(learner, kw, target)
+
+
+@pytest.mark.parametrize("learner, kw", LEARNERS, ids=lambda x: getattr(x, "__name__", ""))
+def test_warm_run_resumes(tmp_path, prior, learner, kw):
+    target, model = prior
+    changed = mutated(target, 17, "c")
+    full = learn(learner, kw, changed, model)
+
+    asked = []
+    o = LocalOracle(changed)
+
+    def mq(word):
+        if len(asked) >= full // 2:
+            raise Abort()
+        asked.append(tuple(word))
+        return o.membership_oracle(word)
+
+    path = str(tmp_path / "ckpt.pkl")
+    with pytest.raises(Abort):
+        learner(changed.alphabet, mq, o.equivalence_oracle, prior=model, checkpoint=Checkpoint(path)).learn(**kw)
+    rest = learn(learner, kw, changed, model, checkpoint=Checkpoint(path))
+    assert len(asked) + rest <= full
@@ -0,0 +1,116 @@
+# words.py
+# One word type for learners, caches and oracles: a plain tuple of symbols.
+#
+# Symbols are whatever the alphabet holds (single letters for api_alphabet.ALPHABET,
+# interned int ids for catalog alphabets). Tuples are hashable as-is, so they are
+# used directly as cache keys, and `p + (a,)` / `p + s` build new words without
+# going through lists or strings. Callers convert once at the boundary (user
+# input, counterexamples from outside code) with as_word(); inside, every word is
+# already a tuple and is passed through untouched.
+
+EMPTY = ()
+
+
+def as_word(seq):
+    """Return `seq` as a tuple word; tuples are returned unchanged (no copy)."""
+    if type(seq) is tuple:
+        return seq
+    if seq is None:
+        return EMPTY
+    return tuple(seq)
+
+
+
+# ---------- prefix-sharing word store ----------
+class WordTrie:
+    """
+    Prefix-sharing store of words. A word is addressed by an int handle (its trie
+    node); extending a handle by a symbol is one dict lookup, extending by a suffix
+    is an O(|suffix|) walk, and nothing is allocated or re-hashed for words that
+    are already in the trie. The tuple form is only materialized by word(h), i.e.
+    when a query actually has to go to the oracle.
+
+    verdict: handle -> bool, the learner-side MQ cache (shared by everything that
+    indexes into the same trie).
+    seeds:   optional dfa_io.PriorSeeds; words it predicts are answered from the
+             prior model instead of the oracle, and their handles kept in `seeded`
+    """
+
+    ROOT = 0
+    seeds = None    # class default: tries pickled before warm starts had none
+
+    def __init__(self):
+        self._parent = [-1]
+        self._sym = [None]
+        self._next = [{}]
+        self.verdict = {}
+        self.seeded = set()
+
+    def __len__(self):
+        return len(self._parent)
+
+    def child(self, h, a):
+        nxt = self._next[h]
+        c = nxt.get(a)
+        if c is None:
+            c = len(self._parent)
+            nxt[a] = c
+            self._parent.append(h)
+            self._sym.append(a)
+            self._next.append({})
+        return c
+
+    def extend(self, h, suffix):
+        nexts = self._next
+        for a in suffix:
+            c = nexts[h].get(a)
+            h = c if c is not None else self.child(h, a)
+        return h
+
+    def insert(self, word):
+        return self.extend(self.ROOT, word)
+
+    def word(self, h):
+        out = []
+        parent, sym = self._parent, self._sym
+        while h > 0:
+            out.append(sym[h])
+            h = parent[h]
+        return tuple(reversed(out))
+
+    def query(self, h, oracle):
+        """Verdict for handle h; asks oracle(word) only on a cache miss."""
+        v = self.verdict.get(h)
+        if v is None and self.seeds is not None:
+            v = self._seed(h)
+        if v is None:
+            v = bool(oracle(self.word(h)))
+            self.verdict[h] = v
+        return v
+
+    def _seed(self, h):
+        """Verdict for h predicted by seeds (stored as seeded), or None."""
+        v = self.seeds.predict(self, h)
+        if v is not None:
+            self.verdict[h] = v
+            self.seeded.add(h)
+        return v
+
+    def query_many(self, handles, oracle, oracle_many=None):
+        """
+        Fill the verdict cache for handles. Uncached ones go out in one
+        oracle_many(list of words) call when given (and more than one is missing),
+        else one oracle(word) call each. Returns True if a batch was sent.
+        """
+        verdict = self.verdict
+        missing = [h for h in dict.fromkeys(handles) if h not in verdict]
+        if self.seeds is not None:
+            missing = [h for h in missing if self._seed(h) is None]
+        if oracle_many is None or len(missing) < 2:
+            for h in missing:
+                self.query(h, oracle)
+            return False
+        answers = oracle_many([self.word(h) for h in missing])
+        for h, ans in zip(missing, answers):
+            verdict[h] = bool(ans)
+        return True